@@ -12,11 +12,16 @@ set "SCRIPT_DIR=%~dp0"
 set "GF=steamapps\common\Star of Providence"
 set "GAME_PATH="
 
+REM --- Auto-detect: patch.py locate (parallel probing with timeouts, needs Python) ---
+if exist "%SCRIPT_DIR%scripts\patch.py" (
+    for /f "usebackq delims=" %%P in (`python "%SCRIPT_DIR%scripts\patch.py" locate 2^>nul`) do set "GAME_PATH=%%P"
+)
+
 REM --- Auto-detect: Steam path from Windows registry ---
 set "STEAM_DIR="
 for /f "tokens=2*" %%A in ('reg query "HKCU\Software\Valve\Steam" /v "SteamPath" 2^>nul') do set "STEAM_DIR=%%B"
 
-if defined STEAM_DIR (
+if not defined GAME_PATH if defined STEAM_DIR (
     set "STEAM_DIR=!STEAM_DIR:/=\!"
     if exist "!STEAM_DIR!\!GF!\localization" set "GAME_PATH=!STEAM_DIR!\!GF!"
 )
@@ -95,26 +100,40 @@ if not exist "%SCRIPT_DIR%localization\*.csv" (
 )
 
 REM --- Create backup ---
+REM patch.py backup keeps one manifest per game build in _backup_ru\store\
+REM and never stores an already patched file as the original.
 set "BACKUP_DIR=!GAME_PATH!\_backup_ru"
+set "BACKUP_DONE="
 
-if not exist "!BACKUP_DIR!\localization\" (
+where python >nul 2>&1
+if not errorlevel 1 if exist "%SCRIPT_DIR%scripts\patch.py" (
     echo.
     echo  Создание резервной копии...
-    mkdir "!BACKUP_DIR!\localization" 2>nul
+    python "%SCRIPT_DIR%scripts\patch.py" backup --game-path "!GAME_PATH!"
+    if not errorlevel 1 set "BACKUP_DONE=1"
+)
 
-    for %%F in ("!GAME_PATH!\localization\*.csv") do (
-        copy /Y "%%F" "!BACKUP_DIR!\localization\" >nul
-    )
+REM --- Without Python: plain copy, made only once ---
+if not defined BACKUP_DONE (
+    if not exist "!BACKUP_DIR!\localization\" (
+        echo.
+        echo  Создание резервной копии без Python...
+        mkdir "!BACKUP_DIR!\localization" 2>nul
 
-    if exist "!GAME_PATH!\fonts\Chusung-220206.ttf" (
-        mkdir "!BACKUP_DIR!\fonts" 2>nul
-        copy /Y "!GAME_PATH!\fonts\Chusung-220206.ttf" "!BACKUP_DIR!\fonts\" >nul
-    )
+        for %%F in ("!GAME_PATH!\localization\*.csv") do (
+            copy /Y "%%F" "!BACKUP_DIR!\localization\" >nul
+        )
 
-    echo  Бэкап создан: !BACKUP_DIR!
-) else (
-    echo.
-    echo  Бэкап уже существует, пропускаем.
+        if exist "!GAME_PATH!\fonts\Chusung-220206.ttf" (
+            mkdir "!BACKUP_DIR!\fonts" 2>nul
+            copy /Y "!GAME_PATH!\fonts\Chusung-220206.ttf" "!BACKUP_DIR!\fonts\" >nul
+        )
+
+        echo  Бэкап создан: !BACKUP_DIR!
+    ) else (
+        echo.
+        echo  Бэкап уже существует, пропускаем.
+    )
 )
 
 REM --- Install localization ---
@@ -8,16 +8,22 @@ echo   Star of Providence — Восстановление оригинала
 echo  ====================================================
 echo.
 
+set "SCRIPT_DIR=%~dp0"
 set "GF=steamapps\common\Star of Providence"
 set "GAME_PATH="
 
+REM --- Auto-detect: patch.py locate (parallel probing with timeouts, needs Python) ---
+if exist "%SCRIPT_DIR%scripts\patch.py" (
+    for /f "usebackq delims=" %%P in (`python "%SCRIPT_DIR%scripts\patch.py" locate --backup 2^>nul`) do set "GAME_PATH=%%P"
+)
+
 REM --- Auto-detect: Steam path from Windows registry ---
 set "STEAM_DIR="
 for /f "tokens=2*" %%A in ('reg query "HKCU\Software\Valve\Steam" /v "SteamPath" 2^>nul') do set "STEAM_DIR=%%B"
 
-if defined STEAM_DIR (
+if not defined GAME_PATH if defined STEAM_DIR (
     set "STEAM_DIR=!STEAM_DIR:/=\!"
-    if exist "!STEAM_DIR!\!GF!\_backup_ru\localization\" set "GAME_PATH=!STEAM_DIR!\!GF!"
+    if exist "!STEAM_DIR!\!GF!\_backup_ru\" set "GAME_PATH=!STEAM_DIR!\!GF!"
 )
 
 REM --- Auto-detect: parse Steam library folders from libraryfolders.vdf ---
@@ -30,7 +36,7 @@ if not defined GAME_PATH if defined STEAM_DIR (
                 set "LIB=!LIB:"=!"
                 set "LIB=!LIB:\\=\!"
                 for /f "tokens=*" %%T in ("!LIB!") do set "LIB=%%T"
-                if exist "!LIB!\!GF!\_backup_ru\localization\" set "GAME_PATH=!LIB!\!GF!"
+                if exist "!LIB!\!GF!\_backup_ru\" set "GAME_PATH=!LIB!\!GF!"
             )
         )
     )
@@ -40,7 +46,7 @@ REM --- Auto-detect: scan all drives for SteamLibrary ---
 if not defined GAME_PATH (
     for %%D in (A B C D E F G H I J K L M N O P Q R S T U V W X Y Z) do (
         if not defined GAME_PATH (
-            if exist "%%D:\SteamLibrary\!GF!\_backup_ru\localization\" set "GAME_PATH=%%D:\SteamLibrary\!GF!"
+            if exist "%%D:\SteamLibrary\!GF!\_backup_ru\" set "GAME_PATH=%%D:\SteamLibrary\!GF!"
         )
     )
 )
@@ -73,7 +79,7 @@ if "!GAME_PATH:~-1!"=="\" set "GAME_PATH=!GAME_PATH:~0,-1!"
 REM --- Check backup ---
 set "BACKUP_DIR=!GAME_PATH!\_backup_ru"
 
-if not exist "!BACKUP_DIR!\localization\" (
+if not exist "!BACKUP_DIR!\store\manifests\" if not exist "!BACKUP_DIR!\localization\" (
     echo.
     echo  [ОШИБКА] Резервная копия не найдена в:
     echo  !BACKUP_DIR!
@@ -84,27 +90,53 @@ if not exist "!BACKUP_DIR!\localization\" (
     exit /b 1
 )
 
-REM --- Restore files ---
-echo  Восстановление файлов...
+REM --- Restore files: backup store via patch.py (checks hashes) ---
+set "RESTORED="
+if exist "!BACKUP_DIR!\store\manifests\" (
+    where python >nul 2>&1
+    if not errorlevel 1 if exist "%SCRIPT_DIR%scripts\patch.py" (
+        echo  Восстановление файлов...
+        python "%SCRIPT_DIR%scripts\patch.py" restore --game-path "!GAME_PATH!"
+        if not errorlevel 1 set "RESTORED=1"
+    )
+)
+
+REM --- Restore files: plain copies from older installs ---
+if not defined RESTORED if exist "!BACKUP_DIR!\localization\" (
+    echo  Восстановление файлов из копии...
+
+    set "COUNT=0"
+    for %%F in ("!BACKUP_DIR!\localization\*.csv") do (
+        copy /Y "%%F" "!GAME_PATH!\localization\" >nul
+        set /a COUNT+=1
+    )
+    echo  Восстановлено CSV-файлов: !COUNT!
 
-set "COUNT=0"
-for %%F in ("!BACKUP_DIR!\localization\*.csv") do (
-    copy /Y "%%F" "!GAME_PATH!\localization\" >nul
-    set /a COUNT+=1
+    if exist "!BACKUP_DIR!\fonts\Chusung-220206.ttf" (
+        copy /Y "!BACKUP_DIR!\fonts\Chusung-220206.ttf" "!GAME_PATH!\fonts\" >nul
+        echo  Шрифт восстановлен.
+    )
+    set "RESTORED=1"
 )
-echo  Восстановлено CSV-файлов: !COUNT!
 
-if exist "!BACKUP_DIR!\fonts\Chusung-220206.ttf" (
-    copy /Y "!BACKUP_DIR!\fonts\Chusung-220206.ttf" "!GAME_PATH!\fonts\" >nul
-    echo  Шрифт восстановлен.
+if not defined RESTORED (
+    echo.
+    echo  [ОШИБКА] Не удалось восстановить файлы: для бэкапа в
+    echo  !BACKUP_DIR!\store нужен Python ^(python scripts\patch.py restore^).
+    echo.
+    pause
+    exit /b 1
 )
 
-REM --- Optionally remove backup ---
-echo.
-set /p "DEL_BACKUP=  Удалить папку бэкапа? (y/n): "
-if /i "!DEL_BACKUP!"=="y" (
-    rmdir /s /q "!BACKUP_DIR!" 2>nul
-    echo  Бэкап удалён.
+REM --- Optionally remove plain copies; store\ keeps backups of every game build ---
+if exist "!BACKUP_DIR!\localization\" (
+    echo.
+    set /p "DEL_BACKUP=  Удалить старые копии (_backup_ru\localization, fonts)? (y/n): "
+    if /i "!DEL_BACKUP!"=="y" (
+        rmdir /s /q "!BACKUP_DIR!\localization" 2>nul
+        rmdir /s /q "!BACKUP_DIR!\fonts" 2>nul
+        echo  Старые копии удалены, хранилище store\ сохранено.
+    )
 )
 
 echo.
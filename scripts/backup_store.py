@@ -0,0 +1,317 @@
+"""Content-addressed backup store for original game files.
+
+Objects are stored once per SHA-256 under ``_backup_ru/store/objects/`` and
+optionally compressed (zlib, or zstd when ``zstandard`` is installed). Each
+game build gets a small JSON manifest mapping relative paths to hashes, so
+backups of several game versions share every unchanged file.
+
+Layout::
+
+    <game>/_backup_ru/store/
+        objects/ab/cdef…[.z|.zst]
+        manifests/<buildid>.json
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from collections.abc import Iterator
+from pathlib import Path
+
+from steam_locate import GAME_APP_ID, parse_vdf
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+STORE_SUBDIR = Path("_backup_ru", "store")
+LEGACY_BACKUP_SUBDIR = Path("_backup_ru")
+LEGACY_SUFFIX = ".backup_ru"
+
+FONT_FILE = Path("fonts", "Chusung-220206.ttf")
+# UTF-8 lead bytes 0xD0/0xD1 only start U+0400–U+047F (Cyrillic).
+CYRILLIC_BYTES = re.compile(rb"[\xd0\xd1][\x80-\xbf]")
+FONT_MARKS = (b"Noto Sans", "Noto Sans".encode("utf-16-be"))
+UNKNOWN_VERSION = "unknown"
+
+CODECS: dict[str, str] = {"none": "", "zlib": ".z", "zstd": ".zst"}
+_CHUNK = 1 << 20
+
+
+# ── Hashing & objects ───────────────────────────────────────────────────
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, read in 1 MiB chunks."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _object_base(store: Path, digest: str) -> Path:
+    return store / "objects" / digest[:2] / digest[2:]
+
+
+def _find_object(store: Path, digest: str) -> Path | None:
+    base = _object_base(store, digest)
+    for suffix in CODECS.values():
+        path = base.with_name(base.name + suffix)
+        if path.is_file():
+            return path
+    return None
+
+
+def _default_mode() -> int:
+    """Mode ``open()`` would give a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write ``data`` to a temp file next to ``path`` and rename it over.
+
+    The file keeps the mode of the one it replaces; a new file gets the
+    umask default rather than ``mkstemp``'s owner-only 0600.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if path.exists():
+            shutil.copymode(path, tmp)
+        else:
+            os.chmod(tmp, _default_mode())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def put_object(store: Path, data: bytes, codec: str = "zlib") -> str:
+    """Store ``data`` unless an object with the same hash already exists.
+
+    Args:
+        store: Store root directory.
+        data: Raw file contents.
+        codec: ``none``, ``zlib`` or ``zstd``.
+
+    Returns:
+        SHA-256 hex digest of ``data``.
+
+    Raises:
+        ValueError: If ``zstd`` is requested but ``zstandard`` is missing.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    if _find_object(store, digest) is not None:
+        return digest
+
+    if codec == "zlib":
+        payload = zlib.compress(data, 9)
+    elif codec == "zstd":
+        if zstandard is None:
+            raise ValueError("Для zstd нужен пакет zstandard")
+        payload = zstandard.ZstdCompressor(level=19).compress(data)
+    else:
+        payload = data
+
+    base = _object_base(store, digest)
+    _atomic_write(base.with_name(base.name + CODECS[codec]), payload)
+    return digest
+
+
+def get_object(store: Path, digest: str) -> bytes:
+    """Load and verify an object.
+
+    Raises:
+        FileNotFoundError: If the object is missing.
+        ValueError: If the decompressed contents do not match ``digest``.
+    """
+    path = _find_object(store, digest)
+    if path is None:
+        raise FileNotFoundError(f"Объект {digest} отсутствует в хранилище")
+
+    payload = path.read_bytes()
+    if path.suffix == CODECS["zlib"]:
+        data = zlib.decompress(payload)
+    elif path.suffix == CODECS["zstd"]:
+        if zstandard is None:
+            raise ValueError("Для zstd нужен пакет zstandard")
+        data = zstandard.ZstdDecompressor().decompress(payload)
+    else:
+        data = payload
+
+    if hashlib.sha256(data).hexdigest() != digest:
+        raise ValueError(f"Объект {digest} повреждён")
+    return data
+
+
+# ── Manifests ───────────────────────────────────────────────────────────
+
+
+def game_version(game_path: Path) -> str:
+    """Return the Steam build id of the installed game, if known.
+
+    Reads ``steamapps/appmanifest_603960.acf`` next to ``common/``.
+    """
+    acf = game_path.parent.parent / f"appmanifest_{GAME_APP_ID}.acf"
+    try:
+        data = parse_vdf(acf.read_text(encoding="utf-8", errors="replace"))
+    except (OSError, ValueError):
+        return UNKNOWN_VERSION
+    state = data.get("appstate")
+    if isinstance(state, dict) and isinstance(state.get("buildid"), str):
+        return state["buildid"]
+    return UNKNOWN_VERSION
+
+
+def _manifest_path(store: Path, version: str) -> Path:
+    return store / "manifests" / f"{version}.json"
+
+
+def read_manifest(store: Path, version: str) -> dict[str, dict] | None:
+    """Return ``{relpath: {"sha256", "size"}}`` for ``version`` or ``None``."""
+    path = _manifest_path(store, version)
+    if not path.is_file():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))["files"]
+
+
+def write_manifest(
+    store: Path, version: str, files: dict[str, dict]
+) -> Path:
+    """Atomically write the manifest for ``version``; keys are sorted."""
+    path = _manifest_path(store, version)
+    text = json.dumps(
+        {"version": version, "files": files},
+        ensure_ascii=False,
+        indent=1,
+        sort_keys=True,
+    )
+    _atomic_write(path, text.encode("utf-8"))
+    return path
+
+
+def versions(store: Path) -> list[str]:
+    """Return stored game versions, oldest manifest first."""
+    manifests = (store / "manifests").glob("*.json")
+    return [p.stem for p in sorted(manifests, key=lambda p: p.stat().st_mtime)]
+
+
+# ── Snapshot & restore ──────────────────────────────────────────────────
+
+
+def looks_patched(rel: str, path: Path) -> bool:
+    """Whether ``path`` holds our patched file rather than the game's own.
+
+    Decided by content: our CSVs contain Cyrillic, our font is Noto Sans.
+    """
+    data = path.read_bytes()
+    if rel == FONT_FILE.as_posix():
+        return any(mark in data for mark in FONT_MARKS)
+    return CYRILLIC_BYTES.search(data) is not None
+
+
+def original_sources(
+    game_path: Path, skipped: list[str] | None = None
+) -> Iterator[tuple[str, Path]]:
+    """Yield ``(relpath, source)`` for every original game file found.
+
+    A live file that is not patched is the installed build's own file and
+    is taken as is: the legacy ``_backup_ru/`` copy is made only once by
+    older ``install_patch.bat`` versions and may predate a Steam update.
+    For a patched live file the legacy copy, then the ``*.csv.backup_ru``
+    sibling is used, unless it is patched too.
+
+    Args:
+        game_path: Root directory of the game.
+        skipped: If given, relpaths of patched files without an original
+            are appended here.
+    """
+    legacy = game_path / LEGACY_BACKUP_SUBDIR
+    live_files = sorted((game_path / "localization").glob("*.csv"))
+    if (game_path / FONT_FILE).is_file():
+        live_files.append(game_path / FONT_FILE)
+
+    for live in live_files:
+        rel = live.relative_to(game_path).as_posix()
+        if not looks_patched(rel, live):
+            yield rel, live
+            continue
+        candidates = [
+            legacy / rel,
+            live.with_name(live.name + LEGACY_SUFFIX),
+        ]
+        source = next(
+            (p for p in candidates if p.is_file() and not looks_patched(rel, p)),
+            None,
+        )
+        if source is not None:
+            yield rel, source
+        elif skipped is not None:
+            skipped.append(rel)
+
+
+def snapshot(
+    store: Path,
+    version: str,
+    sources: Iterator[tuple[str, Path]],
+    codec: str = "zlib",
+) -> tuple[dict[str, dict], int]:
+    """Store every source file and write the manifest for ``version``.
+
+    Returns:
+        ``(manifest_files, new_objects)``.
+    """
+    files: dict[str, dict] = {}
+    new_objects = 0
+    for rel, source in sources:
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if _find_object(store, digest) is None:
+            put_object(store, data, codec)
+            new_objects += 1
+        files[rel] = {"sha256": digest, "size": len(data)}
+    write_manifest(store, version, files)
+    return files, new_objects
+
+
+def restore(
+    store: Path,
+    game_path: Path,
+    files: dict[str, dict],
+    *,
+    dry_run: bool = False,
+) -> tuple[list[str], int]:
+    """Put back every file whose current contents differ from the manifest.
+
+    Files with matching size are hashed before being considered unchanged.
+    Each restored file is verified against the manifest hash and written
+    through a temp file plus atomic rename.
+
+    Returns:
+        ``(restored_relpaths, unchanged_count)``.
+    """
+    restored: list[str] = []
+    unchanged = 0
+    for rel, entry in sorted(files.items()):
+        target = game_path / rel
+        if (
+            target.is_file()
+            and target.stat().st_size == entry["size"]
+            and file_digest(target) == entry["sha256"]
+        ):
+            unchanged += 1
+            continue
+        if not dry_run:
+            _atomic_write(target, get_object(store, entry["sha256"]))
+        restored.append(rel)
+    return restored, unchanged
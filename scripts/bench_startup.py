@@ -0,0 +1,102 @@
+"""Startup-time budget check for patch.py.
+
+Runs a no-op invocation (``patch.py --help`` by default) several times,
+takes the median wall-clock time and fails if it exceeds the budget. A
+``python -X importtime`` run lists the slowest imports so a regression
+can be traced to the module that caused it.
+
+Usage::
+
+    python scripts/bench_startup.py
+    python scripts/bench_startup.py --budget 80 -- stats
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PATCH_PY = Path(__file__).resolve().parent / "patch.py"
+DEFAULT_BUDGET_MS = 100.0
+DEFAULT_RUNS = 15
+
+
+def wall_times(cmd: list[str], runs: int) -> list[float]:
+    """Run ``cmd`` ``runs`` times and return wall-clock times in ms."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def slowest_imports(cmd: list[str], top: int) -> list[tuple[int, int, str]]:
+    """Return ``(cumulative_us, self_us, module)`` for the slowest imports."""
+    proc = subprocess.run(
+        [cmd[0], "-X", "importtime", *cmd[1:]],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), int(self_us), name.rstrip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Median wall-clock budget in ms (default: {DEFAULT_BUDGET_MS:g})",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=DEFAULT_RUNS,
+        help=f"Number of timed runs (default: {DEFAULT_RUNS})",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="Number of slowest imports to list (default: 10)",
+    )
+    parser.add_argument(
+        "args",
+        nargs="*",
+        default=["--help"],
+        help="patch.py arguments (default: --help)",
+    )
+    args = parser.parse_args()
+
+    cmd = [sys.executable, str(PATCH_PY), *args.args]
+    baseline = statistics.median(wall_times([sys.executable, "-c", "pass"], args.runs))
+    median = statistics.median(wall_times(cmd, args.runs))
+
+    print(f"patch.py {' '.join(args.args)}")
+    print(f"  interpreter:  {baseline:7.1f} ms")
+    print(f"  median:       {median:7.1f} ms  (budget {args.budget:g} ms)")
+    print(f"  patch.py own: {median - baseline:7.1f} ms")
+    print()
+    print(f"{'cumulative us':>14} {'self us':>9}  module")
+    for cumulative, self_us, name in slowest_imports(cmd, args.top):
+        print(f"{cumulative:>14} {self_us:>9}  {name}")
+
+    if median > args.budget:
+        print(f"\nFAIL: {median:.1f} ms > {args.budget:g} ms")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
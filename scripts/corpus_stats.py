@@ -0,0 +1,217 @@
+"""Length statistics of translations for ``patch.py stats --detailed``.
+
+All translated rows of the corpus are loaded once into NumPy arrays;
+visible lengths, line counts and translation/EN ratios are computed over
+the whole corpus at once, then summarised per file and per file category.
+Outliers are rows whose log ratio has a robust z-score (median/MAD,
+Iglewicz-Hoaglin) above :data:`OUTLIER_Z` within their category.
+"""
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from csv_io import is_data_row, is_translated, read_header, scan_csv
+from fix_linebreaks import TAG_PATTERN
+from lint_rules import MIN_LENGTH_FOR_CHECK, file_category
+
+OUTLIER_Z = 3.5
+# Scales the MAD to the standard deviation of a normal distribution.
+MAD_SCALE = 0.6745
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def require_numpy() -> None:
+    """Raise ``RuntimeError`` if numpy (>= 2.0, for ``numpy.strings``) is missing."""
+    if np is None or not hasattr(np, "strings"):
+        raise RuntimeError("для этой команды нужен numpy >= 2.0: pip install numpy")
+
+
+def text_metrics(texts: "np.ndarray") -> dict[str, "np.ndarray"]:
+    """Per-text counts computed with vectorized ``numpy.strings`` calls.
+
+    Returns:
+        ``visible`` (characters without tags and '#'), ``hashes`` (all
+        '#'), ``pages`` ('##') and ``lines`` (segments of a '#' split).
+    """
+    tags = np.array(
+        [len(TAG_PATTERN.findall(t)) for t in texts.tolist()], dtype=int
+    )
+    hashes = np.strings.count(texts, "#")
+    return {
+        "visible": np.strings.str_len(texts) - 3 * tags - hashes,
+        "hashes": hashes,
+        "pages": np.strings.count(texts, "##"),
+        "lines": hashes + 1,
+    }
+
+
+@dataclass
+class LengthTable:
+    """Translated rows of the corpus as parallel arrays.
+
+    Attributes:
+        files: Distinct file names; ``file`` indexes into it.
+        categories: Distinct categories; ``category`` indexes into it.
+        file: File index per row.
+        category: Category index per row.
+        line: 1-based line per row.
+        en_visible, dst_visible: Visible characters.
+        en_lines, dst_lines: Lines after splitting on '#'.
+        ratio: ``dst_visible / en_visible`` (NaN for EN shorter than
+            ``MIN_LENGTH_FOR_CHECK``).
+        z: Robust z-score of ``log(ratio)`` within the row's category.
+    """
+
+    files: list[str]
+    categories: list[str]
+    file: "np.ndarray"
+    category: "np.ndarray"
+    line: "np.ndarray"
+    en_visible: "np.ndarray"
+    dst_visible: "np.ndarray"
+    en_lines: "np.ndarray"
+    dst_lines: "np.ndarray"
+    ratio: "np.ndarray"
+    z: "np.ndarray"
+
+
+def robust_z(values: "np.ndarray", groups: "np.ndarray") -> "np.ndarray":
+    """Robust z-score of ``values`` within each group; NaN stays NaN."""
+    z = np.full(values.shape, np.nan)
+    for g in np.unique(groups):
+        mask = (groups == g) & ~np.isnan(values)
+        if mask.sum() < 3:
+            continue
+        x = values[mask]
+        median = np.median(x)
+        mad = np.median(np.abs(x - median))
+        if mad == 0:
+            continue
+        z[mask] = MAD_SCALE * (x - median) / mad
+    return z
+
+
+def load(
+    csv_files: list[Path], targets: Sequence[str] = ("ZHS",)
+) -> dict[str, LengthTable]:
+    """Read translated rows (target non-empty and not equal to EN).
+
+    Each file is scanned once, projecting every target present in its
+    header; the rows are then split into one table per target.
+
+    Returns:
+        :class:`LengthTable` per target, in the order of ``targets``.
+    """
+    require_numpy()
+    rows: dict[str, list[tuple[str, int, str, str]]] = {t: [] for t in targets}
+    for path in csv_files:
+        header = read_header(path)
+        present = [t for t in targets if t in header]
+        if not present:
+            continue
+        for row in scan_csv(path, ("ID", "EN", *present)):
+            if not is_data_row(row.cells):
+                continue
+            en = row.cells[1]
+            for target, dst in zip(present, row.cells[2:]):
+                if is_translated(en, dst):
+                    rows[target].append((path.name, row.line, en, dst))
+    return {target: _length_table(rows[target]) for target in targets}
+
+
+def _length_table(rows: list[tuple[str, int, str, str]]) -> LengthTable:
+    """Build a :class:`LengthTable` from ``(file, line, EN, target)`` rows."""
+    files: list[str] = []
+    categories: list[str] = []
+    file_idx, cat_idx, lines, en, dst = [], [], [], [], []
+    for name, line, en_text, dst_text in rows:
+        if not files or files[-1] != name:
+            files.append(name)
+            category = file_category(name)
+            if category not in categories:
+                categories.append(category)
+        file_idx.append(len(files) - 1)
+        cat_idx.append(categories.index(category))
+        lines.append(line)
+        en.append(en_text)
+        dst.append(dst_text)
+
+    en_m = text_metrics(np.array(en, dtype=str))
+    dst_m = text_metrics(np.array(dst, dtype=str))
+    category = np.array(cat_idx, dtype=int)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(
+            en_m["visible"] >= MIN_LENGTH_FOR_CHECK,
+            dst_m["visible"] / en_m["visible"],
+            np.nan,
+        )
+    return LengthTable(
+        files=files,
+        categories=categories,
+        file=np.array(file_idx, dtype=int),
+        category=category,
+        line=np.array(lines, dtype=int),
+        en_visible=en_m["visible"],
+        dst_visible=dst_m["visible"],
+        en_lines=en_m["lines"],
+        dst_lines=dst_m["lines"],
+        ratio=ratio,
+        z=robust_z(np.log(ratio), category),
+    )
+
+
+def summarize(table: LengthTable, mask: "np.ndarray") -> dict:
+    """Distribution summary of the rows selected by ``mask``."""
+    ratio = table.ratio[mask]
+    ratio = ratio[~np.isnan(ratio)]
+    q = (
+        np.quantile(ratio, QUANTILES).round(3).tolist()
+        if len(ratio) else [None] * len(QUANTILES)
+    )
+    z = table.z[mask]
+    return {
+        "rows": int(mask.sum()),
+        "ratio_rows": int(len(ratio)),
+        "ratio_mean": round(float(ratio.mean()), 3) if len(ratio) else None,
+        **{f"ratio_p{round(p * 100)}": v for p, v in zip(QUANTILES, q)},
+        "en_visible_mean": round(float(table.en_visible[mask].mean()), 1),
+        "visible_mean": round(float(table.dst_visible[mask].mean()), 1),
+        "en_lines_mean": round(float(table.en_lines[mask].mean()), 2),
+        "lines_mean": round(float(table.dst_lines[mask].mean()), 2),
+        "lines_max": int(table.dst_lines[mask].max()),
+        "outliers": int((np.abs(z[~np.isnan(z)]) > OUTLIER_Z).sum()),
+    }
+
+
+def report(table: LengthTable, top: int = 20) -> dict:
+    """Per-category and per-file summaries plus the strongest outliers."""
+    outliers = np.flatnonzero(np.nan_to_num(np.abs(table.z)) > OUTLIER_Z)
+    outliers = outliers[np.argsort(-np.abs(table.z[outliers]))][:top]
+    return {
+        "categories": {
+            name: summarize(table, table.category == i)
+            for i, name in enumerate(table.categories)
+        },
+        "files": {
+            name: summarize(table, table.file == i)
+            for i, name in enumerate(table.files)
+        },
+        "outliers": [
+            {
+                "file": table.files[table.file[i]],
+                "line": int(table.line[i]),
+                "category": table.categories[table.category[i]],
+                "ratio": round(float(table.ratio[i]), 3),
+                "z": round(float(table.z[i]), 2),
+                "en_visible": int(table.en_visible[i]),
+                "visible": int(table.dst_visible[i]),
+            }
+            for i in outliers
+        ],
+    }
@@ -0,0 +1,319 @@
+"""CSV I/O for the localization files.
+
+``read_csv``/``write_csv`` load and save whole files. ``scan_csv`` is a
+streaming reader for read-only passes: it runs ``csv.reader`` over the
+decoded file, keeps only the requested columns of each record and adds
+the record's line and byte offset, so an edit can be spliced back.
+``split_records`` cuts a file into raw records, ``parse_record`` decodes
+one record at a known offset and ``splice_cells`` rewrites single cells,
+for byte-preserving edits; ``splice_file`` saves such edits atomically.
+"""
+
+import codecs
+import csv
+import io
+import itertools
+import os
+import re
+import shutil
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+ENCODING = "utf-8-sig"
+
+# Excel dialect, non-strict, as used by ``csv.reader``: a quote opens a
+# quoted field only at the start of a field, "" inside it is a literal
+# quote, and text after the closing quote is kept up to the delimiter.
+_FIELD = rb'(?:"[^"]*(?:""[^"]*)*"[^,\r\n]*|(?!")[^,\r\n]*)'
+_EOL = rb"(?:\r\n|\n|\r|\Z)"
+
+_ANY_RECORD_RE = re.compile(_FIELD + rb"(?:," + _FIELD + rb")*" + _EOL)
+_FIELD_RE = re.compile(_FIELD)
+
+
+class ScanRow(NamedTuple):
+    """A record from :func:`scan_csv`.
+
+    Attributes:
+        line: 1-based physical line where the record starts.
+        offset: Byte offset of the record start (after the BOM).
+        cells: Decoded values of the projected columns, in request order.
+    """
+
+    line: int
+    offset: int
+    cells: tuple[str, ...]
+
+
+class CsvScanError(ValueError):
+    """A record that cannot be split into fields."""
+
+    def __init__(self, name: str, line: int, offset: int, message: str):
+        super().__init__(f"{name}:{line} (байт {offset}): {message}")
+        self.name = name
+        self.line = line
+        self.offset = offset
+
+
+def read_csv(path: Path) -> list[list[str]]:
+    """Read a CSV file with UTF-8 BOM encoding.
+
+    Args:
+        path: Path to the CSV file.
+
+    Returns:
+        List of rows, each row is a list of column values.
+    """
+    with path.open(encoding=ENCODING, newline="") as f:
+        return list(csv.reader(f))
+
+
+def write_csv(path: Path, rows: list[list[str]]) -> None:
+    """Write rows to a CSV file with UTF-8 BOM encoding.
+
+    Args:
+        path: Destination path.
+        rows: List of rows to write.
+    """
+    with path.open("w", encoding=ENCODING, newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+def read_header(path: Path) -> list[str]:
+    """Return the column names from the first line of a CSV file."""
+    with path.open(encoding=ENCODING, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def is_data_row(row: Sequence[str]) -> bool:
+    """Row has a numeric ID → contains translatable content."""
+    return bool(row and row[0].strip().isdigit())
+
+
+def is_translated(en: str, text: str) -> bool:
+    """Target cell is non-empty and differs from EN (ignoring edge spaces)."""
+    text = text.strip()
+    return bool(text) and text != en.strip()
+
+
+RowKey = tuple[str, int]
+
+
+def data_row_keys(
+    rows: Iterable[Sequence[str]],
+) -> Iterator[tuple[int, RowKey]]:
+    """Yield ``(row_index, (ID, occurrence))`` for every data row.
+
+    IDs repeat inside conversation files (``gossip_*.csv``), so a row is
+    identified by its ID plus how many earlier data rows had the same ID.
+    The key survives edits to other rows and insertions of rows with other
+    IDs.
+    """
+    seen: dict[str, int] = {}
+    for index, row in enumerate(rows):
+        if not is_data_row(row):
+            continue
+        row_id = row[0].strip()
+        occurrence = seen.get(row_id, 0)
+        seen[row_id] = occurrence + 1
+        yield index, (row_id, occurrence)
+
+
+def split_records(data: bytes, name: str = "") -> list[bytes]:
+    """Split CSV bytes (BOM removed) into raw records.
+
+    Each record keeps its line ending; a quoted field may span lines.
+    Concatenating the result gives back ``data``.
+
+    Raises:
+        CsvScanError: On an unterminated quoted field.
+    """
+    records = []
+    pos, line_no, size = 0, 1, len(data)
+    while pos < size:
+        m = _ANY_RECORD_RE.match(data, pos)
+        if m is None:
+            raise CsvScanError(name, line_no, pos, "незакрытая кавычка")
+        records.append(m[0])
+        line_no += m[0].count(b"\n")
+        pos = m.end()
+    return records
+
+
+def parse_record(data: bytes, offset: int) -> list[str]:
+    """Decode the whole record starting at byte ``offset`` of ``data``.
+
+    ``data`` may be a ``bytes`` object or an ``mmap``; ``offset`` counts
+    from the start of ``data``, so add the BOM length to a
+    :attr:`ScanRow.offset` when the BOM is still in place.
+
+    Raises:
+        CsvScanError: On an unterminated quoted field.
+        UnicodeDecodeError: If the record is not valid UTF-8.
+    """
+    m = _ANY_RECORD_RE.match(data, offset)
+    if m is None:
+        raise CsvScanError("", 0, offset, "незакрытая кавычка")
+    text = m[0].decode("utf-8")
+    return next(csv.reader(io.StringIO(text, newline="")), [])
+
+
+def scan_csv(
+    path: Path,
+    columns: Sequence[str],
+    *,
+    errors: list[CsvScanError] | None = None,
+) -> Iterator[ScanRow]:
+    """Stream records of a localization CSV, projecting ``columns``.
+
+    The UTF-8 BOM is skipped, quoted fields may span several lines, and
+    records are split exactly as ``csv.reader`` over a ``utf-8-sig`` file
+    with ``newline=""`` splits them. Blank lines and records too short to
+    contain every projected column are skipped. Files whose header lacks
+    one of ``columns`` yield nothing.
+
+    Args:
+        path: CSV file to scan.
+        columns: Header names to project, e.g. ``("ID", "EN", "ZHS")``.
+        errors: If given, malformed records are appended here and skipped;
+            otherwise the first one raises.
+
+    Yields:
+        :class:`ScanRow` for every well-formed record after the header.
+
+    Raises:
+        CsvScanError: On a malformed record when ``errors`` is ``None``.
+    """
+    data = path.read_bytes()
+    if data.startswith(codecs.BOM_UTF8):
+        data = data[len(codecs.BOM_UTF8):]
+    try:
+        text = data.decode("utf-8")
+        check_utf8 = False
+    except UnicodeDecodeError:
+        # Undecodable bytes become lone surrogates; only projected cells
+        # that contain one are reported.
+        text = data.decode("utf-8", errors="surrogateescape")
+        check_utf8 = True
+    # Byte offset of every physical line; csv.reader and bytes.splitlines
+    # both break lines at \r\n, \n and \r only.
+    starts = list(
+        itertools.accumulate(map(len, data.splitlines(True)), initial=0)
+    )
+    last_line = len(starts) - 1
+
+    def fail(line: int, message: str) -> None:
+        err = CsvScanError(path.name, line, starts[line - 1], message)
+        if errors is None:
+            raise err
+        errors.append(err)
+
+    reader = csv.reader(io.StringIO(text, newline=""))
+    header = next(reader, [])
+    if reader.line_num == last_line and _ANY_RECORD_RE.match(data) is None:
+        fail(1, "незакрытая кавычка")
+        return
+    if any(c not in header for c in columns):
+        return
+    indices = [header.index(c) for c in columns]
+    width = max(indices)
+
+    prev = reader.line_num
+    for row in reader:
+        line, prev = prev + 1, reader.line_num
+        # An unterminated quote swallows the rest of the file.
+        if (
+            prev == last_line
+            and _ANY_RECORD_RE.match(data, starts[line - 1]) is None
+        ):
+            fail(line, "незакрытая кавычка")
+            return
+        if len(row) <= width:
+            continue
+        cells = tuple([row[i] for i in indices])
+        if check_utf8 and not all(c.isascii() or _is_utf8(c) for c in cells):
+            fail(line, "неверная кодировка UTF-8")
+            continue
+        yield ScanRow(line, starts[line - 1], cells)
+
+
+def _is_utf8(text: str) -> bool:
+    """``text`` holds no surrogates left by ``surrogateescape``."""
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def encode_field(value: str) -> bytes:
+    """Encode one cell as ``csv.writer`` does (QUOTE_MINIMAL)."""
+    if any(c in value for c in ',"\r\n'):
+        value = '"' + value.replace('"', '""') + '"'
+    return value.encode("utf-8")
+
+
+def splice_cells(
+    data: bytes, edits: Mapping[int, Mapping[int, str]]
+) -> bytes:
+    """Replace single cells in CSV bytes, leaving every other byte as is.
+
+    Args:
+        data: File content after the BOM.
+        edits: ``{record offset: {column index: new value}}``; offsets as
+            in :attr:`ScanRow.offset`. Missing trailing fields are added.
+
+    Returns:
+        The edited content.
+    """
+    parts: list[bytes] = []
+    pos = 0
+    for offset in sorted(edits):
+        columns = edits[offset]
+        parts.append(data[pos:offset])
+        spans: list[tuple[int, int]] = []
+        field_pos = offset
+        while True:
+            m = _FIELD_RE.match(data, field_pos)
+            spans.append(m.span())
+            if data[m.end():m.end() + 1] != b",":
+                break
+            field_pos = m.end() + 1
+        cursor = offset
+        for index in sorted(columns):
+            if index < len(spans):
+                start, end = spans[index]
+                parts.append(data[cursor:start])
+                parts.append(encode_field(columns[index]))
+                cursor = end
+        parts.append(data[cursor:spans[-1][1]])
+        extra = [i for i in sorted(columns) if i >= len(spans)]
+        if extra:
+            fields = [b""] * (extra[-1] - len(spans) + 1)
+            for i in extra:
+                fields[i - len(spans)] = encode_field(columns[i])
+            parts.append(b"," + b",".join(fields))
+        pos = spans[-1][1]
+    parts.append(data[pos:])
+    return b"".join(parts)
+
+
+def splice_file(path: Path, edits: Mapping[int, Mapping[int, str]]) -> None:
+    """Apply :func:`splice_cells` to a file in place, keeping its BOM.
+
+    The result goes to a temp file in the same directory that is then
+    renamed over ``path``, so an interrupted save leaves the old file.
+    """
+    data = path.read_bytes()
+    bom = codecs.BOM_UTF8 if data.startswith(codecs.BOM_UTF8) else b""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(bom + splice_cells(data[len(bom):], edits))
+        shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
@@ -0,0 +1,666 @@
+"""Terminal editor for ``patch.py edit``.
+
+One CSV is shown as a list of rows, EN and the translation side by side,
+with a detail pane for the selected row: both texts split at ``#`` breaks,
+the other rows of its conversation (rows sharing an ID, as in
+``gossip_*.csv``) and its lint issues. The list can be filtered to
+untranslated rows or rows with errors or overlong lines. An edit is validated on every
+keystroke with the lint rules of the file's category plus the line width
+``fix_linebreaks.py`` wraps to.
+
+Opening a file scans only its IDs and record offsets. Cells are decoded a
+page at a time when a page is first shown, and only a few pages are kept.
+Saving splices the edited target cells into the file bytes
+(:func:`csv_io.splice_file`): every other byte, the BOM and the quoting of
+untouched rows stay as they were, and the file is replaced atomically.
+"""
+
+import codecs
+import locale
+import mmap
+import os
+import textwrap
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+try:
+    import curses
+except ImportError:  # Windows without windows-curses
+    curses = None
+
+from csv_io import (
+    RowKey,
+    is_data_row,
+    parse_record,
+    read_header,
+    scan_csv,
+    splice_file,
+)
+from fix_linebreaks import get_max_vis, scaled_max_vis, vis_len
+from lint_rules import Issue, LintEngine, file_category
+
+PAGE_SIZE = 100
+CACHED_PAGES = 8
+# Conversation rows shown before and after the selected one.
+CONTEXT_ROWS = 3
+
+
+class Filter(Enum):
+    """Rows listed by the editor."""
+
+    ALL = "all"
+    UNTRANSLATED = "untranslated"
+    ISSUES = "issues"
+
+
+FILTER_LABELS = {
+    Filter.ALL: "все строки",
+    Filter.UNTRANSLATED: "без перевода",
+    Filter.ISSUES: "с ошибками",
+}
+
+
+class FileChangedError(RuntimeError):
+    """The file changed on disk since it was scanned."""
+
+
+def require_curses() -> None:
+    """Raise ``RuntimeError`` if curses is missing."""
+    if curses is None:
+        raise RuntimeError(
+            "для редактора нужен curses; в Windows: pip install windows-curses"
+        )
+
+
+@dataclass(frozen=True)
+class RowRef:
+    """Where a data row is: found by the initial scan."""
+
+    line: int
+    offset: int  # after the BOM, as in ScanRow.offset
+    row_id: str
+
+
+@dataclass(frozen=True)
+class Cells:
+    """Decoded cells of a row, as stored in the file."""
+
+    en: str
+    text: str
+    comments: str
+
+
+def is_untranslated(en: str, text: str) -> bool:
+    """Target cell is empty or still the EN text."""
+    return not text.strip() or text.strip() == en.strip()
+
+
+class Document:
+    """A CSV open for editing one target column.
+
+    Attributes:
+        rows: Every data row in file order.
+        conversations: ``ID → indices into rows`` of rows sharing the ID.
+        edits: ``row index → new target text`` not yet saved.
+        max_vis: Line width limit of the file for the target, if any.
+    """
+
+    def __init__(
+        self, path: Path, target: str = "ZHS", engine: LintEngine | None = None
+    ):
+        """Scan ``path``.
+
+        Raises:
+            ValueError: If the file has no EN or ``target`` column.
+            CsvScanError: On a malformed record.
+        """
+        header = read_header(path)
+        if "EN" not in header or target not in header:
+            raise ValueError(f"{path.name}: нет колонки EN или {target}")
+        self.path = path
+        self.target = target
+        self._en_idx = header.index("EN")
+        self._dst_idx = header.index(target)
+        self._comments_idx = (
+            header.index("Comments") if "Comments" in header else None
+        )
+        self.engine = engine or LintEngine.from_registry()
+        self.rules = self.engine.rules_for(file_category(path.name))
+        max_vis = get_max_vis(path.name)
+        self.max_vis = scaled_max_vis(max_vis, target) if max_vis else None
+        self.edits: dict[int, str] = {}
+        self.reload()
+
+    def _stat(self) -> tuple[int, int]:
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def keys(self) -> list[RowKey]:
+        """``(ID, occurrence)`` of every row, as ``csv_io.data_row_keys``."""
+        seen: dict[str, int] = {}
+        keys = []
+        for ref in self.rows:
+            n = seen.get(ref.row_id, 0)
+            seen[ref.row_id] = n + 1
+            keys.append((ref.row_id, n))
+        return keys
+
+    def reload(self) -> int:
+        """Rescan the file, keeping unsaved edits by ``(ID, occurrence)``.
+
+        Returns:
+            Number of edits dropped because their row is gone.
+        """
+        old = self.keys() if self.edits else []
+        pending = {old[i]: text for i, text in self.edits.items()}
+        self._stamp = self._stat()
+        self.rows = [
+            RowRef(row.line, row.offset, row.cells[0].strip())
+            for row in scan_csv(self.path, ("ID",))
+            if is_data_row(row.cells)
+        ]
+        self.conversations: dict[str, list[int]] = {}
+        for i, ref in enumerate(self.rows):
+            self.conversations.setdefault(ref.row_id, []).append(i)
+        self._pages: OrderedDict[int, list[Cells]] = OrderedDict()
+        self._issues: dict[int, tuple[str, list[Issue]]] = {}
+
+        self.edits = {}
+        for i, key in enumerate(self.keys()):
+            if key in pending:
+                self.set_text(i, pending.pop(key))
+        return len(pending)
+
+    def _page(self, n: int) -> list[Cells]:
+        page = self._pages.get(n)
+        if page is not None:
+            self._pages.move_to_end(n)
+            return page
+        if self._stat() != self._stamp:
+            raise FileChangedError(f"{self.path.name} изменён на диске")
+
+        refs = self.rows[n * PAGE_SIZE:(n + 1) * PAGE_SIZE]
+        with self.path.open("rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as data:
+            bom = len(codecs.BOM_UTF8) if data[:3] == codecs.BOM_UTF8 else 0
+            page = [
+                self._to_cells(parse_record(data, bom + ref.offset))
+                for ref in refs
+            ]
+        self._pages[n] = page
+        if len(self._pages) > CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def _to_cells(self, record: list[str]) -> Cells:
+        def cell(index: int | None) -> str:
+            return record[index] if index is not None and index < len(record) else ""
+
+        return Cells(
+            cell(self._en_idx), cell(self._dst_idx), cell(self._comments_idx)
+        )
+
+    def cells(self, i: int) -> Cells:
+        """Cells of row ``i`` as saved; loads its page on first use.
+
+        Raises:
+            FileChangedError: If the page must be read and the file changed.
+        """
+        return self._page(i // PAGE_SIZE)[i % PAGE_SIZE]
+
+    def text(self, i: int) -> str:
+        """Current target text of row ``i``, edited or saved."""
+        edited = self.edits.get(i)
+        return self.cells(i).text if edited is None else edited
+
+    def set_text(self, i: int, text: str) -> None:
+        """Edit row ``i``; setting the saved text back drops the edit."""
+        if text == self.cells(i).text:
+            self.edits.pop(i, None)
+        else:
+            self.edits[i] = text
+
+    def issues(self, i: int, text: str | None = None) -> list[Issue]:
+        """Lint and line-width issues of row ``i`` with ``text`` as target.
+
+        Untranslated rows have no issues. Results for the current text are
+        cached.
+        """
+        if text is None:
+            text = self.text(i)
+        cached = self._issues.get(i)
+        if cached is not None and cached[0] == text:
+            return cached[1]
+
+        c = self.cells(i)
+        issues: list[Issue] = []
+        if not is_untranslated(c.en, text):
+            issues = self.engine.check_row(
+                self.rules, {"EN": c.en, self.target: text}, c.comments,
+                dst=self.target,
+            )
+            if self.max_vis:
+                for n, line in enumerate(text.split("#"), 1):
+                    if vis_len(line) > self.max_vis:
+                        issues.append(Issue(
+                            "width", "warning",
+                            f"строка {n}: {vis_len(line)} > {self.max_vis} символов",
+                        ))
+        self._issues[i] = (text, issues)
+        return issues
+
+    def view(self, flt: Filter) -> list[int]:
+        """Indices of the rows ``flt`` lists; reads every page but ``ALL``.
+
+        ``ISSUES`` lists rows with lint errors or lines over the width
+        limit; other warnings (e.g. ``breaks``, which fix_linebreaks.py
+        rewraps away) are shown in the detail pane only.
+        """
+        if flt is Filter.ALL:
+            return list(range(len(self.rows)))
+        if flt is Filter.UNTRANSLATED:
+            return [
+                i for i in range(len(self.rows))
+                if is_untranslated(self.cells(i).en, self.text(i))
+            ]
+        return [
+            i for i in range(len(self.rows))
+            if any(
+                issue.severity == "error" or issue.rule == "width"
+                for issue in self.issues(i)
+            )
+        ]
+
+    def find(self, view: list[int], start: int, query: str) -> int | None:
+        """Position in ``view`` of the next row from ``start`` (wrapping)
+        whose ID, EN or target contains ``query``, case-insensitively."""
+        query = query.casefold()
+        for k in range(len(view)):
+            pos = (start + k) % len(view)
+            i = view[pos]
+            if any(
+                query in s.casefold()
+                for s in (self.rows[i].row_id, self.cells(i).en, self.text(i))
+            ):
+                return pos
+        return None
+
+    def save(self) -> int:
+        """Splice the edits into the file and rescan it.
+
+        Returns:
+            Number of cells written.
+
+        Raises:
+            FileChangedError: If the file changed since the last scan; the
+                edits are kept (see :meth:`reload`).
+        """
+        if not self.edits:
+            return 0
+        if self._stat() != self._stamp:
+            raise FileChangedError(f"{self.path.name} изменён на диске")
+        splice_file(self.path, {
+            self.rows[i].offset: {self._dst_idx: text}
+            for i, text in self.edits.items()
+        })
+        written = len(self.edits)
+        self.edits = {}
+        self.reload()
+        return written
+
+
+# ── terminal UI ─────────────────────────────────────────────────────────
+
+HELP = (
+    "↑↓ PgUp PgDn  Enter правка  u отмена правки  f фильтр  "
+    "/ поиск  n дальше  s сохранить  q выход"
+)
+ENTER_KEYS = ("\n", "\r")
+BACKSPACE_KEYS = ("\x7f", "\b")
+ESCAPE = "\x1b"
+
+
+def _flat(text: str) -> str:
+    return text.replace("\r", " ").replace("\n", " ")
+
+
+def _clip(text: str, width: int) -> str:
+    """``text`` on one line, cut with ``…`` or padded to ``width``."""
+    text = _flat(text)
+    if width <= 0:
+        return ""
+    if len(text) > width:
+        return text[:width - 1] + "…"
+    return text.ljust(width)
+
+
+def _game_lines(text: str, width: int) -> list[str]:
+    """``text`` split at ``#`` breaks, each line wrapped to ``width``."""
+    lines: list[str] = []
+    for part in _flat(text).split("#"):
+        lines.extend(textwrap.wrap(part, max(width, 1)) or [""])
+    return lines
+
+
+class Editor:
+    """curses front end of a :class:`Document`."""
+
+    def __init__(self, screen, doc: Document, flt: Filter = Filter.ALL):
+        self.screen = screen
+        self.doc = doc
+        self.filter = flt
+        self.view = doc.view(flt)
+        self.pos = 0
+        self.top = 0
+        self.query = ""
+        self.message = ""
+        self.saved = 0
+        self.colours = {"error": curses.A_BOLD, "warning": curses.A_BOLD,
+                        "edited": curses.A_BOLD, "context": curses.A_DIM}
+        if curses.has_colors():
+            curses.use_default_colors()
+            for n, (name, colour) in enumerate((
+                ("error", curses.COLOR_RED),
+                ("warning", curses.COLOR_YELLOW),
+                ("edited", curses.COLOR_GREEN),
+                ("context", curses.COLOR_CYAN),
+            ), 1):
+                curses.init_pair(n, colour, -1)
+                self.colours[name] = curses.color_pair(n)
+
+    # Drawing
+
+    def _put(self, y: int, x: int, text: str, attr: int = 0) -> None:
+        try:
+            self.screen.addstr(y, x, text, attr)
+        except curses.error:  # the bottom-right cell cannot be written
+            pass
+
+    def _layout(self) -> tuple[int, int, int]:
+        """``(list height, detail pane top, detail pane height)``."""
+        height, _ = self.screen.getmaxyx()
+        detail = max(6, (height - 2) * 2 // 5)
+        list_h = max(1, height - 3 - detail)
+        return list_h, 1 + list_h, height - 2 - list_h
+
+    def _scroll(self, list_h: int) -> None:
+        self.pos = max(0, min(self.pos, len(self.view) - 1))
+        if self.pos < self.top:
+            self.top = self.pos
+        elif self.pos >= self.top + list_h:
+            self.top = self.pos - list_h + 1
+
+    def draw(self, preview: str | None = None) -> None:
+        """Redraw everything; ``preview`` is the text being edited."""
+        doc = self.doc
+        height, width = self.screen.getmaxyx()
+        list_h, detail_y, detail_h = self._layout()
+        self._scroll(list_h)
+        self.screen.erase()
+
+        status = (
+            f" {doc.path.name} · {doc.target} · {FILTER_LABELS[self.filter]}"
+            f" · {self.pos + 1 if self.view else 0}/{len(self.view)}"
+            f" · правок: {len(doc.edits)}"
+        )
+        self._put(0, 0, _clip(status, width), curses.A_REVERSE)
+
+        half = max(1, (width - 18) // 2)
+        for k in range(list_h):
+            pos = self.top + k
+            if pos >= len(self.view):
+                break
+            i = self.view[pos]
+            ref = doc.rows[i]
+            en, text = doc.cells(i).en, doc.text(i)
+            issues = doc.issues(i)
+            if i in doc.edits:
+                mark, attr = "*", self.colours["edited"]
+            elif any(s.severity == "error" for s in issues):
+                mark, attr = "!", self.colours["error"]
+            elif issues:
+                mark, attr = "!", self.colours["warning"]
+            elif is_untranslated(en, text):
+                mark, attr = "·", curses.A_DIM
+            else:
+                mark, attr = " ", 0
+            line = (
+                f"{mark}{ref.line:>5} {_clip(ref.row_id, 6)} "
+                f"{_clip(en, half)} │ {_clip(text, half)}"
+            )
+            if pos == self.pos:
+                attr |= curses.A_REVERSE
+            self._put(1 + k, 0, _clip(line, width), attr)
+
+        self._put(detail_y, 0, "─" * width, curses.A_DIM)
+        if self.view:
+            self._draw_detail(self.view[self.pos], preview, detail_y + 1,
+                              detail_h - 1, width)
+
+        footer, self.message = self.message or HELP, ""
+        self._put(height - 1, 0, _clip(footer, width - 1), curses.A_REVERSE)
+
+    def _draw_detail(
+        self, i: int, preview: str | None, y0: int, rows: int, width: int
+    ) -> None:
+        doc = self.doc
+        ref = doc.rows[i]
+        text = doc.text(i) if preview is None else preview
+        lines: list[tuple[str, int]] = []
+        for issue in doc.issues(i, text):
+            lines.append((
+                f"{'✖' if issue.severity == 'error' else '⚠'} "
+                f"[{issue.rule}] {issue.message}",
+                self.colours.get(issue.severity, curses.A_BOLD),
+            ))
+
+        half = max(1, (width - 3) // 2)
+        en_lines = _game_lines(doc.cells(i).en, half)
+        dst_lines = _game_lines(text, half)
+        for k in range(max(len(en_lines), len(dst_lines))):
+            left = en_lines[k] if k < len(en_lines) else ""
+            right = dst_lines[k] if k < len(dst_lines) else ""
+            lines.append((f"{_clip(left, half)} │ {right}", 0))
+
+        conversation = doc.conversations[ref.row_id]
+        if len(conversation) > 1:
+            k = conversation.index(i)
+            lines.append((
+                f"── разговор ID {ref.row_id}: реплика {k + 1} из "
+                f"{len(conversation)}",
+                curses.A_DIM,
+            ))
+            lo = max(0, k - CONTEXT_ROWS)
+            for j in conversation[lo:k + CONTEXT_ROWS + 1]:
+                current = j == i
+                other = text if current else doc.text(j)
+                lines.append((
+                    f"{'▶' if current else ' '} {_clip(doc.cells(j).en, half - 2)}"
+                    f" │ {other}",
+                    curses.A_BOLD if current else self.colours["context"],
+                ))
+
+        for k, (line, attr) in enumerate(lines[:rows]):
+            self._put(y0 + k, 0, _clip(line, width), attr)
+
+    # Input
+
+    def prompt(
+        self, label: str, initial: str = "", *, live: int | None = None
+    ) -> str | None:
+        """Read a line at the bottom; ``None`` on Esc.
+
+        With ``live`` set to a row index, the detail pane shows that row's
+        issues for the text as typed.
+        """
+        text, cur = initial, len(initial)
+        while True:
+            self.draw(text if live is not None else None)
+            height, width = self.screen.getmaxyx()
+            room = max(1, width - len(label) - 1)
+            start = max(0, cur - room + 1)
+            self._put(height - 1, 0, " " * (width - 1))
+            self._put(height - 1, 0, label, curses.A_BOLD)
+            self._put(height - 1, len(label), _flat(text[start:start + room]))
+            self.screen.move(height - 1, min(width - 1, len(label) + cur - start))
+
+            key = self.screen.get_wch()
+            if key in ENTER_KEYS or key == curses.KEY_ENTER:
+                return text
+            if key == ESCAPE:
+                return None
+            if key in BACKSPACE_KEYS or key == curses.KEY_BACKSPACE:
+                if cur:
+                    text, cur = text[:cur - 1] + text[cur:], cur - 1
+            elif key == curses.KEY_DC:
+                text = text[:cur] + text[cur + 1:]
+            elif key == curses.KEY_LEFT:
+                cur = max(0, cur - 1)
+            elif key == curses.KEY_RIGHT:
+                cur = min(len(text), cur + 1)
+            elif key in (curses.KEY_HOME, "\x01"):
+                cur = 0
+            elif key in (curses.KEY_END, "\x05"):
+                cur = len(text)
+            elif isinstance(key, str) and key.isprintable():
+                text, cur = text[:cur] + key + text[cur:], cur + 1
+
+    def edit(self) -> None:
+        i = self.view[self.pos]
+        text = self.prompt(f"{self.doc.target}> ", self.doc.text(i), live=i)
+        if text is not None:
+            self.doc.set_text(i, text)
+
+    def save(self) -> bool:
+        try:
+            n = self.doc.save()
+        except FileChangedError as e:
+            self.message = f"{e}: нажмите r, чтобы перечитать его с правками"
+            return False
+        except OSError as e:
+            self.message = f"не удалось сохранить: {e}"
+            return False
+        self.saved += n
+        self.message = f"сохранено ячеек: {n}"
+        return True
+
+    def reload(self) -> None:
+        current = self.view[self.pos] if self.view else 0
+        dropped = self.doc.reload()
+        self.view = self.doc.view(self.filter)
+        self.pos = min(
+            range(len(self.view)),
+            key=lambda p: abs(self.view[p] - current),
+            default=0,
+        )
+        self.message = "файл перечитан"
+        if dropped:
+            self.message += f"; потеряно правок (строк больше нет): {dropped}"
+
+    def set_filter(self, flt: Filter) -> None:
+        current = self.view[self.pos] if self.view else 0
+        self.filter = flt
+        self.view = self.doc.view(flt)
+        self.pos = next(
+            (p for p, i in enumerate(self.view) if i >= current), len(self.view) - 1
+        )
+
+    def search(self, query: str, start: int) -> None:
+        if not query or not self.view:
+            return
+        self.query = query
+        pos = self.doc.find(self.view, start, query)
+        if pos is None:
+            self.message = f"не найдено: {query}"
+        else:
+            self.pos = pos
+
+    def confirm_quit(self) -> bool:
+        self.message = (
+            f"Несохранённых правок: {len(self.doc.edits)}. s — сохранить и "
+            "выйти, q — выйти без сохранения, другая клавиша — назад"
+        )
+        self.draw()
+        key = self.screen.get_wch()
+        if key == "s":
+            return self.save()
+        return key == "q"
+
+    def handle(self, key) -> bool:
+        """Act on one key; ``False`` to quit."""
+        list_h, _, _ = self._layout()
+        filters = list(Filter)
+        if key in (curses.KEY_UP, "k"):
+            self.pos -= 1
+        elif key in (curses.KEY_DOWN, "j"):
+            self.pos += 1
+        elif key == curses.KEY_PPAGE:
+            self.pos -= list_h
+        elif key == curses.KEY_NPAGE:
+            self.pos += list_h
+        elif key in (curses.KEY_HOME, "g"):
+            self.pos = 0
+        elif key in (curses.KEY_END, "G"):
+            self.pos = len(self.view) - 1
+        elif key in (*ENTER_KEYS, curses.KEY_ENTER, "e") and self.view:
+            self.edit()
+        elif key == "u" and self.view:
+            self.doc.edits.pop(self.view[self.pos], None)
+        elif key == "f":
+            self.set_filter(filters[(filters.index(self.filter) + 1) % len(filters)])
+        elif key == "/":
+            query = self.prompt("поиск: ", self.query)
+            if query is not None:
+                self.search(query, self.pos)
+        elif key == "n":
+            self.search(self.query, self.pos + 1)
+        elif key == "s":
+            self.save()
+        elif key == "r":
+            self.reload()
+        elif key == "q":
+            return bool(self.doc.edits) and not self.confirm_quit()
+        return True
+
+    def run(self) -> int:
+        """Main loop; returns the number of cells saved."""
+        try:
+            curses.curs_set(1)
+        except curses.error:
+            pass
+        while True:
+            try:
+                self.draw()
+                if not self.handle(self.screen.get_wch()):
+                    return self.saved
+            except FileChangedError as e:
+                self.message = f"{e}: нажмите r, чтобы перечитать его с правками"
+                self.screen.erase()
+                self._put(0, 0, self.message)
+                self._put(1, 0, "r — перечитать, q — выйти без сохранения")
+                key = self.screen.get_wch()
+                if key == "q":
+                    return self.saved
+                self.reload()
+
+
+def run(path: Path, target: str = "ZHS", flt: Filter = Filter.ALL) -> int:
+    """Open ``path`` in the editor until the user quits.
+
+    Returns:
+        Number of cells saved.
+
+    Raises:
+        RuntimeError: If curses is missing.
+        ValueError: If the file lacks the EN or target column.
+    """
+    require_curses()
+    doc = Document(path, target)
+    # get_wch() and wide characters need the user's locale, not "C".
+    locale.setlocale(locale.LC_ALL, "")
+    # Esc cancels an edit; don't wait the default second for a sequence.
+    os.environ.setdefault("ESCDELAY", "25")
+    return curses.wrapper(lambda screen: Editor(screen, doc, flt).run())
@@ -0,0 +1,242 @@
+"""Grade EN changes for ``patch.py en-changes``.
+
+Rows are matched by ``(ID, occurrence)`` between an old and a new version
+of the localization files. For every row whose EN changed, the edit
+distance between the old and new EN (``#`` breaks, case and spacing
+ignored) is divided by the longer length and graded against the thresholds
+of the file's category:
+
+* ``cosmetic`` — typo or punctuation fix, the translation stays valid;
+* ``minor`` — small rewording, check the translation;
+* ``major`` — rewritten, translate again.
+
+A change to tags, ``%vars%`` or numbers is never cosmetic. Translated rows
+form the review queue, most severe first.
+"""
+
+import csv
+import io
+import re
+import subprocess
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from csv_io import ENCODING, data_row_keys
+from edit_distance import distance
+from lint_rules import TOKENIZERS, file_category
+
+# Highest distance/length ratio per grade: (cosmetic, minor). Short names
+# change meaning with a letter, long dialogue survives more rewording.
+GRADE_THRESHOLDS: dict[str, tuple[float, float]] = {
+    "names": (0.0, 0.2),
+    "ui": (0.05, 0.25),
+    "tooltip": (0.08, 0.3),
+    "description": (0.08, 0.3),
+    "narrative": (0.1, 0.35),
+    "dialogue": (0.1, 0.35),
+}
+DEFAULT_THRESHOLDS = (0.08, 0.3)
+NUMBER_RE = re.compile(r"\d+")
+
+Key = tuple[str, int]
+
+
+class Grade(Enum):
+    """How much an EN change affects the existing translation."""
+
+    COSMETIC = "cosmetic"
+    MINOR = "minor"
+    MAJOR = "major"
+
+
+GRADE_ORDER = {Grade.MAJOR: 0, Grade.MINOR: 1, Grade.COSMETIC: 2}
+
+
+@dataclass(frozen=True)
+class EnChange:
+    """One row whose EN changed."""
+
+    file: str
+    line: int
+    row_id: str
+    category: str
+    old_en: str
+    new_en: str
+    translation: str
+    distance: int
+    ratio: float
+    grade: Grade
+    tokens_changed: bool
+
+    @property
+    def translated(self) -> bool:
+        """The target cell is non-empty and is neither the old nor the new EN.
+
+        A row re-imported from the new EN build carries the new EN as its
+        "translation", so both versions count as untranslated.
+        """
+        dst = self.translation.strip()
+        return bool(dst) and dst not in (self.old_en.strip(), self.new_en.strip())
+
+
+@dataclass
+class ChangeReport:
+    """All graded changes plus rows that appeared or disappeared."""
+
+    changes: list[EnChange]
+    added: int
+    removed: int
+
+    def queue(self) -> list[EnChange]:
+        """Translated rows to review, most severe and largest change first."""
+        return sorted(
+            (c for c in self.changes if c.translated),
+            key=lambda c: (GRADE_ORDER[c.grade], -c.ratio, c.file, c.line),
+        )
+
+
+def normalize(text: str) -> str:
+    """EN as compared: ``#`` breaks, case and whitespace runs ignored."""
+    return " ".join(text.replace("#", " ").casefold().split())
+
+
+def _tokens(text: str) -> tuple:
+    return (
+        TOKENIZERS["tags"](text),
+        TOKENIZERS["vars"](text),
+        sorted(NUMBER_RE.findall(text)),
+    )
+
+
+def grade(old_en: str, new_en: str, category: str) -> tuple[int, float, Grade, bool]:
+    """Grade one EN change.
+
+    Returns:
+        ``(distance, ratio, grade, tokens_changed)``; ``distance`` is capped
+        just above the major threshold, so major ratios are lower bounds.
+    """
+    cosmetic, minor = GRADE_THRESHOLDS.get(category, DEFAULT_THRESHOLDS)
+    a, b = normalize(old_en), normalize(new_en)
+    longest = max(len(a), len(b), 1)
+    d = distance(a, b, bound=int(minor * longest))
+    ratio = d / longest
+    tokens_changed = _tokens(old_en) != _tokens(new_en)
+    if ratio > minor:
+        g = Grade.MAJOR
+    elif ratio > cosmetic or tokens_changed:
+        g = Grade.MINOR
+    else:
+        g = Grade.COSMETIC
+    return d, ratio, g, tokens_changed
+
+
+def _rows(data: bytes, target: str) -> dict[Key, tuple[int, str, str]]:
+    """``(ID, occurrence) → (line, EN, target)`` of a CSV file's bytes."""
+    reader = csv.reader(io.StringIO(data.decode(ENCODING), newline=""))
+    rows, lines = [], []
+    start = 1
+    for row in reader:
+        rows.append(row)
+        lines.append(start)
+        start = reader.line_num + 1
+    if not rows or "EN" not in rows[0]:
+        return {}
+    en_idx = rows[0].index("EN")
+    dst_idx = rows[0].index(target) if target in rows[0] else None
+    out = {}
+    for i, key in data_row_keys(rows):
+        row = rows[i]
+        en = row[en_idx] if en_idx < len(row) else ""
+        dst = row[dst_idx] if dst_idx is not None and dst_idx < len(row) else ""
+        out[key] = (lines[i], en, dst)
+    return out
+
+
+def read_dir(directory: Path) -> dict[str, bytes]:
+    """``{file name: bytes}`` of the CSVs in ``directory``."""
+    return {p.name: p.read_bytes() for p in sorted(directory.glob("*.csv"))}
+
+
+def read_revision(repo: Path, rev: str, subdir: str = "localization") -> dict[str, bytes]:
+    """``{file name: bytes}`` of ``subdir/*.csv`` at git revision ``rev``.
+
+    All blobs are read through one ``git cat-file --batch`` process.
+
+    Raises:
+        RuntimeError: If ``rev`` is unknown or git fails.
+    """
+    listing = subprocess.run(
+        ["git", "ls-tree", "--name-only", f"{rev}:{subdir}"],
+        cwd=repo,
+        capture_output=True,
+        text=True,
+    )
+    if listing.returncode != 0:
+        raise RuntimeError(listing.stderr.strip() or f"git ls-tree {rev}")
+    names = [n for n in listing.stdout.splitlines() if n.endswith(".csv")]
+    request = "".join(f"{rev}:{subdir}/{n}\n" for n in names).encode("utf-8")
+    proc = subprocess.run(
+        ["git", "cat-file", "--batch"], cwd=repo, input=request, capture_output=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.decode("utf-8", "replace").strip())
+
+    files: dict[str, bytes] = {}
+    out, pos = proc.stdout, 0
+    for name in names:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        if header[-1] == b"missing":
+            raise RuntimeError(f"{rev}:{subdir}/{name}: нет в git")
+        size = int(header[2])
+        files[name] = out[end + 1:end + 1 + size]
+        pos = end + 1 + size + 1
+    return files
+
+
+def compare(
+    old: dict[str, bytes],
+    new: dict[str, bytes],
+    translations: dict[str, bytes],
+    target: str = "ZHS",
+) -> ChangeReport:
+    """Grade every row whose EN differs between ``old`` and ``new``.
+
+    Args:
+        old, new: ``{file name: CSV bytes}`` before and after the change.
+        translations: Files whose ``target`` column holds the translation
+            to review (the repo's current ``localization/``).
+        target: Target column.
+    """
+    changes: list[EnChange] = []
+    added = sum(len(_rows(new[n], target)) for n in new.keys() - old.keys())
+    removed = sum(len(_rows(old[n], target)) for n in old.keys() - new.keys())
+    for name in sorted(old.keys() & new.keys()):
+        old_rows = _rows(old[name], target)
+        new_rows = _rows(new[name], target)
+        current = _rows(translations[name], target) if name in translations else {}
+        added += len(new_rows.keys() - old_rows.keys())
+        removed += len(old_rows.keys() - new_rows.keys())
+        category = file_category(name)
+        for key, (line, new_en, _) in new_rows.items():
+            if key not in old_rows:
+                continue
+            old_en = old_rows[key][1]
+            if old_en == new_en:
+                continue
+            d, ratio, g, tokens = grade(old_en, new_en, category)
+            changes.append(EnChange(
+                file=name,
+                line=line,
+                row_id=key[0],
+                category=category,
+                old_en=old_en,
+                new_en=new_en,
+                translation=current.get(key, (0, "", ""))[2],
+                distance=d,
+                ratio=ratio,
+                grade=g,
+                tokens_changed=tokens,
+            ))
+    return ChangeReport(changes, added, removed)
@@ -1,43 +1,70 @@
+"""List rows where EN has '##' paragraph breaks but the translation has none."""
+
+import argparse
 import csv
-import os
-import glob
+from pathlib import Path
 
-dir_path = "star-of-providence-ru/localization"
-files = glob.glob(os.path.join(dir_path, "*.csv"))
+LOCALIZATION_DIR = Path(__file__).parent.parent / "localization"
 
-issues = []
 
-for filepath in files:
+def find_issues(filepath: Path, targets: tuple[str, ...]) -> list[dict]:
+    """Check all target columns of one file in a single read."""
+    issues = []
     with open(filepath, 'r', encoding='utf-8') as f:
         reader = csv.reader(f)
         header = next(reader)
-        try:
-            en_idx = header.index("EN")
-            zhs_idx = header.index("ZHS")
-        except ValueError:
-            continue
-            
+        if "EN" not in header:
+            return []
+        en_idx = header.index("EN")
+        columns = [(t, header.index(t)) for t in targets if t in header]
+
         for row_num, row in enumerate(reader, start=2):
-            if len(row) > max(en_idx, zhs_idx):
-                en_text = row[en_idx]
-                ru_text = row[zhs_idx]
-                
-                # Check for ## mismatch
-                en_double_hashes = en_text.count("##")
-                ru_double_hashes = ru_text.count("##")
-                
-                if en_double_hashes > 0 and ru_double_hashes == 0:
-                    issues.append({
-                        "file": os.path.basename(filepath),
-                        "row": row_num,
-                        "en": en_text,
-                        "ru": ru_text
-                    })
-
-for issue in issues:
-    print(f"[{issue['file']}:{issue['row']}]")
-    print(f"EN: {issue['en']}")
-    print(f"RU: {issue['ru']}")
-    print("-" * 60)
-
-print(f"Found {len(issues)} issues.")
\ No newline at end of file
+            for target, zhs_idx in columns:
+                if len(row) > max(en_idx, zhs_idx):
+                    en_text = row[en_idx]
+                    ru_text = row[zhs_idx]
+
+                    # Check for ## mismatch
+                    en_double_hashes = en_text.count("##")
+                    ru_double_hashes = ru_text.count("##")
+
+                    if en_double_hashes > 0 and ru_double_hashes == 0:
+                        issues.append({
+                            "file": filepath.name,
+                            "row": row_num,
+                            "target": target,
+                            "en": en_text,
+                            "ru": ru_text
+                        })
+    return issues
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--target",
+        default="ZHS",
+        help="Target columns, comma-separated (default: ZHS)",
+    )
+    args = parser.parse_args()
+    targets = tuple(t.strip() for t in args.target.split(",") if t.strip())
+
+    issues = []
+    for filepath in sorted(LOCALIZATION_DIR.glob("*.csv")):
+        issues.extend(find_issues(filepath, targets))
+
+    for target in targets:
+        target_issues = [i for i in issues if i["target"] == target]
+        if len(targets) > 1:
+            print(f"== {target} ==")
+        for issue in target_issues:
+            print(f"[{issue['file']}:{issue['row']}]")
+            print(f"EN: {issue['en']}")
+            print(f"{'RU' if target == 'ZHS' else target}: {issue['ru']}")
+            print("-" * 60)
+
+        print(f"Found {len(target_issues)} issues.")
+
+
+if __name__ == "__main__":
+    main()
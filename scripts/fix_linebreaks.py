@@ -4,17 +4,31 @@ The game renders text character-by-character and wraps at pixel boundaries,
 not word boundaries. Russian text uses NotoSans-ExtraBold (wider than the
 original pixel font), so lines overflow sooner. This script adds '#' at
 word boundaries to prevent mid-word wrapping.
+
+With ``--hyphenate``, files in ``HYPHENATE_FILES`` may also break inside
+long words. A soft break is written as ``-#`` between two Cyrillic letters.
+Re-wrapping joins such a break back only if it is exactly the break the
+hyphenator would make at that point, so the script stays idempotent and a
+compound broken at its own hyphen (``кто-#то``) keeps the hyphen.
 """
 
+import argparse
 import csv
 import re
+import sys
+from dataclasses import dataclass
 from io import StringIO
 from pathlib import Path
 
+from hyphenate import Hyphenator, hyphenator
+
 LOCALIZATION_DIR = Path(__file__).parent.parent / "localization"
 
 TAG_PATTERN = re.compile(r"/[cfpsnrmq]\d")
 CYRILLIC_PATTERN = re.compile(r"[а-яА-ЯёЁ]")
+CYRILLIC_RUN = re.compile(r"[а-яА-ЯёЁ]+")
+SOFT_HYPHEN = re.compile(r"(?<=[а-яА-ЯёЁ])-#(?=[а-яА-ЯёЁ])")
+SOFT_HYPHEN_END = re.compile(r"[а-яА-ЯёЁ]-$")
 
 DIALOGUE_FILES = {
     "gossip_tank.csv",
@@ -97,6 +111,52 @@ TOOLTIP_MAX_VIS = 25
 UI_MAX_VIS = 45
 DEFAULT_MAX_VIS = 50
 
+# Narrow boxes that may break inside words with --hyphenate.
+HYPHENATE_FILES = DIALOGUE_FILES | TOOLTIP_FILES
+
+# Fragment limits in letters. A two-letter tail alone on a 22-column line
+# reads worse than a short previous line.
+HYPHEN_LEFT_MIN = 2
+HYPHEN_RIGHT_MIN = 3
+# Hyphenate into a line only while it is less than this full; fuller
+# lines just wrap the word whole.
+HYPHEN_MAX_FILL = 0.8
+
+
+@dataclass(frozen=True)
+class LocaleProfile:
+    """Rendering profile of a target column.
+
+    Attributes:
+        width_scale: Glyph width relative to NotoSans-ExtraBold; line limits
+            are divided by it.
+        script: Only cells matching this pattern are re-wrapped (keeps
+            untranslated EN fallbacks untouched). ``None`` re-wraps every
+            cell that differs from EN.
+        hyphenation: Pattern file for ``hyphenate.py``, or ``None`` if the
+            locale is never hyphenated.
+    """
+
+    width_scale: float = 1.0
+    script: re.Pattern | None = None
+    hyphenation: str | None = None
+
+
+LOCALE_PROFILES: dict[str, LocaleProfile] = {
+    "ZHS": LocaleProfile(script=CYRILLIC_PATTERN, hyphenation="hyphen_ru.pat"),
+}
+DEFAULT_PROFILE = LocaleProfile()
+
+
+def locale_profile(column: str) -> LocaleProfile:
+    """Return the rendering profile for a target column."""
+    return LOCALE_PROFILES.get(column, DEFAULT_PROFILE)
+
+
+def scaled_max_vis(max_vis: int, column: str) -> int:
+    """Apply the column's width profile to a file's line limit."""
+    return max(1, int(max_vis / locale_profile(column).width_scale))
+
 
 def strip_tags(text: str) -> str:
     """Remove formatting tags, returning only visible text."""
@@ -108,10 +168,30 @@ def vis_len(text: str) -> int:
     return len(strip_tags(text))
 
 
-def break_segment(segment: str, max_vis: int) -> str:
+def split_word(word: str, room: int, hyph: Hyphenator) -> tuple[str, str]:
+    """Split ``word`` so the head plus a hyphen fits in ``room`` columns.
+
+    Only Cyrillic letter runs are hyphenated; tags and punctuation stay
+    attached to their fragment. Returns ``("", word)`` if no break fits.
+    """
+    best = 0
+    for run in CYRILLIC_RUN.finditer(word):
+        for i in hyph.positions(run[0]):
+            pos = run.start() + i
+            if vis_len(word[:pos]) + 1 > room:
+                break
+            best = pos
+    return word[:best], word[best:]
+
+
+def break_segment(
+    segment: str, max_vis: int, hyph: Hyphenator | None = None
+) -> str:
     """Break a segment into lines of max_vis visible chars at word boundaries.
 
-    Preserves formatting tags attached to their words.
+    Preserves formatting tags attached to their words. With ``hyph``, a
+    word that does not fit is split at a hyphenation point if the current
+    line is under ``HYPHEN_MAX_FILL`` full or the word is wider than a line.
     Returns the segment with '#' inserted at break points.
     """
     if vis_len(segment) <= max_vis:
@@ -122,12 +202,26 @@ def break_segment(segment: str, max_vis: int) -> str:
     current = ""
 
     for word in words:
-        test = current + (" " if current else "") + word
-        if vis_len(test) > max_vis and current:
-            lines.append(current)
+        while True:
+            sep = " " if current else ""
+            if vis_len(current + sep + word) <= max_vis:
+                current += sep + word
+                break
+            used = vis_len(current + sep)
+            if hyph is not None and (
+                used < max_vis * HYPHEN_MAX_FILL or vis_len(word) > max_vis
+            ):
+                head, word = split_word(word, max_vis - used, hyph)
+                if head:
+                    lines.append(current + sep + head + "-")
+                    current = ""
+                    continue
+            if current:
+                lines.append(current)
+                current = ""
+                continue
             current = word
-        else:
-            current = test
+            break
 
     if current:
         lines.append(current)
@@ -135,8 +229,62 @@ def break_segment(segment: str, max_vis: int) -> str:
     return "#".join(lines)
 
 
-def fix_zhs_text(text: str, max_vis: int) -> str:
-    """Fix line breaks in ZHS text, recalculating word wraps without breaking mid-word."""
+def _generated_hyphen(
+    prefix: str, head: str, word: str, max_vis: int, hyph: Hyphenator
+) -> bool:
+    """Whether :func:`break_segment` would end a line ``prefix + head + "-"``.
+
+    ``word`` is the whole word that was split, ``head`` its first fragment
+    and ``prefix`` the line before it, including the separating space.
+    """
+    used = vis_len(prefix)
+    if vis_len(prefix + word) <= max_vis:
+        return False
+    if not (used < max_vis * HYPHEN_MAX_FILL or vis_len(word) > max_vis):
+        return False
+    return split_word(word, max_vis - used, hyph)[0] == head
+
+
+def join_soft_hyphens(
+    segment: str, max_vis: int, hyph: Hyphenator | None = None
+) -> str:
+    """Undo the ``-#`` breaks of ``segment`` before it is re-wrapped.
+
+    A break that ``break_segment`` would have made with ``hyph`` and
+    ``max_vis`` is joined without the hyphen. Any other ``-#`` between
+    Cyrillic letters, e.g. a compound the translator broke at its own
+    hyphen, keeps the hyphen; only the break is dropped.
+    """
+    if hyph is None:
+        return SOFT_HYPHEN.sub("-", segment)
+    lines = segment.split("#")
+    # Right to left, so a word split over several lines is whole when its
+    # first break is checked.
+    out = lines[-1]
+    for line in reversed(lines[:-1]):
+        if not (SOFT_HYPHEN_END.search(line) and CYRILLIC_PATTERN.match(out)):
+            out = line + "#" + out
+            continue
+        prefix, sep, head = line[:-1].rpartition(" ")
+        word = head + out.split(" ", 1)[0]
+        if _generated_hyphen(prefix + sep, head, word, max_vis, hyph):
+            out = line[:-1] + out
+        else:
+            out = line + out
+    return out
+
+
+def fix_zhs_text(
+    text: str, max_vis: int, hyph: Hyphenator | None = None
+) -> str:
+    """Fix line breaks in ZHS text, recalculating word wraps.
+
+    Words are only broken mid-word at hyphenation points, and only if
+    ``hyph`` is given. Earlier ``слово-#слово`` breaks are joined back
+    only where they match what the hyphenator produces (see
+    :func:`join_soft_hyphens`); otherwise the hyphen is kept and just the
+    break is dropped, so hand-written hyphenated words survive.
+    """
     if not text or not text.strip():
         return text
         
@@ -150,13 +298,22 @@ def fix_zhs_text(text: str, max_vis: int) -> str:
     fixed_double: list[str] = []
 
     for dp in double_parts:
-        # First, remove single '#' to recalculate breaks
+        # First, join soft hyphens and remove single '#' to recalculate breaks
+        dp = join_soft_hyphens(dp, max_vis, hyph)
         dp_clean = re.sub(r" +", " ", dp.replace("#", " ")).strip()
-        fixed_double.append(break_segment(dp_clean, max_vis))
+        fixed_double.append(break_segment(dp_clean, max_vis, hyph))
 
     return leading_hash + "##".join(fixed_double)
 
 
+def hyphenator_for(column: str) -> Hyphenator | None:
+    """Hyphenator for a target column, or ``None`` if it has no patterns."""
+    patterns = locale_profile(column).hyphenation
+    if patterns is None:
+        return None
+    return hyphenator(patterns, HYPHEN_LEFT_MIN, HYPHEN_RIGHT_MIN)
+
+
 def get_max_vis(filename: str) -> int | None:
     """Return the max visible chars threshold for a file, or None to skip."""
     if filename in SKIP_FILES:
@@ -181,8 +338,26 @@ def detect_line_ending(content: str) -> str:
     return "\n"
 
 
-def process_file(csv_path: Path, max_vis: int) -> list[tuple[int, str, str]]:
-    """Process a CSV file and fix ZHS text. Returns list of (row, old, new)."""
+def process_file(
+    csv_path: Path,
+    max_vis: int,
+    targets: tuple[str, ...] = ("ZHS",),
+    hyphenate: bool = False,
+    write: bool = True,
+) -> list[tuple[int, str, str, str]]:
+    """Fix target-column text in a CSV file in a single read.
+
+    Args:
+        csv_path: CSV file to process.
+        max_vis: Line limit for the file before the locale width profile.
+        targets: Target columns to re-wrap.
+        hyphenate: Allow mid-word breaks if the file is in
+            ``HYPHENATE_FILES`` and the locale has hyphenation patterns.
+        write: Save the file; ``False`` only reports the changes.
+
+    Returns:
+        List of ``(row, column, old, new)``.
+    """
     with open(csv_path, encoding="utf-8-sig", newline="") as f:
         raw_content = f.read()
 
@@ -193,30 +368,40 @@ def process_file(csv_path: Path, max_vis: int) -> list[tuple[int, str, str]]:
         return []
 
     header = rows[0]
-    if "ZHS" not in header:
+    if "EN" not in header:
         return []
-
-    zi = header.index("ZHS")
-    changes: list[tuple[int, str, str]] = []
+    ei = header.index("EN")
+    hyphenate = hyphenate and csv_path.name in HYPHENATE_FILES
+    columns = [
+        (col, header.index(col), scaled_max_vis(max_vis, col),
+         locale_profile(col).script, hyphenator_for(col) if hyphenate else None)
+        for col in targets
+        if col in header
+    ]
+    changes: list[tuple[int, str, str, str]] = []
 
     for row_num, row in enumerate(rows[1:], start=2):
-        if len(row) <= zi:
-            continue
+        for col, zi, col_max_vis, script, hyph in columns:
+            if len(row) <= zi:
+                continue
 
-        original = row[zi]
-        if not original.strip():
-            continue
+            original = row[zi]
+            if not original.strip():
+                continue
 
-        if not CYRILLIC_PATTERN.search(original):
-            continue
+            if script is not None:
+                if not script.search(original):
+                    continue
+            elif len(row) > ei and original == row[ei]:
+                continue
 
-        fixed = fix_zhs_text(original, max_vis)
+            fixed = fix_zhs_text(original, col_max_vis, hyph)
 
-        if fixed != original:
-            changes.append((row_num, original, fixed))
-            row[zi] = fixed
+            if fixed != original:
+                changes.append((row_num, col, original, fixed))
+                row[zi] = fixed
 
-    if changes:
+    if changes and write:
         buf = StringIO()
         writer = csv.writer(buf, lineterminator="\n")
         for row in rows:
@@ -234,6 +419,25 @@ def process_file(csv_path: Path, max_vis: int) -> list[tuple[int, str, str]]:
 
 def main() -> None:
     """Run line break fixes on all localization files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--target",
+        default="ZHS",
+        help="Target columns, comma-separated (default: ZHS)",
+    )
+    parser.add_argument(
+        "--hyphenate",
+        action="store_true",
+        help="Allow hyphenated mid-word breaks in HYPHENATE_FILES",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only report lines that would change; exit 1 if any",
+    )
+    args = parser.parse_args()
+    targets = tuple(t.strip() for t in args.target.split(",") if t.strip())
+
     total_changes = 0
     file_summaries: list[tuple[str, int]] = []
 
@@ -242,15 +446,18 @@ def main() -> None:
         if max_vis is None:
             continue
 
-        changes = process_file(csv_path, max_vis)
+        changes = process_file(
+            csv_path, max_vis, targets, args.hyphenate, write=not args.check
+        )
         if changes:
             file_summaries.append((csv_path.name, len(changes)))
             total_changes += len(changes)
 
-            for row_num, old, new in changes[:5]:
+            for row_num, col, old, new in changes[:5]:
                 old_short = old[:70] + ("..." if len(old) > 70 else "")
                 new_short = new[:70] + ("..." if len(new) > 70 else "")
-                print(f"  [{row_num}] {old_short}")
+                label = row_num if len(targets) == 1 else f"{row_num} {col}"
+                print(f"  [{label}] {old_short}")
                 print(f"     -> {new_short}")
             if len(changes) > 5:
                 print(f"  ... and {len(changes) - 5} more")
@@ -262,6 +469,9 @@ def main() -> None:
     for fname, count in file_summaries:
         print(f"  {fname}: {count} changes")
 
+    if args.check and total_changes:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,160 @@
+"""Liang-style hyphenation for the line breaker.
+
+Patterns (``*.pat`` next to this module) are compiled once into a trie and
+cached per file. Besides literal letters a pattern may use letter classes
+(``V`` vowel, ``C`` consonant, ``X`` й/ь/ъ, ``L`` any letter), so a short
+rule list covers Russian syllable structure without thousands of literal
+TeX patterns. Results are cached per word: the corpus repeats words a lot.
+"""
+
+import functools
+import re
+from pathlib import Path
+
+PATTERNS_DIR = Path(__file__).resolve().parent
+
+VOWELS = frozenset("аеёиоуыэюя")
+SIGNS = frozenset("йьъ")
+CONSONANTS = frozenset("бвгджзклмнпрстфхцчшщ")
+
+LEFT_MIN = 2
+RIGHT_MIN = 2
+
+_CLASS_SYMBOLS = frozenset("VCXL")
+_DIGITS_RE = re.compile(r"\d")
+
+# Trie node: symbol → child, plus the key None → scores of a pattern ending here.
+Trie = dict
+
+
+def _classes(char: str) -> tuple[str, ...]:
+    """Trie keys a word character can follow: itself, its class, ``L``."""
+    if char in VOWELS:
+        return (char, "V", "L")
+    if char in CONSONANTS:
+        return (char, "C", "L")
+    if char in SIGNS:
+        return (char, "X", "L")
+    return (char,)
+
+
+def compile_patterns(lines: list[str]) -> Trie:
+    """Build the pattern trie from lines in Liang notation.
+
+    ``%`` starts a comment. ``VC1CV`` is stored under the path
+    ``V, C, C, V`` with scores ``(0, 0, 1, 0, 0)``, one per gap including
+    both ends.
+
+    Raises:
+        ValueError: On an unknown symbol.
+    """
+    root: Trie = {}
+    for line_no, line in enumerate(lines, start=1):
+        pattern = line.split("%", 1)[0].strip()
+        if not pattern:
+            continue
+        symbols = _DIGITS_RE.sub("", pattern)
+        scores = [0] * (len(symbols) + 1)
+        pos = 0
+        for char in pattern:
+            if char.isdigit():
+                scores[pos] = int(char)
+            else:
+                if not (
+                    char in _CLASS_SYMBOLS
+                    or char == "."
+                    or char in VOWELS | CONSONANTS | SIGNS
+                ):
+                    raise ValueError(
+                        f"строка {line_no}: неизвестный символ {char!r}"
+                    )
+                pos += 1
+
+        node = root
+        for symbol in symbols:
+            node = node.setdefault(symbol, {})
+        node[None] = tuple(scores)
+    return root
+
+
+class Hyphenator:
+    """Finds allowed break points in words with a compiled pattern trie.
+
+    Attributes:
+        left_min: Minimum letters before a break.
+        right_min: Minimum letters after a break.
+    """
+
+    def __init__(
+        self, trie: Trie, left_min: int = LEFT_MIN, right_min: int = RIGHT_MIN
+    ):
+        self.trie = trie
+        self.left_min = left_min
+        self.right_min = right_min
+        self._cache: dict[str, tuple[int, ...]] = {}
+
+    def positions(self, word: str) -> tuple[int, ...]:
+        """Indices ``i`` at which ``word[:i] + "-" + word[i:]`` is allowed."""
+        cached = self._cache.get(word)
+        if cached is not None:
+            return cached
+
+        n = len(word)
+        if n < self.left_min + self.right_min:
+            self._cache[word] = ()
+            return ()
+
+        padded = "." + word.lower() + "."
+        points = [0] * (len(padded) + 1)
+        for start in range(len(padded)):
+            self._match(self.trie, padded, start, start, points)
+
+        # points[k] scores the gap before padded[k], i.e. before word[k - 1].
+        result = tuple(
+            i
+            for i in range(self.left_min, n - self.right_min + 1)
+            if points[i + 1] % 2
+        )
+        self._cache[word] = result
+        return result
+
+    def _match(
+        self, node: Trie, padded: str, start: int, pos: int, points: list[int]
+    ) -> None:
+        """Walk every trie branch matching ``padded[pos:]``."""
+        scores = node.get(None)
+        if scores is not None:
+            for k, score in enumerate(scores):
+                if score > points[start + k]:
+                    points[start + k] = score
+        if pos == len(padded):
+            return
+        for key in _classes(padded[pos]):
+            child = node.get(key)
+            if child is not None:
+                self._match(child, padded, start, pos + 1, points)
+
+    def hyphenate(self, word: str, hyphen: str = "-") -> str:
+        """Return ``word`` with ``hyphen`` at every allowed break point."""
+        parts = []
+        prev = 0
+        for i in self.positions(word):
+            parts.append(word[prev:i])
+            prev = i
+        parts.append(word[prev:])
+        return hyphen.join(parts)
+
+
+@functools.cache
+def load_patterns(name: str) -> Trie:
+    """Compile a pattern file from :data:`PATTERNS_DIR` (cached)."""
+    text = (PATTERNS_DIR / name).read_text(encoding="utf-8")
+    return compile_patterns(text.splitlines())
+
+
+@functools.cache
+def hyphenator(
+    name: str, left_min: int = LEFT_MIN, right_min: int = RIGHT_MIN
+) -> Hyphenator:
+    """Shared :class:`Hyphenator` for a pattern file and fragment limits."""
+    return Hyphenator(load_patterns(name), left_min, right_min)
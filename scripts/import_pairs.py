@@ -0,0 +1,198 @@
+"""Bulk import of EN→translation pairs for ``patch.py import``.
+
+A pair file is streamed into a hash index keyed by normalized EN
+(Unicode NFC, whitespace runs collapsed, ends stripped); the corpus is
+then scanned once and every data row whose normalized EN is in the index
+is a candidate. Edits are spliced into the file bytes, so rows that do not
+change keep their exact quoting and line endings.
+
+Supported pair files:
+
+* ``.csv`` / ``.tsv`` — two columns, or a header with ``EN`` and one of
+  the target column, ``RU`` or ``translation``;
+* ``.json`` — an object ``{en: translation}`` or a list of ``[en,
+  translation]`` pairs / ``{"en": ..., "translation": ...}`` objects;
+* ``.jsonl`` — one pair or object per line (streamed).
+"""
+
+import csv
+import json
+import unicodedata
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import NamedTuple
+
+from csv_io import is_data_row, read_header, scan_csv, splice_file
+
+TRANSLATION_COLUMNS = ("RU", "translation")
+
+
+class Mode(Enum):
+    """Which matching rows receive the imported translation."""
+
+    UNTRANSLATED = "untranslated"  # only rows whose target is empty or EN
+    OVERWRITE = "overwrite"  # every row whose target differs
+    CONFLICTS = "conflicts"  # write nothing, list differing translations
+
+
+class Change(NamedTuple):
+    """One target cell the import touches (or would touch)."""
+
+    file: str
+    line: int
+    row_id: str
+    old: str
+    new: str
+
+
+@dataclass
+class ImportReport:
+    """Outcome of :func:`apply_pairs`."""
+
+    pairs: int = 0
+    changes: list[Change] = field(default_factory=list)
+    conflicts: list[Change] = field(default_factory=list)
+    duplicates: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    unmatched: int = 0
+
+
+def normalize_en(text: str) -> str:
+    """Key under which an EN string is looked up."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def _json_pair(item: object) -> tuple[str, str]:
+    if isinstance(item, list) and len(item) == 2:
+        return str(item[0]), str(item[1])
+    if isinstance(item, dict):
+        en = item.get("en", item.get("EN"))
+        dst = next(
+            (item[k] for k in ("translation", "ru", "RU") if k in item), None
+        )
+        if en is not None and dst is not None:
+            return str(en), str(dst)
+    raise ValueError(f"не пара EN/перевод: {item!r:.80}")
+
+
+def read_pairs(path: Path, target: str = "ZHS") -> Iterator[tuple[str, str]]:
+    """Stream ``(en, translation)`` pairs from a pair file.
+
+    Raises:
+        ValueError: On an unsupported extension or a malformed entry.
+        OSError, UnicodeDecodeError: If the file cannot be read.
+    """
+    suffix = path.suffix.lower()
+    if suffix in (".csv", ".tsv"):
+        with path.open(encoding="utf-8-sig", newline="") as f:
+            reader = csv.reader(f, delimiter="\t" if suffix == ".tsv" else ",")
+            header = next(reader, [])
+            columns = [target, *TRANSLATION_COLUMNS]
+            if "EN" in header and any(c in header for c in columns):
+                en_idx = header.index("EN")
+                dst_idx = header.index(next(c for c in columns if c in header))
+            else:
+                en_idx, dst_idx = 0, 1
+                if len(header) > 1:
+                    yield header[0], header[1]
+            for row in reader:
+                if len(row) > max(en_idx, dst_idx):
+                    yield row[en_idx], row[dst_idx]
+    elif suffix == ".jsonl":
+        with path.open(encoding="utf-8-sig") as f:
+            for line in f:
+                if line.strip():
+                    yield _json_pair(json.loads(line))
+    elif suffix == ".json":
+        with path.open(encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            yield from ((str(k), str(v)) for k, v in data.items())
+        elif isinstance(data, list):
+            yield from map(_json_pair, data)
+        else:
+            raise ValueError("ожидался объект или список пар")
+    else:
+        raise ValueError(f"неизвестный формат: {path.suffix or path.name}")
+
+
+def build_index(
+    pairs: Iterator[tuple[str, str]], report: ImportReport
+) -> dict[str, str]:
+    """Hash index ``normalized EN → translation``.
+
+    Empty translations and translations equal to EN are skipped. An EN
+    given two different translations is reported in ``report.duplicates``
+    and dropped from the index.
+    """
+    index: dict[str, str] = {}
+    dropped: set[str] = set()
+    for en, dst in pairs:
+        report.pairs += 1
+        key = normalize_en(en)
+        dst = dst.strip()
+        if not key or not dst or normalize_en(dst) == key or key in dropped:
+            continue
+        prev = index.get(key)
+        if prev is not None and prev != dst:
+            report.duplicates.append(f"{key[:60]!r}: {prev[:40]!r} ≠ {dst[:40]!r}")
+            del index[key]
+            dropped.add(key)
+            continue
+        index[key] = dst
+    return index
+
+
+def apply_pairs(
+    loc_dir: Path,
+    pair_file: Path,
+    *,
+    target: str = "ZHS",
+    mode: Mode = Mode.UNTRANSLATED,
+    dry_run: bool = False,
+) -> ImportReport:
+    """Apply ``pair_file`` to every CSV in ``loc_dir`` in one pass.
+
+    A matching row counts as untranslated if its target cell is empty or
+    equals EN. In ``UNTRANSLATED`` mode already translated rows with a
+    different translation are reported as conflicts and left alone; in
+    ``CONFLICTS`` mode nothing is written.
+    """
+    report = ImportReport()
+    index = build_index(read_pairs(pair_file, target), report)
+    matched: set[str] = set()
+
+    for path in sorted(loc_dir.glob("*.csv")):
+        header = read_header(path)
+        if "EN" not in header or target not in header:
+            continue
+        target_idx = header.index(target)
+        edits: dict[int, dict[int, str]] = {}
+        for row in scan_csv(path, ("ID", "EN", target)):
+            row_id, en, old = row.cells
+            if not is_data_row(row.cells):
+                continue
+            key = normalize_en(en)
+            new = index.get(key)
+            if new is None:
+                continue
+            matched.add(key)
+            change = Change(path.name, row.line, row_id.strip(), old, new)
+            untranslated = not old.strip() or old.strip() == en.strip()
+            if old.strip() == new:
+                report.unchanged += 1
+            elif mode is Mode.OVERWRITE or (
+                mode is Mode.UNTRANSLATED and untranslated
+            ):
+                report.changes.append(change)
+                edits[row.offset] = {target_idx: new}
+            elif not untranslated:
+                report.conflicts.append(change)
+
+        if edits and not dry_run and mode is not Mode.CONFLICTS:
+            splice_file(path, edits)
+
+    report.unmatched = len(index) - len(matched)
+    return report
@@ -0,0 +1,386 @@
+"""Lint rules for ``patch.py validate``.
+
+Rules register themselves with :func:`rule` and declare which columns
+they read and which file categories they apply to. The :class:`LintEngine`
+runs every enabled rule on a row in one pass; token kinds are extracted on
+first use and at most once per cell (:class:`LintRow`). The engine keeps
+per-rule hit counts and timings.
+
+A row can opt out of rules via its ``Comments`` cell::
+
+    lint: ignore              # all rules
+    lint: ignore=tags,length  # only these
+"""
+
+import re
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
+from typing import NamedTuple
+
+from fix_linebreaks import (
+    DESCRIPTION_FILES,
+    DIALOGUE_FILES,
+    NARRATIVE_FILES,
+    SKIP_FILES as NAME_FILES,
+    TOOLTIP_FILES,
+    UI_FILES,
+)
+
+TAG_RE = re.compile(r"/[cfp]\d")
+VAR_RE = re.compile(r"%\w+%")
+COLOR_RE = re.compile(r"/c(\d)")
+SUPPRESS_RE = re.compile(r"lint:\s*ignore(?:=([\w,-]+))?")
+
+# Rules declare columns with these names; the engine substitutes each
+# requested target column for TARGET_COLUMN.
+SOURCE_COLUMN = "EN"
+TARGET_COLUMN = "ZHS"
+
+MIN_LENGTH_FOR_CHECK: int = 10
+MAX_LENGTH_RATIO: float = 1.5
+
+SEVERITIES = ("error", "warning")
+CATEGORIES = (
+    "dialogue",
+    "narrative",
+    "description",
+    "tooltip",
+    "ui",
+    "names",
+    "other",
+)
+TEXT_CATEGORIES = frozenset(CATEGORIES) - {"names"}
+
+# Words that are always spelled with «ё» in this translation.
+YO_WORDS: dict[str, str] = {
+    "еще": "ещё",
+    "ее": "её",
+    "нее": "неё",
+    "идет": "идёт",
+    "берет": "берёт",
+    "живет": "живёт",
+    "ждет": "ждёт",
+}
+_YO_RE = re.compile(r"\b(" + "|".join(YO_WORDS) + r")\b", re.IGNORECASE)
+
+
+def file_category(filename: str) -> str:
+    """Map a localization file to its category (``fix_linebreaks`` groups)."""
+    if filename in DIALOGUE_FILES:
+        return "dialogue"
+    if filename in NARRATIVE_FILES:
+        return "narrative"
+    if filename in DESCRIPTION_FILES:
+        return "description"
+    if filename in TOOLTIP_FILES:
+        return "tooltip"
+    if filename in UI_FILES:
+        return "ui"
+    if filename in NAME_FILES:
+        return "names"
+    return "other"
+
+
+# ── Tokens ──────────────────────────────────────────────────────────────
+
+TOKENIZERS: dict[str, Callable[[str], object]] = {
+    "tags": lambda text: sorted(TAG_RE.findall(text)),
+    "vars": lambda text: sorted(VAR_RE.findall(text)),
+    "breaks": lambda text: text.count("#"),
+    "colors": lambda text: COLOR_RE.findall(text),
+    "stripped": str.strip,
+}
+
+
+class LintRow:
+    """One row as seen by rules: raw cells plus lazily cached tokens."""
+
+    __slots__ = ("cells", "_cache")
+
+    def __init__(self, cells: dict[str, str]):
+        self.cells = cells
+        self._cache: dict[tuple[str, str], object] = {}
+
+    def tokens(self, kind: str, column: str):
+        """Return the ``kind`` tokens of ``column``, computed once per row."""
+        key = (kind, column)
+        if key not in self._cache:
+            self._cache[key] = TOKENIZERS[kind](self.cells[column])
+        return self._cache[key]
+
+
+# ── Registry ────────────────────────────────────────────────────────────
+
+
+@dataclass(frozen=True)
+class Rule:
+    """A registered check.
+
+    ``check`` receives the row plus the source and target column names and
+    returns a message, or ``None`` if the row passes.
+    """
+
+    name: str
+    check: Callable[[LintRow, str, str], str | None]
+    description: str
+    columns: tuple[str, ...] = (SOURCE_COLUMN, TARGET_COLUMN)
+    categories: frozenset[str] = frozenset(CATEGORIES)
+    severity: str = "warning"
+    enabled: bool = True
+
+
+RULES: dict[str, Rule] = {}
+
+
+def rule(
+    name: str,
+    *,
+    columns: tuple[str, ...] = (SOURCE_COLUMN, TARGET_COLUMN),
+    categories: Iterable[str] | None = None,
+    severity: str = "warning",
+    enabled: bool = True,
+):
+    """Register the decorated function as a lint rule."""
+
+    def decorator(fn: Callable[[LintRow, str, str], str | None]):
+        RULES[name] = Rule(
+            name=name,
+            check=fn,
+            description=(fn.__doc__ or "").strip().splitlines()[0],
+            columns=columns,
+            categories=(
+                frozenset(categories)
+                if categories is not None
+                else frozenset(CATEGORIES)
+            ),
+            severity=severity,
+            enabled=enabled,
+        )
+        return fn
+
+    return decorator
+
+
+@rule("tags", severity="error")
+def _check_tags(row: LintRow, src: str, dst: str) -> str | None:
+    """Formatting tags (/c, /f, /p) differ from EN."""
+    en_tags = row.tokens("tags", src)
+    zhs_tags = row.tokens("tags", dst)
+    if en_tags != zhs_tags:
+        return f"теги: EN={en_tags} ≠ {dst}={zhs_tags}"
+    return None
+
+
+@rule("vars", severity="error")
+def _check_vars(row: LintRow, src: str, dst: str) -> str | None:
+    """%variables% differ from EN."""
+    en_vars = row.tokens("vars", src)
+    zhs_vars = row.tokens("vars", dst)
+    if en_vars != zhs_vars:
+        return f"переменные: EN={en_vars} ≠ {dst}={zhs_vars}"
+    return None
+
+
+@rule("breaks")
+def _check_breaks(row: LintRow, src: str, dst: str) -> str | None:
+    """Number of '#' line breaks differs from EN."""
+    en_breaks = row.tokens("breaks", src)
+    zhs_breaks = row.tokens("breaks", dst)
+    if en_breaks != zhs_breaks:
+        return f"переносы #: EN={en_breaks} ≠ {dst}={zhs_breaks}"
+    return None
+
+
+@rule("underscore")
+def _check_underscore(row: LintRow, src: str, dst: str) -> str | None:
+    """Trailing '_' (terminal cursor) from EN is missing."""
+    if row.cells[src].rstrip().endswith("_") and not row.cells[
+        dst
+    ].rstrip().endswith("_"):
+        return "отсутствует завершающий '_'"
+    return None
+
+
+@rule("length")
+def _check_length(row: LintRow, src: str, dst: str) -> str | None:
+    """Translation is much longer than EN."""
+    en_len = len(row.tokens("stripped", src))
+    zhs_len = len(row.tokens("stripped", dst))
+    if en_len > MIN_LENGTH_FOR_CHECK and zhs_len > en_len * MAX_LENGTH_RATIO:
+        return f"длина: {zhs_len} символов (EN: {en_len})"
+    return None
+
+
+def _colors_balanced(colors: list[str]) -> bool:
+    """Every /c1-/c9 span is closed by /c0 before the next one opens."""
+    open_span = False
+    for c in colors:
+        if c == "0":
+            if not open_span:
+                return False
+            open_span = False
+        elif open_span:
+            return False
+        else:
+            open_span = True
+    return not open_span
+
+
+@rule("color-spans")
+def _check_color_spans(row: LintRow, src: str, dst: str) -> str | None:
+    """/c colour spans are balanced in EN but not in the translation."""
+    if _colors_balanced(row.tokens("colors", src)) and not _colors_balanced(
+        row.tokens("colors", dst)
+    ):
+        return "цвет /c: незакрытый или лишний /c0"
+    return None
+
+
+@rule("quotes", categories=TEXT_CATEGORIES)
+def _check_quotes(row: LintRow, src: str, dst: str) -> str | None:
+    """ASCII double quotes instead of «ёлочек»."""
+    if '"' in row.cells[dst]:
+        return "кавычки: используйте «»"
+    return None
+
+
+@rule("yo", categories=TEXT_CATEGORIES)
+def _check_yo(row: LintRow, src: str, dst: str) -> str | None:
+    """Word that this translation always spells with «ё»."""
+    m = _YO_RE.search(row.cells[dst])
+    if m:
+        return f"ё: «{m[0]}» → «{YO_WORDS[m[0].lower()]}»"
+    return None
+
+
+@rule("typography", categories=TEXT_CATEGORIES)
+def _check_typography(row: LintRow, src: str, dst: str) -> str | None:
+    """Double spaces or a space before punctuation."""
+    text = row.cells[dst]
+    if "  " in text and "  " not in row.cells[src]:
+        return "типографика: двойной пробел"
+    m = re.search(r" [,.!?:;]", text)
+    if m and m[0] not in row.cells[src]:
+        return f"типографика: пробел перед «{m[0][1]}»"
+    return None
+
+
+# ── Engine ──────────────────────────────────────────────────────────────
+
+
+class Issue(NamedTuple):
+    """A rule hit on one row."""
+
+    rule: str
+    severity: str
+    message: str
+
+
+@dataclass
+class RuleStats:
+    """Accumulated hits and wall time of one rule."""
+
+    hits: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class LintEngine:
+    """Runs the selected rules over rows in a single fused pass.
+
+    Attributes:
+        rules: Active rules in registration order.
+        stats: Per-rule hit counts and timings.
+    """
+
+    rules: list[Rule]
+    stats: dict[str, RuleStats] = field(default_factory=dict)
+
+    @classmethod
+    def from_registry(
+        cls,
+        enable: Iterable[str] = (),
+        disable: Iterable[str] = (),
+        severity: dict[str, str] | None = None,
+    ) -> "LintEngine":
+        """Build an engine from :data:`RULES` with per-rule overrides.
+
+        Raises:
+            ValueError: On an unknown rule name or severity.
+        """
+        enable, disable = set(enable), set(disable)
+        severity = severity or {}
+        unknown = (enable | disable | set(severity)) - set(RULES)
+        if unknown:
+            raise ValueError(f"Неизвестные правила: {', '.join(sorted(unknown))}")
+        bad = set(severity.values()) - set(SEVERITIES)
+        if bad:
+            raise ValueError(f"Неизвестная серьёзность: {', '.join(sorted(bad))}")
+
+        rules = []
+        for name, r in RULES.items():
+            if name in disable or (not r.enabled and name not in enable):
+                continue
+            if name in severity:
+                r = replace(r, severity=severity[name])
+            rules.append(r)
+        return cls(rules, {r.name: RuleStats() for r in rules})
+
+    def columns_for(self, targets: Iterable[str]) -> tuple[str, ...]:
+        """Columns read by the active rules for ``targets``, deduplicated."""
+        targets = tuple(targets)
+        return tuple(
+            dict.fromkeys(
+                t
+                for r in self.rules
+                for c in r.columns
+                for t in (targets if c == TARGET_COLUMN else (c,))
+            )
+        )
+
+    def rules_for(self, category: str) -> list[Rule]:
+        """Active rules that apply to files of ``category``."""
+        return [r for r in self.rules if category in r.categories]
+
+    def check_row(
+        self,
+        rules: list[Rule],
+        cells: dict[str, str],
+        comments: str = "",
+        *,
+        src: str = SOURCE_COLUMN,
+        dst: str = TARGET_COLUMN,
+    ) -> list[Issue]:
+        """Run ``rules`` on one row, honouring suppressions in ``comments``.
+
+        Args:
+            rules: Rules for the file, usually from :meth:`rules_for`.
+            cells: Column name → cell text.
+            comments: Contents of the ``Comments`` column.
+            src: Source language column.
+            dst: Target language column.
+
+        Returns:
+            Issues found, in rule order.
+        """
+        suppressed: set[str] = set()
+        m = SUPPRESS_RE.search(comments) if comments else None
+        if m:
+            if m[1] is None:
+                return []
+            suppressed = set(m[1].split(","))
+
+        row = LintRow(cells)
+        issues: list[Issue] = []
+        for r in rules:
+            if r.name in suppressed:
+                continue
+            t0 = time.perf_counter()
+            message = r.check(row, src, dst)
+            st = self.stats[r.name]
+            st.seconds += time.perf_counter() - t0
+            if message is not None:
+                st.hits += 1
+                issues.append(Issue(r.name, r.severity, message))
+        return issues
@@ -0,0 +1,220 @@
+"""Three-way merge of localization CSVs for ``patch.py merge-driver``.
+
+Rows are matched by identity instead of by position: ``(first cell,
+occurrence)``, the same key as :func:`csv_io.data_row_keys`, extended to
+the header and non-data rows. Cells are matched by column name. A cell
+changed on one side only takes that side's value; a cell changed
+differently on both sides gets git-style conflict markers inside the cell.
+Rows added by theirs are placed after the row that precedes them in
+theirs.
+
+Rows that end up identical to one side are written back as that side's
+raw bytes, so quoting and line endings of untouched rows never change.
+Everything is dict lookups over the three files: linear time.
+"""
+
+import codecs
+import csv
+import io
+from dataclasses import dataclass
+
+from csv_io import split_records
+
+DEFAULT_MARKER_SIZE = 7
+DELETED = "(строка удалена)"
+
+Key = tuple[str, int]
+
+
+@dataclass
+class Table:
+    """A parsed CSV version: rows in order with their raw records."""
+
+    bom: bytes
+    newline: bytes
+    header: list[str]
+    keys: list[Key]
+    rows: dict[Key, list[str]]
+    raw: dict[Key, bytes]
+
+
+def parse(data: bytes, name: str = "") -> Table:
+    """Split ``data`` into keyed rows, keeping each record's raw bytes.
+
+    Raises:
+        csv_io.CsvScanError: On an unterminated quoted field.
+        UnicodeDecodeError: If the file is not UTF-8.
+    """
+    bom = codecs.BOM_UTF8 if data.startswith(codecs.BOM_UTF8) else b""
+    records = split_records(data[len(bom):], name)
+    newline = b"\r\n" if b"\r\n" in data else b"\n"
+
+    keys: list[Key] = []
+    rows: dict[Key, list[str]] = {}
+    raw: dict[Key, bytes] = {}
+    seen: dict[str, int] = {}
+    for record in records:
+        text = record.decode("utf-8")
+        cells = next(csv.reader(io.StringIO(text, newline="")), [])
+        first = cells[0].strip() if cells else ""
+        occurrence = seen.get(first, 0)
+        seen[first] = occurrence + 1
+        key = (first, occurrence)
+        keys.append(key)
+        rows[key] = cells
+        raw[key] = record
+    header = rows[keys[0]] if keys else []
+    return Table(bom, newline, header, keys, rows, raw)
+
+
+def _cells(table: Table, key: Key, columns: list[str]) -> list[str]:
+    """Row ``key`` of ``table`` laid out in ``columns`` ("" if missing)."""
+    cells = table.rows[key]
+    if not cells:
+        return []
+    index = {col: i for i, col in enumerate(table.header)}
+    return [
+        cells[index[c]] if c in index and index[c] < len(cells) else ""
+        for c in columns
+    ]
+
+
+class _Merger:
+    """Cell merging for one file; counts conflicting cells."""
+
+    def __init__(self, base: Table, ours: Table, theirs: Table, marker: int):
+        self.base, self.ours, self.theirs = base, ours, theirs
+        self.marker = marker
+        self.conflicts = 0
+        self.columns = list(ours.header) + [
+            c for c in theirs.header if c not in ours.header
+        ]
+
+    def conflict_cell(self, ours: str, theirs: str) -> str:
+        self.conflicts += 1
+        m = self.marker
+        return f"{'<' * m} ours\n{ours}\n{'=' * m}\n{theirs}\n{'>' * m} theirs"
+
+    def _base(self, key: Key) -> list[str]:
+        if key in self.base.rows:
+            return _cells(self.base, key, self.columns)
+        return [""] * len(self.columns)
+
+    def row(self, key: Key) -> list[str]:
+        """Merge a row present on both sides, cell by cell."""
+        o = _cells(self.ours, key, self.columns)
+        t = _cells(self.theirs, key, self.columns)
+        b = self._base(key)
+        if not o or not t:
+            return o or t
+        merged = []
+        for b_cell, o_cell, t_cell in zip(b or [""] * len(o), o, t):
+            if o_cell == t_cell or t_cell == b_cell:
+                merged.append(o_cell)
+            elif o_cell == b_cell:
+                merged.append(t_cell)
+            else:
+                merged.append(self.conflict_cell(o_cell, t_cell))
+        return merged
+
+    def modify_delete(self, key: Key, ours_changed: bool) -> list[str]:
+        """Keep a row one side changed and the other deleted, marked."""
+        kept = self.ours if ours_changed else self.theirs
+        merged = _cells(kept, key, self.columns)
+        b = self._base(key)
+        # Mark the first changed cell after the ID.
+        for i in range(1, len(merged)):
+            if i >= len(b) or merged[i] != b[i]:
+                merged[i] = (
+                    self.conflict_cell(merged[i], DELETED)
+                    if ours_changed
+                    else self.conflict_cell(DELETED, merged[i])
+                )
+                break
+        return merged
+
+
+def merge(
+    base: Table,
+    ours: Table,
+    theirs: Table,
+    *,
+    marker_size: int = DEFAULT_MARKER_SIZE,
+) -> tuple[bytes, int]:
+    """Merge ``theirs`` into ``ours`` against ``base``.
+
+    Returns:
+        ``(merged file bytes, conflicting cell count)``.
+    """
+    m = _Merger(base, ours, theirs, marker_size)
+    columns = m.columns
+    out: list[tuple[Key, list[str]]] = []
+
+    # Rows only theirs has (added, or changed after ours deleted them),
+    # keyed by the preceding theirs row that ours also has or that is
+    # itself pending, so consecutive additions form a chain.
+    pending: dict[Key | None, Key] = {}
+    anchor: Key | None = None
+    for key in theirs.keys:
+        if key in ours.rows:
+            anchor = key
+            continue
+        if key in base.rows and theirs.rows[key] == base.rows[key]:
+            continue  # deleted by ours, untouched by theirs
+        pending[anchor] = key
+        anchor = key
+
+    def flush(after: Key | None) -> None:
+        while after in pending:
+            key = pending.pop(after)
+            if key in base.rows:
+                out.append((key, m.modify_delete(key, ours_changed=False)))
+            else:
+                out.append((key, _cells(theirs, key, columns)))
+            after = key
+
+    flush(None)
+    for key in ours.keys:
+        if key in theirs.rows:
+            out.append((key, m.row(key)))
+        elif key not in base.rows:
+            out.append((key, _cells(ours, key, columns)))
+        elif ours.rows[key] != base.rows[key]:
+            out.append((key, m.modify_delete(key, ours_changed=True)))
+        # else: deleted by theirs, untouched by ours
+        flush(key)
+
+    return _serialize(ours, theirs, out, columns), m.conflicts
+
+
+def _serialize(
+    ours: Table,
+    theirs: Table,
+    out: list[tuple[Key, list[str]]],
+    columns: list[str],
+) -> bytes:
+    """Reuse raw records of rows equal to one side; re-encode the rest."""
+    newline = ours.newline
+    buf = io.StringIO(newline="")
+    writer = csv.writer(buf, lineterminator=newline.decode())
+    parts = [ours.bom]
+    for i, (key, cells) in enumerate(out):
+        raw = None
+        for table in (ours, theirs):
+            if key in table.rows and _cells(table, key, columns) == cells and (
+                table.header == columns
+            ):
+                raw = table.raw[key]
+                break
+        if raw is None:
+            buf.seek(0)
+            buf.truncate()
+            if cells:
+                writer.writerow(cells)
+            else:
+                buf.write(newline.decode())
+            raw = buf.getvalue().encode("utf-8")
+        if i < len(out) - 1 and not raw.endswith((b"\n", b"\r")):
+            raw += newline
+        parts.append(raw)
+    return b"".join(parts)
@@ -7,478 +7,116 @@
 Usage::
 
     python scripts/patch.py init --game-path "E:\\SteamLibrary\\...\\Star of Providence"
-    python scripts/patch.py stats
+    python scripts/patch.py stats [--detailed] [--json]
     python scripts/patch.py validate
+    python scripts/patch.py locate [--backup]
+    python scripts/patch.py backup --game-path "..."
+    python scripts/patch.py restore --game-path "..."
+    python scripts/patch.py verify [--game-path "..."]
+    python scripts/patch.py export-sqlite [--db localization.sqlite]
+    python scripts/patch.py import-sqlite [--db localization.sqlite]
+    python scripts/patch.py import pairs.csv [--mode overwrite] [--dry-run]
+    python scripts/patch.py shard --workers 4
+    python scripts/patch.py merge-shards shards/shard_*.json
+    python scripts/patch.py en-changes "<игра>/localization" | --since REV
+    python scripts/patch.py reveal-time [--top 20]
+    python scripts/patch.py preview [gossip_*.csv] [--overflow-only]
+    python scripts/patch.py edit gossip_tank.csv [--filter untranslated]
+    python scripts/patch.py serve [--socket /tmp/sop-ru.sock]
+    python scripts/patch.py build-release
+    python scripts/patch.py merge-driver %O %A %B %L %P   (git merge driver)
 """
 
 import argparse
-import csv
+import functools
+import json
 import logging
-import re
 import sys
 from pathlib import Path
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+# Command modules (csv_io, lint_rules, backup_store, ...) are imported by
+# the handlers that need them, so ``patch.py stats`` does not pay for
+# SQLite, hashing or the lint registry.
 logger = logging.getLogger(__name__)
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 LOCALIZATION_DIR = ROOT_DIR / "localization"
-ENCODING = "utf-8-sig"
-BACKUP_SUFFIX = ".backup_ru"
+GAME_PATH_CACHE = ROOT_DIR / ".game_path"
+SQLITE_DB = ROOT_DIR / "localization.sqlite"
+SHARDS_DIR = ROOT_DIR / "shards"
+RELEASE_ZIP = ROOT_DIR / "dist" / "star-of-providence-ru.zip"
+RELEASE_CACHE = ROOT_DIR / "dist" / ".build-cache.json"
+PREVIEW_DIR = ROOT_DIR / "preview"
 
 SKIP_FILES: frozenset[str] = frozenset({
     "keyboard_keys.csv",
     "keyboard_keys_switch.csv",
 })
 
-TAG_RE = re.compile(r"/[cfp]\d")
-VAR_RE = re.compile(r"%\w+%")
-
-MIN_LENGTH_FOR_CHECK: int = 10
-MAX_LENGTH_RATIO: float = 1.5
+# Target language columns; ZHS is the slot that holds the Russian text.
+DEFAULT_TARGETS: tuple[str, ...] = ("ZHS",)
 
 
 # ── Existing translations for migration during init ─────────────────────
-# After `init` completes, all translations live in localization/*.csv
-# and these dicts are no longer used at runtime.
-
-_TRANSLATIONS: dict[str, dict[str, str]] = {
-    "ui_strings.csv": {
-        "best:": "рекорд:",
-        "inactive machine": "неактивная машина",
-        "reward": "награда",
-        "reward lv.": "уровень награды",
-        "game in progress#continue?": "игра в процессе#продолжить?",
-        "yeah": "да",
-        "nah": "нет",
-        "save discrepancy detected##which save would#you like to use?": (
-            "обнаружено расхождение сохранений##какое сохранение#использовать?"
-        ),
-        "greetings, visitor %nr%": "привет, посетитель %nr%",
-        "external influence on database coherency has been detected_": (
-            "обнаружено внешнее воздействие на целостность базы данных_"
-        ),
-        "corruption levels: 94%,#null driver event imminent_": (
-            "уровень повреждения: 94%,#событие нулевого драйвера неизбежно_"
-        ),
-        "the user has been deemed a void-class threat_": (
-            "пользователь признан угрозой класса «пустота»_"
-        ),
-        "purification in progress..._": "очистка в процессе…_",
-        "thank you for using#the facility database_": (
-            "спасибо за использование#базы данных объекта_"
-        ),
-        "see you next time_": "до следующей встречи_",
-        "greetings, visitor_": "привет, посетитель_",
-        "-loop %loop%-": "-цикл %loop%-",
-        "local save": "локальное сохранение",
-        "cloud save": "облачное сохранение",
-        "hold confirm": "удерживайте",
-        "- save report": "- сохранить отчёт",
-        "good luck": "удачи",
-        "your time is nigh": "твой час близок",
-        "it begins": "начало",
-        "out of depth": "за гранью",
-        "everything hurts": "всё болит",
-        "eternal nightmare": "вечный кошмар",
-        "confirm choice": "подтвердить выбор",
-    },
-    "weapon_name.csv": {
-        "basic": "базовое",
-        "vulcan": "вулкан",
-        "fireball": "огненный шар",
-        "laser": "лазер",
-        "sword": "меч",
-        "charge": "заряд",
-        "revolver": "револьвер",
-        "razor": "бритва",
-        "pulsar": "пульсар",
-        "thunderhead": "громовая туча",
-        "railgun": "рельсотрон",
-        "drill": "бур",
-        "spear": "копьё",
-        "runic": "руническое",
-        "bow": "лук",
-        "grenade": "граната",
-        "skully": "скалли",
-    },
-    "option_caption.csv": {
-        "start": "старт",
-        "options": "опции",
-        "exit": "выход",
-        "back": "назад",
-        "video": "видео",
-        "audio": "звук",
-        "controls": "управление",
-        "mode": "режим",
-        "resolution": "разрешение",
-        "cursor": "курсор",
-        "shake cam": "тряска камеры",
-        "fullscreen": "полный экран",
-        "window": "окно",
-        "default": "по умолчанию",
-        "crosshair": "прицел",
-        "mild": "лёгкая",
-        "normal": "обычная",
-        "strong": "сильная",
-        "nuclear": "ядерная",
-        "music volume": "громкость музыки",
-        "sfx volume": "громкость эффектов",
-        "control mode": "режим управления",
-        "keyboard": "клавиатура",
-        "controller": "геймпад",
-        "resume": "продолжить",
-        "exit to menu": "в меню",
-        "exit game": "выход из игры",
-        "enter the new key": "нажмите новую клавишу",
-        "escape to cancel": "ESC — отмена",
-        "key already in use": "клавиша уже занята",
-        "language": "язык",
-        "choose one": "выберите один",
-        "so be it": "да будет так",
-        "thats all folks": "вот и всё",
-        "photosensitivity": "светочувствительность",
-        "on": "вкл",
-        "off": "выкл",
-        "3d sound": "3D-звук",
-        "global": "глобальный",
-        "local": "локальный",
-        "scanlines": "развёртка",
-        "interpolation": "интерполяция",
-        "reset controls": "сбросить управление",
-        "aim opacity": "прозрачность прицела",
-        "v-sync": "верт. синхр.",
-        "the nimbus#has been broken": "нимб#разрушен",
-        "crosshair 2": "прицел 2",
-        "reset progress": "сбросить прогресс",
-        "crt": "ЭЛТ",
-        "ui flicker": "мерцание интерфейса",
-        "enter the new button": "нажмите новую кнопку",
-        "start to cancel": "START — отмена",
-        "button already in use": "кнопка уже занята",
-        "hitbox": "хитбокс",
-        "outlines": "контуры",
-        "restart": "перезапуск",
-        "shiny lasers": "яркие лазеры",
-        "guns on hold": "стрельба по удержанию",
-        "the breach#has been opened": "брешь#открыта",
-        "laser aim": "лазерный прицел",
-        "empty": "пусто",
-        "cannot#dig here": "здесь#копать нельзя",
-        "back to hub": "в хаб",
-        "-tier %tier%-": "-уровень %tier%-",
-        "bravo!": "браво!",
-        "excellent!": "отлично!",
-        "perfect!": "идеально!",
-        "touchscreen": "сенсорный экран",
-        "strafing": "стрейф",
-        "vibration": "вибрация",
-        "button style": "стиль кнопок",
-        "auto": "авто",
-        "playstation": "PLAYSTATION",
-        "xbox": "XBOX",
-        "switch pro": "SWITCH PRO",
-        "generic": "общий",
-        "+ to cancel": "+ — отмена",
-        "aim assist": "помощь прицеливания",
-        "assist range": "радиус помощи",
-        "wallpaper": "обои",
-        "low": "низкая",
-        "medium": "средняя",
-        "high": "высокая",
-        "extreme": "экстрим",
-    },
-    "option_tooltip.csv": {
-        "set graphical options": "настройки графики",
-        "set audio options": "настройки звука",
-        "rebind controls#or set control mode": (
-            "назначение клавиш#и режим управления"
-        ),
-        "changes game language": "смена языка игры",
-        "change window mode": "режим окна",
-        "set window resolution": "разрешение окна",
-        "set cursor type": "тип курсора",
-        "intensity of screen shaking": "интенсивность тряски камеры",
-        "tones down#most flashing effects": (
-            "смягчает#большинство мигающих эффектов"
-        ),
-        "volume of sound effects": "громкость эффектов",
-        "volume of music": "громкость музыки",
-        "rebind the controls": "назначить клавиши управления",
-        "removes the cursor#and allows dual-stick aiming": (
-            "убирает курсор#и включает прицеливание двумя стиками"
-        ),
-        "toggles type of#directional sound": (
-            "переключает тип#пространственного звука"
-        ),
-        "sets scanline strength": "сила линий развёртки",
-        "smoothes the pixel graphics": "сглаживание пиксельной графики",
-        "resets controls#to default": "сброс управления#по умолчанию",
-        "sets the visibility#of the aim reticle": "видимость прицела",
-        "prevents tearing#may cause slowdown": (
-            "устраняет разрывы#может снизить FPS"
-        ),
-        "hold confirm#to erase everything": (
-            "удерживайте для полного сброса"
-        ),
-        "sets crt filter": "фильтр ЭЛТ",
-        "toggles the ui flickering": "мерцание интерфейса",
-        "show player hitbox": "показывать хитбокс игрока",
-        "outlines all walls": "контуры стен",
-        "hold confirm to#restart the run": (
-            "удерживайте для перезапуска забега"
-        ),
-        "bomb to scrap": "бомба в лом",
-        "enables additive blend mode#for enemy lasers": (
-            "аддитивный режим#для вражеских лазеров"
-        ),
-        "controller option#disables stick fire": (
-            "отключить стрельбу стиком"
-        ),
-        "assist aim with a#laser pointer": "подсветка прицела лазером",
-        "enables touchscreen for#menus and aiming": (
-            "сенсорный экран для меню и прицела"
-        ),
-        "controller option#disables move stick aim": (
-            "отключить прицел стиком движения"
-        ),
-        "disables move stick aim": "прицел стиком движения выкл",
-        "disables stick fire": "стрельба стиком выкл",
-        "controller option#toggles vibration": "вибрация геймпада",
-        "toggles vibration": "вибрация вкл/выкл",
-        "controller option#changes controller graphics": (
-            "иконки кнопок геймпада"
-        ),
-        "adjusts aim assist": "помощь прицеливания",
-        "controller option#adjusts aim assist": (
-            "помощь прицеливания (геймпад)"
-        ),
-        "alters aim assist range": "радиус помощи прицеливания",
-        "controller option#alters aim assist range": (
-            "радиус помощи (геймпад)"
-        ),
-        "displays art#in the sidebars": "картинки на боковых панелях",
-    },
-    "rarity_name.csv": {
-        "common": "обычный",
-        "rare": "редкий",
-        "legendary": "легендарный",
-        "eternal": "вечный",
-    },
-    "stat_name.csv": {
-        "rarity": "редкость",
-        "damage": "урон",
-        "firerate": "скорострельность",
-        "max ammo": "макс. боезапас",
-        "crit chance": "шанс крита",
-        "crit damage": "урон крита",
-        "refill ammo": "пополнение боезапаса",
-        "max hp": "макс. ОЗ",
-        "gain bombs": "получить бомбы",
-        "gain a shield": "получить щит",
-    },
-    "mode_name.csv": {
-        "player": "игрок",
-        "lethality": "летальность",
-        "exit": "выход",
-        "null#normal mode": "null#обычный режим",
-        "d-13#hard mode": "d-13#сложный режим",
-        "overlord#sword mode": "overlord#режим меча",
-        "???#chaos mode": "???#режим хаоса",
-        "null": "null",
-        "d-13": "d-13",
-        "overlord": "overlord",
-        "???": "???",
-        "a. blaster": "a. бластер",
-        "arena blaster#no bombs, active items": (
-            "арена бластер#без бомб, с активными предметами"
-        ),
-        "skully#modular weapons": "скалли#модульное оружие",
-        "skully": "скалли",
-        "armsmaster#two weapon slots, no bombs": (
-            "мастер оружия#два слота оружия, без бомб"
-        ),
-        "armsmaster": "мастер оружия",
-        "mild#100% damage, 10 health": "лёгкий#100% урона, 10 ОЗ",
-        "intense#125% damage, 50% health": "интенсив#125% урона, 50% ОЗ",
-        "sudden death#200% damage, 1 hp": (
-            "внезапная смерть#200% урона, 1 ОЗ"
-        ),
-        "mild": "лёгкий",
-        "intense": "интенсив",
-        "sudden death": "внезапная смерть",
-        "seed": "сид",
-        "random": "случайно",
-        "random seed": "случайный сид",
-        "custom seed#press to set": "свой сид#нажмите для ввода",
-        "normal mode#default difficulty": (
-            "обычный режим#стандартная сложность"
-        ),
-        "hard mode#expert difficulty": "сложный режим#для экспертов",
-        "normal": "обычный",
-        "hard": "сложный",
-        "difficulty": "сложность",
-        "loops": "циклы",
-        "enabled": "вкл",
-        "disabled": "выкл",
-        "null#twelfth visitor": "null#двенадцатый посетитель",
-        "d-13#thirteenth visitor": "d-13#тринадцатый посетитель",
-    },
-    "boss_name.csv": {
-        "forgotten": "забытый",
-        "ringleader": "главарь",
-        "thirteenth": "тринадцатый",
-        "special": "особый",
-        "offer": "предложение",
-        "core": "ядро",
-        "nightmare": "кошмар",
-        "dont steal": "не воруй",
-        "the warden": "надзиратель",
-        "the arbitor": "арбитр",
-        "chaosgod": "бог хаоса",
-        "ace of storms": "туз бурь",
-        "special offer": "спецпредложение",
-        "the machine": "машина",
-        "lucid dream": "осознанный сон",
-    },
-    "blessing_name.csv": {
-        "flame": "пламя",
-        "frost": "мороз",
-        "earth": "земля",
-        "storm": "буря",
-        "sight": "зоркость",
-        "abyss": "бездна",
-        "enigma": "загадка",
-    },
-    "upgrade_name.csv": {
-        "salvage": "утилизация",
-        "weatherproof": "всепогодность",
-        "focus": "фокус",
-        "scanner": "сканер",
-        "stealth": "скрытность",
-        "discount": "скидка",
-        "autobomb": "автобомба",
-        "plating": "броня",
-        "artifact": "артефакт",
-        "blink": "рывок",
-        "second wind": "второе дыхание",
-        "extra pow": "доп. мощь",
-        "fortune": "удача",
-        "reserves": "резерв",
-        "power eternal": "вечная сила",
-        "quickening": "ускорение",
-        "scrap runner": "гонка лома",
-        "capacity": "вместимость",
-        "expansion port": "порт расширения",
-        "packrat": "коллекционер",
-    },
-    "area_name.csv": {
-        "excavation": "раскопки",
-        "archives": "архивы",
-        "maintenance system": "система обслуживания",
-        "bellows": "кузница",
-        "sanctum": "святилище",
-        "the temple": "храм",
-        "nowhere": "нигде",
-    },
-    "control_display.csv": {
-        "up": "вверх",
-        "left": "влево",
-        "down": "вниз",
-        "right": "вправо",
-        "select": "выбор",
-        "cancel": "отмена",
-        "fire": "огонь",
-        "dash": "рывок",
-        "bomb": "бомба",
-        "map": "карта",
-    },
-    "credits.csv": {
-        "programming:": "программирование:",
-        "art and direction:": "арт и руководство:",
-        "music and sfx:": "музыка и звуки:",
-        "--special thanks--": "--особая благодарность--",
-        "and all the users#of the uff forums": (
-            "и все пользователи#форумов uff"
-        ),
-        "and all the#aspiring yesdevs#of /agdg/": (
-            "и все начинающие#разработчики#из /agdg/"
-        ),
-        "all the people#who played the demo#and spread the word": (
-            "все, кто играл в демо#и рассказывал друзьям"
-        ),
-        "many more": "и многие другие",
-        "and you": "и тебе",
-        "-thank you for playing-": "-спасибо за игру-",
-        "the end?": "конец?",
-        "-you've done your best-": "-ты сделал всё, что мог-",
-        "splash art:": "сплэш-арт:",
-    },
-}
-
-_LANGUAGE_NAMES_RU: dict[str, str] = {
-    "english": "английский",
-    "german": "немецкий",
-    "french": "французский",
-    "spanish": "испанский",
-    "portugese": "португальский",
-    "chinese": "русский",
-    "japanese": "японский",
-}
+# After `init` completes, all translations live in localization/*.csv.
+# The seed data is only read by `init`, so it lives in a JSON file loaded
+# on first use instead of being built on every invocation.
 
+SEED_FILE = Path(__file__).resolve().parent / "init_seed.json"
 
-# ── CSV I/O ─────────────────────────────────────────────────────────────
-
-
-def read_csv(path: Path) -> list[list[str]]:
-    """Read a CSV file with UTF-8 BOM encoding.
-
-    Args:
-        path: Path to the CSV file.
 
-    Returns:
-        List of rows, each row is a list of column values.
-    """
-    with path.open(encoding=ENCODING, newline="") as f:
-        return list(csv.reader(f))
+@functools.cache
+def _seed() -> dict[str, dict]:
+    """Load ``{"translations": {file: {en: ru}}, "language_names": {en: ru}}``."""
+    return json.loads(SEED_FILE.read_text(encoding="utf-8"))
 
 
-def write_csv(path: Path, rows: list[list[str]]) -> None:
-    """Write rows to a CSV file with UTF-8 BOM encoding.
+def _col_indices(
+    header: list[str], targets: tuple[str, ...] = DEFAULT_TARGETS
+) -> tuple[int, dict[str, int]] | None:
+    """Return ``(en_idx, {target: idx})`` or ``None`` if columns are missing.
 
-    Args:
-        path: Destination path.
-        rows: List of rows to write.
+    Targets absent from ``header`` are left out of the mapping.
     """
-    with path.open("w", encoding=ENCODING, newline="") as f:
-        csv.writer(f).writerows(rows)
-
-
-def _is_data_row(row: list[str]) -> bool:
-    """Row has a numeric ID → contains translatable content."""
-    return bool(row and row[0].strip().isdigit())
+    present = {t: header.index(t) for t in targets if t in header}
+    if "EN" not in header or not present:
+        return None
+    return header.index("EN"), present
 
 
-def _col_indices(header: list[str]) -> tuple[int, int] | None:
-    """Return ``(en_idx, zhs_idx)`` or ``None`` if columns are missing."""
-    if "EN" not in header or "ZHS" not in header:
-        return None
-    return header.index("EN"), header.index("ZHS")
+def _parse_targets(value: str) -> tuple[str, ...]:
+    """Parse ``--target COL[,COL...]`` into a tuple of column names."""
+    targets = tuple(dict.fromkeys(t.strip() for t in value.split(",")))
+    targets = tuple(t for t in targets if t)
+    if not targets:
+        raise argparse.ArgumentTypeError("нужна хотя бы одна колонка")
+    return targets
 
 
 # ── init ────────────────────────────────────────────────────────────────
 
 
-def cmd_init(game_path: Path, *, force: bool = False) -> None:
+def cmd_init(
+    game_path: Path,
+    *,
+    force: bool = False,
+    targets: tuple[str, ...] = DEFAULT_TARGETS,
+) -> None:
     """Copy game CSVs to ``localization/``, applying existing translations.
 
-    Prefers backup files (``*.csv.backup_ru``) over potentially
-    already-patched game files as the source of original data.
+    Prefers the backup store (``_backup_ru/store``) for the installed game
+    version, then the legacy backups, over potentially already-patched game
+    files as the source of original data.
 
     Args:
         game_path: Root directory of the game (contains ``localization/``).
         force: Overwrite existing files in ``localization/``.
+        targets: Target columns to fill; ZHS gets the Russian seed
+            translations, other columns the EN fallback.
     """
+    import backup_store
+    from csv_io import write_csv
+
     loc_src = game_path / "localization"
     if not loc_src.is_dir():
         logger.error("Папка localization не найдена: %s", loc_src)
@@ -486,6 +124,11 @@ def cmd_init(game_path: Path, *, force: bool = False) -> None:
 
     LOCALIZATION_DIR.mkdir(exist_ok=True)
 
+    store = game_path / backup_store.STORE_SUBDIR
+    manifest = backup_store.read_manifest(
+        store, backup_store.game_version(game_path)
+    ) or {}
+
     csv_files = sorted(loc_src.glob("*.csv"))
     created = 0
     skipped = 0
@@ -505,29 +148,33 @@ def cmd_init(game_path: Path, *, force: bool = False) -> None:
             skipped += 1
             continue
 
-        original = src.with_suffix(src.suffix + BACKUP_SUFFIX)
-        source = original if original.exists() else src
-
-        rows = read_csv(source)
+        rows = _read_original(src, store, manifest)
         if not rows:
             continue
 
-        indices = _col_indices(rows[0])
+        indices = _col_indices(rows[0], targets)
         if indices is None:
             continue
 
-        en_idx, zhs_idx = indices
+        en_idx, target_idx = indices
 
-        if src.name == "language_name.csv":
-            _init_language_name(rows, en_idx, zhs_idx)
-        else:
-            trans = _TRANSLATIONS.get(src.name, {})
-            _init_data_rows(rows, en_idx, zhs_idx, trans)
+        for target, zhs_idx in target_idx.items():
+            if target != "ZHS":
+                _init_data_rows(rows, en_idx, zhs_idx, {})
+            elif src.name == "language_name.csv":
+                _init_language_name(rows, en_idx, zhs_idx)
+            else:
+                trans = _seed()["translations"].get(src.name, {})
+                _init_data_rows(rows, en_idx, zhs_idx, trans)
 
         write_csv(dest, rows)
         created += 1
 
-        label = "RU" if src.name in _TRANSLATIONS else "EN fallback"
+        label = (
+            "RU"
+            if "ZHS" in target_idx and src.name in _seed()["translations"]
+            else "EN fallback"
+        )
         logger.info("  [%s] %s", label, src.name)
 
     logger.info("")
@@ -541,6 +188,37 @@ def cmd_init(game_path: Path, *, force: bool = False) -> None:
         logger.info("Используйте --force для перезаписи существующих файлов.")
 
 
+def _read_original(
+    src: Path, store: Path, manifest: dict[str, dict]
+) -> list[list[str]]:
+    """Read the unpatched version of a game CSV.
+
+    Uses the backup store object when the manifest lists the file, otherwise
+    the legacy ``_backup_ru/`` copy or ``*.csv.backup_ru`` sibling, and
+    finally the game file itself.
+    """
+    import csv
+    import io
+
+    import backup_store
+    from csv_io import ENCODING, read_csv
+
+    rel = f"localization/{src.name}"
+    if rel in manifest:
+        data = backup_store.get_object(store, manifest[rel]["sha256"])
+        text = data.decode(ENCODING)
+        return list(csv.reader(io.StringIO(text, newline="")))
+
+    game_path = src.parent.parent
+    for legacy in (
+        game_path / backup_store.LEGACY_BACKUP_SUBDIR / rel,
+        src.with_name(src.name + backup_store.LEGACY_SUFFIX),
+    ):
+        if legacy.is_file():
+            return read_csv(legacy)
+    return read_csv(src)
+
+
 def _init_data_rows(
     rows: list[list[str]],
     en_idx: int,
@@ -548,8 +226,10 @@ def _init_data_rows(
     translations: dict[str, str],
 ) -> None:
     """Set ZHS = Russian translation or EN fallback for each data row."""
+    from csv_io import is_data_row
+
     for row in rows[1:]:
-        if not _is_data_row(row) or len(row) <= max(en_idx, zhs_idx):
+        if not is_data_row(row) or len(row) <= max(en_idx, zhs_idx):
             continue
         en_val = row[en_idx].strip()
         if not en_val:
@@ -563,6 +243,7 @@ def _init_language_name(
     zhs_idx: int,
 ) -> None:
     """Replace the Chinese language slot with Russian."""
+    names = _seed()["language_names"]
     for row in rows[1:]:
         if len(row) <= max(en_idx, zhs_idx):
             continue
@@ -573,8 +254,8 @@ def _init_language_name(
             for i in range(3, len(row)):
                 if i != zhs_idx:
                     row[i] = "russian"
-        elif en_val in _LANGUAGE_NAMES_RU:
-            row[zhs_idx] = _LANGUAGE_NAMES_RU[en_val]
+        elif en_val in names:
+            row[zhs_idx] = names[en_val]
         elif en_val:
             row[zhs_idx] = en_val
 
@@ -582,8 +263,17 @@ def _init_language_name(
 # ── stats ───────────────────────────────────────────────────────────────
 
 
-def cmd_stats() -> None:
-    """Print a translation coverage table for all files in ``localization/``."""
+def cmd_stats(targets: tuple[str, ...] = DEFAULT_TARGETS) -> None:
+    """Print a translation coverage table for all files in ``localization/``.
+
+    Every file is scanned once for all ``targets``; one table per target
+    column is printed.
+
+    Args:
+        targets: Target columns to report on.
+    """
+    from csv_io import is_data_row, is_translated, read_csv
+
     if not LOCALIZATION_DIR.is_dir():
         logger.error(
             "Каталог localization/ не найден. Сначала: patch.py init"
@@ -591,42 +281,66 @@ def cmd_stats() -> None:
         sys.exit(1)
 
     csv_files = sorted(LOCALIZATION_DIR.glob("*.csv"))
-    total_all = 0
-    total_done = 0
-
-    print(f"\n{'Файл':<35} {'Строк':>6} {'Перевод':>8} {'Прогресс':>9}")
-    print("─" * 62)
+    per_target: dict[str, list[tuple[str, int, int]]] = {
+        t: [] for t in targets
+    }
 
     for path in csv_files:
         rows = read_csv(path)
-        if not rows:
+        if not rows or "EN" not in rows[0]:
             continue
-
-        indices = _col_indices(rows[0])
-        if indices is None:
+        header = rows[0]
+        present = [t for t in targets if t in header]
+        if not present:
             continue
-
-        en_idx, zhs_idx = indices
-        file_total = 0
-        file_done = 0
+        en_idx = header.index("EN")
+        indices = [header.index(t) for t in present]
+        width = max(en_idx, *indices)
+        totals = dict.fromkeys(present, 0)
+        done = dict.fromkeys(present, 0)
 
         for row in rows[1:]:
-            if not _is_data_row(row) or len(row) <= max(en_idx, zhs_idx):
+            if not is_data_row(row) or len(row) <= width:
                 continue
             en_val = row[en_idx].strip()
-            zhs_val = row[zhs_idx].strip()
             if not en_val:
                 continue
-            file_total += 1
-            if zhs_val and zhs_val != en_val:
-                file_done += 1
+            for target, idx in zip(present, indices):
+                totals[target] += 1
+                if is_translated(en_val, row[idx]):
+                    done[target] += 1
+
+        for target in present:
+            if totals[target]:
+                per_target[target].append(
+                    (path.name, totals[target], done[target])
+                )
+
+    for target, file_rows in per_target.items():
+        _print_stats_table(
+            file_rows, title=target if len(targets) > 1 else None
+        )
+
+
+def _print_stats_table(
+    file_rows: list[tuple[str, int, int]], *, title: str | None = None
+) -> None:
+    """Print one coverage table of ``(file, total, done)`` rows."""
+    total_all = 0
+    total_done = 0
+
+    if title:
+        print(f"\n── {title} ──")
+    print(f"\n{'Файл':<35} {'Строк':>6} {'Перевод':>8} {'Прогресс':>9}")
+    print("─" * 62)
 
+    for name, file_total, file_done in file_rows:
         total_all += file_total
         total_done += file_done
         pct = (file_done / file_total * 100) if file_total else 0.0
         mark = "✓" if file_total and pct == 100.0 else " "
         print(
-            f"{mark} {path.name:<33} {file_total:>6} {file_done:>8}"
+            f"{mark} {name:<33} {file_total:>6} {file_done:>8}"
             f" {pct:>8.1f}%"
         )
 
@@ -639,130 +353,1580 @@ def cmd_stats() -> None:
     print()
 
 
+def cmd_stats_detailed(
+    top: int = 20,
+    *,
+    targets: tuple[str, ...] = DEFAULT_TARGETS,
+    as_json: bool = False,
+) -> None:
+    """Print length distributions of translated rows (``stats --detailed``).
+
+    Per category and per file: translation/EN ratio of visible lengths
+    (mean, p10/p50/p90), mean visible length, mean and max line count, and
+    the number of robust z-score outliers; then the ``top`` outliers.
+
+    Args:
+        top: Outlier rows to list.
+        targets: Target columns to report on.
+        as_json: Print one JSON object keyed by target instead of tables.
+    """
+    import corpus_stats
+
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error("Каталог localization/ не найден. Сначала: patch.py init")
+        sys.exit(1)
+
+    csv_files = sorted(LOCALIZATION_DIR.glob("*.csv"))
+    try:
+        tables = corpus_stats.load(csv_files, targets)
+    except RuntimeError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    reports = {
+        target: corpus_stats.report(table, top) for target, table in tables.items()
+    }
+
+    if as_json:
+        print(json.dumps(reports, ensure_ascii=False, indent=1))
+        return
+
+    for target, report in reports.items():
+        if len(targets) > 1:
+            print(f"\n── {target} ──")
+        for title, groups in (
+            ("Категории", report["categories"]),
+            ("Файлы", report["files"]),
+        ):
+            _print_length_table(title, groups)
+
+        print(
+            f"\n── Выбросы (|z| > {corpus_stats.OUTLIER_Z},"
+            f" отношение длин {target}/EN) ──"
+        )
+        print(
+            f"\n{'Файл:строка':<30} {'Категория':<12} {'EN':>5}"
+            f" {target:>5} {'Отн.':>6} {'z':>6}"
+        )
+        print("─" * 69)
+        for o in report["outliers"]:
+            print(
+                f"{o['file'] + ':' + str(o['line']):<30} {o['category']:<12}"
+                f" {o['en_visible']:>5} {o['visible']:>5}"
+                f" {o['ratio']:>6.2f} {o['z']:>+6.2f}"
+            )
+        print()
+
+
+def _print_length_table(title: str, groups: dict[str, dict]) -> None:
+    """Print one ``stats --detailed`` table of group summaries."""
+    print(f"\n── {title} ──")
+    print(
+        f"\n{'':<28} {'Строк':>6} {'Отн.':>5} {'p10':>5} {'p50':>5}"
+        f" {'p90':>5} {'Симв.':>6} {'Стр.':>5} {'Макс':>4} {'Выбр.':>5}"
+    )
+    print("─" * 82)
+
+    def num(value: float | None) -> str:
+        return "—" if value is None else f"{value:.2f}"
+
+    for name, s in groups.items():
+        print(
+            f"{name:<28} {s['rows']:>6} {num(s['ratio_mean']):>5}"
+            f" {num(s['ratio_p10']):>5} {num(s['ratio_p50']):>5}"
+            f" {num(s['ratio_p90']):>5} {s['visible_mean']:>6.1f}"
+            f" {s['lines_mean']:>5.2f} {s['lines_max']:>4}"
+            f" {s['outliers']:>5}"
+        )
+
+
 # ── validate ────────────────────────────────────────────────────────────
 
 
-def cmd_validate() -> None:
-    """Check translated rows for missing tags, variables, and length issues."""
+def cmd_validate(
+    *,
+    enable: list[str] | None = None,
+    disable: list[str] | None = None,
+    severity: dict[str, str] | None = None,
+    timings: bool = False,
+    targets: tuple[str, ...] = DEFAULT_TARGETS,
+) -> None:
+    """Run the lint rules over every translated row in ``localization/``.
+
+    All active rules run in one pass per row (see ``lint_rules``) for every
+    target column. Exits with code 1 if any ``error``-severity rule fired.
+
+    Args:
+        enable: Extra rules to enable (including disabled-by-default ones).
+        disable: Rules to skip.
+        severity: Per-rule severity overrides.
+        timings: Print per-rule hit counts and time after the report.
+        targets: Target columns to check against EN.
+    """
+    from csv_io import is_data_row, read_csv
+    from lint_rules import LintEngine, file_category
+
     if not LOCALIZATION_DIR.is_dir():
         logger.error(
             "Каталог localization/ не найден. Сначала: patch.py init"
         )
         sys.exit(1)
 
+    try:
+        engine = LintEngine.from_registry(
+            enable or (), disable or (), severity
+        )
+    except ValueError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
     csv_files = sorted(LOCALIZATION_DIR.glob("*.csv"))
-    issues: list[str] = []
+    issues: dict[str, list[tuple[str, str]]] = {t: [] for t in targets}
 
     for path in csv_files:
+        rules = engine.rules_for(file_category(path.name))
+        if not rules:
+            continue
         rows = read_csv(path)
-        if not rows:
+        header = rows[0] if rows else []
+        present = [t for t in targets if t in header]
+        if not present:
             continue
-
-        indices = _col_indices(rows[0])
-        if indices is None:
+        columns = ("ID", "Comments", *engine.columns_for(present))
+        if any(c not in header for c in columns):
             continue
-
-        en_idx, zhs_idx = indices
+        indices = [header.index(c) for c in columns]
+        width = max(indices)
 
         for line_num, row in enumerate(rows[1:], start=2):
-            if not _is_data_row(row) or len(row) <= max(en_idx, zhs_idx):
+            if not is_data_row(row) or len(row) <= width:
                 continue
 
-            en_val = row[en_idx]
-            zhs_val = row[zhs_idx]
-
-            if not en_val.strip() or zhs_val.strip() == en_val.strip():
+            cells = {c: row[i] for c, i in zip(columns, indices)}
+            en_val = cells["EN"]
+            if not en_val.strip():
                 continue
 
-            en_tags = sorted(TAG_RE.findall(en_val))
-            zhs_tags = sorted(TAG_RE.findall(zhs_val))
-            if en_tags != zhs_tags:
-                issues.append(
-                    f"{path.name}:{line_num} теги: "
-                    f"EN={en_tags} ≠ ZHS={zhs_tags}"
-                )
+            for target in present:
+                if cells[target].strip() == en_val.strip():
+                    continue
+                for issue in engine.check_row(
+                    rules, cells, cells["Comments"], dst=target
+                ):
+                    issues[target].append(
+                        (
+                            issue.severity,
+                            f"{path.name}:{line_num} {issue.message}",
+                        )
+                    )
+
+    n_errors = 0
+    for target, target_issues in issues.items():
+        if len(targets) > 1:
+            print(f"\n── {target} ──")
+        errors_here = sum(1 for sev, _ in target_issues if sev == "error")
+        n_errors += errors_here
+        if target_issues:
+            print(
+                f"\nНайдено проблем: {len(target_issues)}"
+                f" (ошибок: {errors_here})\n"
+            )
+            for sev, issue in target_issues:
+                print(f"  {'✗' if sev == 'error' else '⚠'} {issue}")
+        else:
+            print("\n✓ Проблем не найдено.")
+        print()
+
+    if timings:
+        print(f"{'Правило':<16} {'Серьёзн.':<9} {'Срабат.':>8} {'мс':>8}")
+        print("─" * 44)
+        for r in engine.rules:
+            st = engine.stats[r.name]
+            print(
+                f"{r.name:<16} {r.severity:<9} {st.hits:>8}"
+                f" {st.seconds * 1000:>8.1f}"
+            )
+        print()
+
+    if n_errors:
+        sys.exit(1)
 
-            en_vars = sorted(VAR_RE.findall(en_val))
-            zhs_vars = sorted(VAR_RE.findall(zhs_val))
-            if en_vars != zhs_vars:
-                issues.append(
-                    f"{path.name}:{line_num} переменные: "
-                    f"EN={en_vars} ≠ ZHS={zhs_vars}"
-                )
 
-            en_breaks = en_val.count("#")
-            zhs_breaks = zhs_val.count("#")
-            if en_breaks != zhs_breaks:
-                issues.append(
-                    f"{path.name}:{line_num} переносы #: "
-                    f"EN={en_breaks} ≠ ZHS={zhs_breaks}"
-                )
+def cmd_list_rules() -> None:
+    """Print registered lint rules with their defaults."""
+    from lint_rules import RULES
 
-            if en_val.rstrip().endswith("_") and not zhs_val.rstrip().endswith(
-                "_"
-            ):
-                issues.append(
-                    f"{path.name}:{line_num} отсутствует завершающий '_'"
-                )
+    for name, r in RULES.items():
+        state = "" if r.enabled else " (выкл.)"
+        print(f"{name:<14} {r.severity:<8} {r.description}{state}")
 
-            en_len = len(en_val.strip())
-            zhs_len = len(zhs_val.strip())
-            if (
-                en_len > MIN_LENGTH_FOR_CHECK
-                and zhs_len > en_len * MAX_LENGTH_RATIO
-            ):
-                issues.append(
-                    f"{path.name}:{line_num} длина: "
-                    f"{zhs_len} символов (EN: {en_len})"
-                )
 
-    if issues:
-        print(f"\nНайдено проблем: {len(issues)}\n")
-        for issue in issues:
-            print(f"  ⚠ {issue}")
-    else:
-        print("\n✓ Проблем не найдено.")
+# ── locate ──────────────────────────────────────────────────────────────
+
+
+def cmd_locate(
+    *,
+    backup: bool = False,
+    steam_dirs: list[Path] | None = None,
+    timeout: float | None = None,
+    use_cache: bool = True,
+) -> None:
+    """Print the game directory found via Steam libraries and drive probing.
+
+    Only the path goes to stdout, so ``.bat`` scripts can capture it with
+    ``for /f``. Exits with code 1 if the game is not found.
+
+    Args:
+        backup: Look for ``_backup_ru/`` (backup store or legacy copies)
+            instead of ``localization``.
+        steam_dirs: Extra Steam directories to search first.
+        timeout: Per-candidate probe timeout in seconds (default
+            ``steam_locate.PROBE_TIMEOUT``).
+        use_cache: Try and update the last known path in ``.game_path``.
+    """
+    from steam_locate import BACKUP_MARKER, INSTALL_MARKER, PROBE_TIMEOUT, locate
+
+    game = locate(
+        BACKUP_MARKER if backup else INSTALL_MARKER,
+        cache_file=GAME_PATH_CACHE if use_cache else None,
+        extra_steam_dirs=steam_dirs or (),
+        timeout=PROBE_TIMEOUT if timeout is None else timeout,
+    )
+    if game is None:
+        logger.error("Папка игры не найдена.")
+        sys.exit(1)
+    print(game)
+
+
+# ── backup / restore ────────────────────────────────────────────────────
+
+
+def cmd_backup(
+    game_path: Path,
+    *,
+    codec: str = "zlib",
+    version: str | None = None,
+    force: bool = False,
+) -> None:
+    """Save original game files into the content-addressed backup store.
+
+    Args:
+        game_path: Root directory of the game.
+        codec: Object compression: ``none``, ``zlib`` or ``zstd``.
+        version: Game version label; defaults to the Steam build id.
+        force: Rewrite the manifest if this version is already backed up.
+    """
+    import backup_store
+
+    if not (game_path / "localization").is_dir():
+        logger.error("Папка localization не найдена: %s", game_path)
+        sys.exit(1)
+
+    store = game_path / backup_store.STORE_SUBDIR
+    version = version or backup_store.game_version(game_path)
+    if backup_store.read_manifest(store, version) and not force:
+        logger.info("Бэкап версии %s уже существует, пропускаем.", version)
+        return
+
+    skipped: list[str] = []
+    try:
+        files, new_objects = backup_store.snapshot(
+            store,
+            version,
+            backup_store.original_sources(game_path, skipped),
+            codec,
+        )
+    except ValueError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    for rel in skipped:
+        logger.warning("  %s уже пропатчен, оригинала нет — пропущен", rel)
+
+    logger.info(
+        "Бэкап версии %s: файлов %d, новых объектов %d. Хранилище: %s",
+        version,
+        len(files),
+        new_objects,
+        store,
+    )
+
+
+def cmd_restore(
+    game_path: Path,
+    *,
+    version: str | None = None,
+    dry_run: bool = False,
+) -> None:
+    """Restore original game files that differ from the backup manifest.
+
+    Args:
+        game_path: Root directory of the game.
+        version: Manifest to restore; defaults to the installed build id.
+        dry_run: Only list the files that would be restored.
+    """
+    import backup_store
+
+    store = game_path / backup_store.STORE_SUBDIR
+    version = version or backup_store.game_version(game_path)
+    files = backup_store.read_manifest(store, version)
+    if files is None:
+        known = ", ".join(backup_store.versions(store)) or "нет"
+        logger.error(
+            "Бэкап версии %s не найден. Доступные версии: %s", version, known
+        )
+        sys.exit(1)
+
+    try:
+        restored, unchanged = backup_store.restore(
+            store, game_path, files, dry_run=dry_run
+        )
+    except (OSError, ValueError) as e:
+        logger.error("Ошибка восстановления: %s", e)
+        sys.exit(1)
+
+    for rel in restored:
+        logger.info("  [%s] %s", "diff" if dry_run else "restored", rel)
+    logger.info(
+        "Готово: восстановлено %d, без изменений %d.",
+        len(restored),
+        unchanged,
+    )
+
+
+# ── verify ──────────────────────────────────────────────────────────────
+
+
+def cmd_verify(
+    game_path: Path | None = None,
+    *,
+    jobs: int | None = None,
+    trust_mtime: bool = True,
+) -> None:
+    """Check which installed files match the repo, the backup, or neither.
+
+    Prints one line per status and the files that are not patched; exits
+    with code 1 unless every file is patched.
+
+    Args:
+        game_path: Root directory of the game; found like ``locate`` if
+            ``None``.
+        jobs: Hashing threads.
+        trust_mtime: Count files with the repo's size and mtime as patched
+            without hashing them.
+    """
+    import verify_install
+    from steam_locate import INSTALL_MARKER, locate
+
+    if game_path is None:
+        game_path = locate(INSTALL_MARKER, cache_file=GAME_PATH_CACHE)
+        if game_path is None:
+            logger.error("Папка игры не найдена. Укажите --game-path")
+            sys.exit(1)
+    if not (game_path / "localization").is_dir():
+        logger.error("Папка localization не найдена: %s", game_path)
+        sys.exit(1)
+
+    try:
+        version, checks = verify_install.verify(
+            ROOT_DIR, game_path, jobs=jobs, trust_mtime=trust_mtime
+        )
+    except OSError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    Status = verify_install.Status
+    hints = {
+        Status.STALE: "установлена старая версия патча — переустановите",
+        Status.ORIGINAL: "патч не установлен",
+        Status.GAME_UPDATED: (
+            "игра обновилась, бэкап устарел —"
+            " patch.py backup --force, затем install_patch.bat"
+        ),
+        Status.MISSING: "файла нет в игре",
+    }
+    by_status: dict[Status, list[str]] = {s: [] for s in Status}
+    for check in checks:
+        by_status[check.status].append(check.rel)
+
+    print(f"\nИгра: {game_path}")
+    print(f"Бэкап: {version or 'нет'}")
+    print(
+        f"Проверено {len(checks)} файлов,"
+        f" прочитано {sum(c.read for c in checks)}\n"
+    )
+    for status, rels in by_status.items():
+        if not rels:
+            continue
+        print(f"  {status.value:<13} {len(rels):>4}")
+        if status in hints:
+            print(f"    {hints[status]}")
+            for rel in rels:
+                print(f"    {rel}")
     print()
+    if by_status[Status.PATCHED] != [c.rel for c in checks]:
+        sys.exit(1)
 
 
-# ── main ────────────────────────────────────────────────────────────────
+# ── sqlite ──────────────────────────────────────────────────────────────
 
 
-def main() -> None:
-    """Parse CLI arguments and dispatch the requested command."""
-    parser = argparse.ArgumentParser(
-        description="Star of Providence — утилита русской локализации",
+def cmd_export_sqlite(db_path: Path) -> None:
+    """Mirror ``localization/`` into a SQLite database with an FTS5 index.
+
+    Args:
+        db_path: Database file; created if missing, updated incrementally.
+    """
+    import sqlite_export
+
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error(
+            "Каталог localization/ не найден. Сначала: patch.py init"
+        )
+        sys.exit(1)
+
+    with sqlite_export.connect(db_path) as conn:
+        updated, unchanged, removed = sqlite_export.export_corpus(
+            conn, sorted(LOCALIZATION_DIR.glob("*.csv"))
+        )
+    conn.close()
+    logger.info(
+        "Экспорт: обновлено %d, без изменений %d, удалено %d. База: %s",
+        updated,
+        unchanged,
+        removed,
+        db_path,
     )
-    sub = parser.add_subparsers(dest="command", required=True)
 
-    p_init = sub.add_parser(
-        "init",
-        help="Создать localization/ из файлов игры",
+
+def cmd_import_sqlite(
+    db_path: Path, *, dry_run: bool = False, force: bool = False
+) -> None:
+    """Write cells edited in the SQLite database back to ``localization/``.
+
+    Args:
+        db_path: Database created by ``export-sqlite``.
+        dry_run: Only report what would change.
+        force: Also import into files changed on disk since the export.
+    """
+    import sqlite_export
+
+    if not db_path.is_file():
+        logger.error("База не найдена: %s. Сначала: patch.py export-sqlite", db_path)
+        sys.exit(1)
+
+    with sqlite_export.connect(db_path) as conn:
+        changed, stale = sqlite_export.import_corpus(
+            conn, LOCALIZATION_DIR, dry_run=dry_run, force=force
+        )
+    conn.close()
+
+    for name in stale:
+        logger.warning(
+            "  [stale] %s изменён после экспорта, пропущен (--force)", name
+        )
+    for name, count in changed.items():
+        logger.info("  [%s] %s: %d ячеек", "diff" if dry_run else "ok", name, count)
+    logger.info(
+        "Готово: файлов %d, ячеек %d.", len(changed), sum(changed.values())
     )
-    p_init.add_argument(
-        "--game-path",
-        required=True,
-        type=Path,
-        help="Путь к корневой папке игры Star of Providence",
+
+
+# ── shards ──────────────────────────────────────────────────────────────
+
+
+def cmd_shard(
+    workers: int, out_dir: Path, *, target: str = "ZHS"
+) -> None:
+    """Split untranslated rows into ``workers`` batches balanced by length.
+
+    Args:
+        workers: Number of shards.
+        out_dir: Directory for ``shard_NN.json`` files.
+        target: Target column.
+    """
+    import shards
+
+    if workers < 1:
+        logger.error("--workers должен быть не меньше 1")
+        sys.exit(1)
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error(
+            "Каталог localization/ не найден. Сначала: patch.py init"
+        )
+        sys.exit(1)
+
+    units = shards.collect_units(
+        sorted(LOCALIZATION_DIR.glob("*.csv")), target
     )
-    p_init.add_argument(
-        "--force",
-        action="store_true",
-        help="Перезаписать существующие файлы в localization/",
+    if not units:
+        logger.info("Непереведённых строк нет.")
+        return
+
+    packed = shards.pack(units, workers)
+    paths = shards.write_shards(packed, out_dir, target)
+    for path, rows in zip(paths, packed):
+        logger.info(
+            "  %s: строк %d, символов EN %d",
+            path.name,
+            len(rows),
+            sum(len(r["en"]) for r in rows),
+        )
+    logger.info("Готово: %d партий в %s", len(paths), out_dir)
+
+
+def cmd_merge_shards(paths: list[Path], *, dry_run: bool = False) -> None:
+    """Merge translated shard files back into ``localization/``.
+
+    Args:
+        paths: Shard JSON files returned by translators.
+        dry_run: Only report what would change.
+    """
+    import shards
+
+    missing = [p for p in paths if not p.is_file()]
+    if missing:
+        logger.error("Файлы не найдены: %s", ", ".join(map(str, missing)))
+        sys.exit(1)
+
+    try:
+        report = shards.merge_shards(LOCALIZATION_DIR, paths, dry_run=dry_run)
+    except ValueError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    for line in report.stale:
+        logger.warning("  [stale] %s", line)
+    for line in report.conflicts:
+        logger.warning("  [conflict] %s", line)
+    for name, count in report.applied.items():
+        logger.info("  [%s] %s: %d строк", "diff" if dry_run else "ok", name, count)
+    logger.info(
+        "Готово: применено %d, уже совпадало %d, устарело %d, конфликтов %d.",
+        sum(report.applied.values()),
+        report.unchanged,
+        len(report.stale),
+        len(report.conflicts),
     )
 
-    sub.add_parser("stats", help="Показать прогресс перевода")
-    sub.add_parser("validate", help="Проверить переводы на ошибки")
+
+# ── import ──────────────────────────────────────────────────────────────
+
+
+def cmd_import_pairs(
+    pair_file: Path,
+    *,
+    mode: str = "untranslated",
+    dry_run: bool = False,
+    target: str = "ZHS",
+) -> None:
+    """Apply EN→translation pairs from ``pair_file`` to all CSVs.
+
+    Args:
+        pair_file: ``.csv``, ``.tsv``, ``.json`` or ``.jsonl`` pair file.
+        mode: ``untranslated``, ``overwrite`` or ``conflicts``
+            (see :class:`import_pairs.Mode`).
+        dry_run: Print the diff without writing.
+        target: Target column.
+    """
+    import import_pairs
+    from csv_io import CsvScanError
+
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error("Каталог localization/ не найден. Сначала: patch.py init")
+        sys.exit(1)
+    if not pair_file.is_file():
+        logger.error("Файл не найден: %s", pair_file)
+        sys.exit(1)
+
+    try:
+        report = import_pairs.apply_pairs(
+            LOCALIZATION_DIR,
+            pair_file,
+            target=target,
+            mode=import_pairs.Mode(mode),
+            dry_run=dry_run,
+        )
+    except CsvScanError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    except (ValueError, OSError) as e:
+        logger.error("%s: %s", pair_file, e)
+        sys.exit(1)
+
+    if dry_run:
+        for c in report.changes:
+            print(f"--- {c.file}:{c.line} (ID {c.row_id})")
+            print(f"- {c.old}")
+            print(f"+ {c.new}")
+    if mode == "conflicts" or dry_run:
+        for c in report.conflicts:
+            print(f"!!! {c.file}:{c.line} (ID {c.row_id}): переведено иначе")
+            print(f"  сейчас: {c.old}")
+            print(f"  импорт: {c.new}")
+
+    for line in report.duplicates:
+        logger.warning("  [duplicate] %s", line)
+    files = len({c.file for c in report.changes})
+    logger.info(
+        "Пар: %d. %s: %d строк в %d файлах; уже совпадало %d,"
+        " переведено иначе %d, нет в корпусе %d.",
+        report.pairs,
+        "Изменится" if dry_run else "Изменено",
+        len(report.changes),
+        files,
+        report.unchanged,
+        len(report.conflicts),
+        report.unmatched,
+    )
+
+
+# ── en-changes ──────────────────────────────────────────────────────────
+
+
+def cmd_en_changes(
+    new_dir: Path | None = None,
+    *,
+    since: str | None = None,
+    top: int = 50,
+    as_json: bool = False,
+    target: str = "ZHS",
+) -> None:
+    """Grade EN changes and print the review queue of affected translations.
+
+    Exactly one source must be given: ``new_dir`` holds updated game CSVs
+    (compared with ``localization/``), or ``since`` names a git revision
+    whose EN is compared with the current ``localization/``.
+
+    Args:
+        new_dir: Directory with the new ``*.csv``.
+        since: Git revision with the old EN.
+        top: Queue rows to print (all with ``as_json``).
+        as_json: Print the summary and queue as JSON.
+        target: Target column.
+    """
+    import time
+
+    import en_changes
+
+    if (new_dir is None) == (since is None):
+        logger.error("Укажите папку с новыми CSV или --since REV")
+        sys.exit(1)
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error("Каталог localization/ не найден. Сначала: patch.py init")
+        sys.exit(1)
+
+    current = en_changes.read_dir(LOCALIZATION_DIR)
+    try:
+        if since is not None:
+            old, new = en_changes.read_revision(ROOT_DIR, since), current
+        elif new_dir.is_dir():
+            old, new = current, en_changes.read_dir(new_dir)
+        else:
+            logger.error("Папка не найдена: %s", new_dir)
+            sys.exit(1)
+        t0 = time.perf_counter()
+        report = en_changes.compare(old, new, current, target)
+        elapsed = time.perf_counter() - t0
+    except (RuntimeError, OSError, ValueError) as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    queue = report.queue()
+    counts: dict[str, dict[str, int]] = {}
+    for c in report.changes:
+        row = counts.setdefault(c.category, {g.value: 0 for g in en_changes.Grade})
+        row[c.grade.value] += 1
+
+    if as_json:
+        print(json.dumps(
+            {
+                "changed": len(report.changes),
+                "added": report.added,
+                "removed": report.removed,
+                "by_category": counts,
+                "queue": [
+                    {
+                        "file": c.file,
+                        "line": c.line,
+                        "id": c.row_id,
+                        "grade": c.grade.value,
+                        "distance": c.distance,
+                        "ratio": round(c.ratio, 3),
+                        "tokens_changed": c.tokens_changed,
+                        "old_en": c.old_en,
+                        "new_en": c.new_en,
+                        "translation": c.translation,
+                    }
+                    for c in queue
+                ],
+            },
+            ensure_ascii=False,
+            indent=1,
+        ))
+        return
+
+    print(
+        f"\nИзменилось EN: {len(report.changes)} строк"
+        f" (из них с переводом {len(queue)}), новых {report.added},"
+        f" удалено {report.removed}; оценка за {elapsed * 1000:.0f} мс"
+    )
+    print(f"\n{'Категория':<14} {'cosmetic':>9} {'minor':>7} {'major':>7}")
+    print("─" * 40)
+    for category, row in sorted(counts.items()):
+        print(
+            f"{category:<14} {row['cosmetic']:>9} {row['minor']:>7}"
+            f" {row['major']:>7}"
+        )
+
+    print("\n── Очередь проверки ──")
+    print(f"\n{'Файл:строка':<28} {'Оценка':<9} {'Правок':>6}  EN: было → стало")
+    print("─" * 78)
+    for c in queue[:top]:
+        mark = " *" if c.tokens_changed else ""
+        print(
+            f"{c.file + ':' + str(c.line):<28} {c.grade.value:<9}"
+            f" {c.distance:>6}{mark}"
+        )
+        print(f"    - {c.old_en}")
+        print(f"    + {c.new_en}")
+    if len(queue) > top:
+        print(f"… ещё {len(queue) - top} (--top, --json)")
+    if any(c.tokens_changed for c in queue[:top]):
+        print("* изменились теги, %vars% или числа")
+    print()
+
+
+# ── reveal-time ─────────────────────────────────────────────────────────
+
+
+def cmd_reveal_time(top: int = 20, *, target: str = "ZHS") -> None:
+    """Rank dialogue rows and conversations by extra reveal time vs EN.
+
+    Args:
+        top: Rows and conversations to list.
+        target: Target column.
+    """
+    import reveal_time
+
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error("Каталог localization/ не найден. Сначала: patch.py init")
+        sys.exit(1)
+    try:
+        d = reveal_time.load(
+            reveal_time.dialogue_files(LOCALIZATION_DIR), target
+        )
+    except RuntimeError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    en_total = d.en_seconds.sum()
+    dst_total = d.target_seconds.sum()
+    ratio = dst_total / en_total if en_total else 0.0
+    print(
+        f"\nСтрок: {len(d.en)}, EN {en_total:.0f} с,"
+        f" {target} {dst_total:.0f} с (×{ratio:.2f})"
+    )
+
+    print("\n── Строки: наибольшая прибавка ──")
+    print(
+        f"\n{'Файл:строка':<24} {'EN, с':>6} {target + ', с':>7}"
+        f" {'Δ, с':>6}  Текст"
+    )
+    print("─" * 78)
+    for i in d.delta.argsort()[::-1][:top]:
+        if d.delta[i] <= 0:
+            break
+        text = d.target[i].replace("\n", " ")
+        text = text[:32] + ("…" if len(text) > 32 else "")
+        print(
+            f"{d.files[i] + ':' + str(d.lines[i]):<24}"
+            f" {d.en_seconds[i]:>6.2f} {d.target_seconds[i]:>7.2f}"
+            f" {d.delta[i]:>+6.2f}  {text}"
+        )
+
+    en_conv, dst_conv = d.conversation_totals()
+    delta = dst_conv - en_conv
+    print("\n── Разговоры: наибольшая прибавка ──")
+    print(
+        f"\n{'Файл':<24} {'ID':>5} {'EN, с':>7} {target + ', с':>8}"
+        f" {'Δ, с':>7}"
+    )
+    print("─" * 55)
+    for i in delta.argsort()[::-1][:top]:
+        if delta[i] <= 0:
+            break
+        name, conv_id = d.conversations[i]
+        print(
+            f"{name:<24} {conv_id:>5} {en_conv[i]:>7.2f}"
+            f" {dst_conv[i]:>8.2f} {delta[i]:>+7.2f}"
+        )
+    print()
+
+
+# ── preview ─────────────────────────────────────────────────────────────
+
+
+def cmd_preview(
+    out_dir: Path = PREVIEW_DIR,
+    *,
+    patterns: list[str] | None = None,
+    overflow_only: bool = False,
+    jobs: int | None = None,
+    target: str = "ZHS",
+) -> None:
+    """Render PNG contact sheets of EN and translated text boxes.
+
+    Args:
+        out_dir: Directory for ``<file>_NN.png``.
+        patterns: File globs inside ``localization/`` (default: all).
+        overflow_only: Only draw rows with a line wider than its box.
+        jobs: Worker processes (default: CPU count).
+        target: Target column.
+    """
+    import preview
+
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error("Каталог localization/ не найден. Сначала: patch.py init")
+        sys.exit(1)
+    csv_files = sorted({
+        p for pattern in patterns or ["*.csv"]
+        for p in LOCALIZATION_DIR.glob(pattern)
+        if p.suffix == ".csv" and p.name not in SKIP_FILES
+    })
+    if not csv_files:
+        logger.error("Нет файлов по маске: %s", ", ".join(patterns or []))
+        sys.exit(1)
+
+    try:
+        results = preview.render_all(
+            csv_files,
+            out_dir,
+            target,
+            overflow_only=overflow_only,
+            jobs=jobs,
+        )
+    except RuntimeError as e:
+        logger.error("%s", e)
+        sys.exit(1)
+
+    for r in results:
+        if r.overflow_rows:
+            logger.warning(
+                "  %s: не влезает %d из %d строк", r.name, r.overflow_rows, r.rows
+            )
+    logger.info(
+        "Готово: %d строк, не влезает %d, листов %d → %s",
+        sum(r.rows for r in results),
+        sum(r.overflow_rows for r in results),
+        sum(len(r.sheets) for r in results),
+        out_dir,
+    )
+
+
+# ── edit ────────────────────────────────────────────────────────────────
+
+
+def cmd_edit(file: str, *, flt: str = "all", target: str = "ZHS") -> None:
+    """Edit one CSV in the terminal UI (see ``editor``).
+
+    Args:
+        file: File name in ``localization/`` (``.csv`` optional) or a path.
+        flt: Rows to list first: ``all``, ``untranslated`` or ``issues``.
+        target: Target column.
+    """
+    import editor
+    from csv_io import CsvScanError
+
+    path = Path(file)
+    if not path.is_file():
+        path = LOCALIZATION_DIR / (file if file.endswith(".csv") else f"{file}.csv")
+    if not path.is_file():
+        logger.error("Файл не найден: %s", file)
+        sys.exit(1)
+
+    try:
+        saved = editor.run(path, target, editor.Filter(flt))
+    except (RuntimeError, ValueError, CsvScanError, OSError) as e:
+        logger.error("%s", e)
+        sys.exit(1)
+    if saved:
+        logger.info("Сохранено ячеек: %d → %s", saved, path.name)
+
+
+# ── serve ───────────────────────────────────────────────────────────────
+
+
+def cmd_serve(
+    socket_path: Path | None = None,
+    *,
+    targets: tuple[str, ...] = DEFAULT_TARGETS,
+) -> None:
+    """Serve JSON-RPC requests over stdio or a Unix socket (see ``serve``).
+
+    Args:
+        socket_path: Unix socket to listen on; stdio if ``None``.
+        targets: Target columns to load.
+    """
+    import serve
+
+    if not LOCALIZATION_DIR.is_dir():
+        logger.error("Каталог localization/ не найден. Сначала: patch.py init")
+        sys.exit(1)
+    if socket_path is not None and not hasattr(
+        serve.socketserver, "UnixStreamServer"
+    ):
+        logger.error("Unix-сокеты недоступны в этой системе, используйте stdio")
+        sys.exit(1)
+
+    server, seconds = serve.start(LOCALIZATION_DIR, targets)
+    logger.info(
+        "Загружено файлов: %d за %.0f мс",
+        len(server.corpus.files),
+        seconds * 1000,
+    )
+    if socket_path is None:
+        serve.serve_stdio(server)
+    else:
+        logger.info("Сокет: %s", socket_path)
+        server.serve_socket(socket_path)
+
+
+# ── build-release ───────────────────────────────────────────────────────
+
+
+def cmd_build_release(
+    output: Path,
+    *,
+    targets: tuple[str, ...] = DEFAULT_TARGETS,
+    force: bool = False,
+    use_cache: bool = True,
+) -> None:
+    """Run release checks and build a reproducible zip.
+
+    Args:
+        output: Destination zip.
+        targets: Target columns for the checks.
+        force: Build the zip even if checks fail.
+        use_cache: Skip stages whose inputs did not change.
+    """
+    import release
+
+    released, results = release.build(
+        ROOT_DIR,
+        output,
+        RELEASE_CACHE,
+        targets=",".join(targets),
+        force=force,
+        use_cache=use_cache,
+    )
+
+    for r in results:
+        if r.cached:
+            logger.info("  [cached] %s", r.name)
+            continue
+        logger.info(
+            "  [%s] %s (%.2f с)", "ok" if r.ok else "FAIL", r.name, r.seconds
+        )
+        if not r.ok:
+            for line in r.output.strip().splitlines()[-15:]:
+                logger.info("      %s", line)
+
+    if not released:
+        logger.error(
+            "Релиз не собран: исправьте ошибки или используйте --force"
+        )
+        sys.exit(1)
+    logger.info("Готово: %s", output)
+
+
+# ── merge-driver ────────────────────────────────────────────────────────
+
+
+def cmd_merge_driver(
+    base: Path,
+    ours: Path,
+    theirs: Path,
+    *,
+    marker_size: int = 7,
+    path: str = "",
+) -> None:
+    """Three-way merge of a localization CSV, called by git.
+
+    The result replaces ``ours``. Exits with 1 if conflicts remain, as git
+    expects. Files that cannot be parsed as CSV fall back to
+    ``git merge-file``.
+
+    Args:
+        base: Common ancestor version (``%O``).
+        ours: Current branch version, overwritten with the result (``%A``).
+        theirs: Other branch version (``%B``).
+        marker_size: Conflict marker length (``%L``).
+        path: Path of the file in the repository (``%P``), for messages.
+    """
+    import subprocess
+
+    import merge_csv
+    from csv_io import CsvScanError
+
+    name = path or ours.name
+    try:
+        tables = [
+            merge_csv.parse(p.read_bytes(), name) for p in (base, ours, theirs)
+        ]
+    except (CsvScanError, UnicodeDecodeError) as e:
+        logger.warning("%s: не CSV (%s), построчное слияние", name, e)
+        proc = subprocess.run([
+            "git", "merge-file", f"--marker-size={marker_size}",
+            "-L", "ours", "-L", "base", "-L", "theirs",
+            str(ours), str(base), str(theirs),
+        ])
+        sys.exit(1 if proc.returncode else 0)
+
+    merged, conflicts = merge_csv.merge(*tables, marker_size=marker_size)
+    ours.write_bytes(merged)
+    if conflicts:
+        logger.error("%s: конфликтов в ячейках: %d", name, conflicts)
+        sys.exit(1)
+
+
+# ── main ────────────────────────────────────────────────────────────────
+
+
+def main() -> None:
+    """Parse CLI arguments and dispatch the requested command."""
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    parser = argparse.ArgumentParser(
+        description="Star of Providence — утилита русской локализации",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_init = sub.add_parser(
+        "init",
+        help="Создать localization/ из файлов игры",
+    )
+    p_init.add_argument(
+        "--game-path",
+        required=True,
+        type=Path,
+        help="Путь к корневой папке игры Star of Providence",
+    )
+    p_init.add_argument(
+        "--force",
+        action="store_true",
+        help="Перезаписать существующие файлы в localization/",
+    )
+
+    p_stats = sub.add_parser("stats", help="Показать прогресс перевода")
+    p_stats.add_argument(
+        "--detailed",
+        action="store_true",
+        help="Распределения длин, числа строк и выбросы (нужен numpy)",
+    )
+    p_stats.add_argument(
+        "--json",
+        action="store_true",
+        help="Вывести --detailed в JSON",
+    )
+    p_stats.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Сколько выбросов показать (по умолчанию 20)",
+    )
+    p_validate = sub.add_parser(
+        "validate",
+        help="Проверить переводы на ошибки",
+    )
+    p_validate.add_argument(
+        "--list-rules",
+        action="store_true",
+        help="Показать доступные правила и выйти",
+    )
+    p_validate.add_argument(
+        "--enable",
+        action="append",
+        metavar="RULE",
+        help="Включить правило (можно несколько раз)",
+    )
+    p_validate.add_argument(
+        "--disable",
+        action="append",
+        metavar="RULE",
+        help="Отключить правило (можно несколько раз)",
+    )
+    p_validate.add_argument(
+        "--severity",
+        action="append",
+        metavar="RULE=LEVEL",
+        help="Переопределить серьёзность: error или warning",
+    )
+    p_validate.add_argument(
+        "--timings",
+        action="store_true",
+        help="Показать срабатывания и время каждого правила",
+    )
+
+    for p in (p_init, p_stats, p_validate):
+        p.add_argument(
+            "--target",
+            type=_parse_targets,
+            default=DEFAULT_TARGETS,
+            metavar="COL[,COL...]",
+            help="Целевые колонки языка (по умолчанию ZHS)",
+        )
+
+    p_locate = sub.add_parser("locate", help="Найти папку игры")
+    p_locate.add_argument(
+        "--backup",
+        action="store_true",
+        help="Искать установку с бэкапом (_backup_ru/)",
+    )
+    p_locate.add_argument(
+        "--steam-dir",
+        action="append",
+        type=Path,
+        help="Дополнительная папка Steam (можно указать несколько раз)",
+    )
+    p_locate.add_argument(
+        "--timeout",
+        type=float,
+        help="Таймаут проверки одного пути, секунд (по умолчанию 2)",
+    )
+    p_locate.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Не использовать сохранённый путь (.game_path)",
+    )
+
+    p_backup = sub.add_parser(
+        "backup",
+        help="Сохранить оригинальные файлы игры в хранилище бэкапов",
+    )
+    p_backup.add_argument(
+        "--game-path",
+        required=True,
+        type=Path,
+        help="Путь к корневой папке игры Star of Providence",
+    )
+    p_backup.add_argument(
+        "--compress",
+        choices=("none", "zlib", "zstd"),
+        default="zlib",
+        help="Сжатие объектов (zstd требует пакет zstandard)",
+    )
+    p_backup.add_argument(
+        "--game-version",
+        help="Метка версии игры (по умолчанию buildid из Steam)",
+    )
+    p_backup.add_argument(
+        "--force",
+        action="store_true",
+        help="Перезаписать манифест существующей версии",
+    )
+
+    p_restore = sub.add_parser(
+        "restore",
+        help="Восстановить оригинальные файлы игры из бэкапа",
+    )
+    p_restore.add_argument(
+        "--game-path",
+        required=True,
+        type=Path,
+        help="Путь к корневой папке игры Star of Providence",
+    )
+    p_restore.add_argument(
+        "--game-version",
+        help="Версия бэкапа (по умолчанию buildid из Steam)",
+    )
+    p_restore.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Только показать, какие файлы будут восстановлены",
+    )
+
+    p_verify = sub.add_parser(
+        "verify",
+        help="Проверить установленные файлы: патч, старый патч, оригинал",
+    )
+    p_verify.add_argument(
+        "--game-path",
+        type=Path,
+        help="Путь к корневой папке игры (по умолчанию — как locate)",
+    )
+    p_verify.add_argument(
+        "--jobs",
+        type=int,
+        help="Число потоков хеширования",
+    )
+    p_verify.add_argument(
+        "--full",
+        action="store_true",
+        help="Хешировать все файлы, не доверяя размеру и времени изменения",
+    )
+
+    p_export = sub.add_parser(
+        "export-sqlite",
+        help="Выгрузить локализацию в SQLite (с полнотекстовым индексом)",
+    )
+    p_export.add_argument(
+        "--db",
+        type=Path,
+        default=SQLITE_DB,
+        help="Файл базы (по умолчанию localization.sqlite)",
+    )
+
+    p_import = sub.add_parser(
+        "import-sqlite",
+        help="Записать правки из SQLite обратно в CSV",
+    )
+    p_import.add_argument(
+        "--db",
+        type=Path,
+        default=SQLITE_DB,
+        help="Файл базы (по умолчанию localization.sqlite)",
+    )
+    p_import.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Только показать, что изменится",
+    )
+    p_import.add_argument(
+        "--force",
+        action="store_true",
+        help="Импортировать и в файлы, изменённые после экспорта",
+    )
+
+    p_import_pairs = sub.add_parser(
+        "import",
+        help="Применить пары EN→перевод из CSV/TSV/JSON ко всем файлам",
+    )
+    p_import_pairs.add_argument(
+        "pair_file",
+        type=Path,
+        help="Файл пар: .csv, .tsv (EN и RU/translation), .json или .jsonl",
+    )
+    p_import_pairs.add_argument(
+        "--mode",
+        choices=("untranslated", "overwrite", "conflicts"),
+        default="untranslated",
+        help="untranslated — только непереведённые строки (по умолчанию);"
+        " overwrite — заменить любой перевод;"
+        " conflicts — только показать строки, переведённые иначе",
+    )
+    p_import_pairs.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Показать изменения построчно, ничего не записывая",
+    )
+    p_import_pairs.add_argument(
+        "--target",
+        default="ZHS",
+        help="Целевая колонка (по умолчанию ZHS)",
+    )
+
+    p_shard = sub.add_parser(
+        "shard",
+        help="Разбить непереведённые строки на партии для переводчиков",
+    )
+    p_shard.add_argument(
+        "--workers",
+        type=int,
+        required=True,
+        help="Количество партий",
+    )
+    p_shard.add_argument(
+        "--out",
+        type=Path,
+        default=SHARDS_DIR,
+        help="Каталог для shard_NN.json (по умолчанию shards/)",
+    )
+    p_shard.add_argument(
+        "--target",
+        default="ZHS",
+        help="Целевая колонка (по умолчанию ZHS)",
+    )
+
+    p_merge = sub.add_parser(
+        "merge-shards",
+        help="Влить переведённые партии обратно в CSV",
+    )
+    p_merge.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        help="Файлы shard_NN.json",
+    )
+    p_merge.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Только показать, что изменится",
+    )
+
+    p_en_changes = sub.add_parser(
+        "en-changes",
+        help="Оценить изменения EN (косметика / мелкие / крупные) для проверки перевода",
+    )
+    p_en_changes.add_argument(
+        "new_dir",
+        nargs="?",
+        type=Path,
+        help="Папка с новыми CSV (например localization/ обновлённой игры)",
+    )
+    p_en_changes.add_argument(
+        "--since",
+        metavar="REV",
+        help="Сравнить с EN в git-ревизии REV вместо папки",
+    )
+    p_en_changes.add_argument(
+        "--top",
+        type=int,
+        default=50,
+        help="Сколько строк очереди показать (по умолчанию 50)",
+    )
+    p_en_changes.add_argument(
+        "--json",
+        action="store_true",
+        help="Вывести сводку и всю очередь в JSON",
+    )
+    p_en_changes.add_argument(
+        "--target",
+        default="ZHS",
+        help="Целевая колонка (по умолчанию ZHS)",
+    )
+
+    p_reveal = sub.add_parser(
+        "reveal-time",
+        help="Время показа реплик: где перевод заставляет ждать дольше EN",
+    )
+    p_reveal.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Сколько строк и разговоров показать (по умолчанию 20)",
+    )
+    p_reveal.add_argument(
+        "--target",
+        default="ZHS",
+        help="Целевая колонка (по умолчанию ZHS)",
+    )
+
+    p_preview = sub.add_parser(
+        "preview",
+        help="Нарисовать окна с текстом EN и перевода в PNG (нужен Pillow)",
+    )
+    p_preview.add_argument(
+        "files",
+        nargs="*",
+        metavar="GLOB",
+        help="Маски файлов в localization/ (по умолчанию все)",
+    )
+    p_preview.add_argument(
+        "--out",
+        type=Path,
+        default=PREVIEW_DIR,
+        help="Каталог для PNG (по умолчанию preview/)",
+    )
+    p_preview.add_argument(
+        "--overflow-only",
+        action="store_true",
+        help="Только строки, которые не влезают в окно",
+    )
+    p_preview.add_argument(
+        "--jobs",
+        type=int,
+        help="Число процессов (по умолчанию по числу ядер)",
+    )
+    p_preview.add_argument(
+        "--target",
+        default="ZHS",
+        help="Целевая колонка (по умолчанию ZHS)",
+    )
+
+    p_edit = sub.add_parser(
+        "edit",
+        help="Редактировать файл в терминале: EN и перевод рядом, с проверкой",
+    )
+    p_edit.add_argument(
+        "file", help="Имя файла в localization/ (например gossip_tank.csv)"
+    )
+    p_edit.add_argument(
+        "--filter",
+        choices=("all", "untranslated", "issues"),
+        default="all",
+        help="all — все строки (по умолчанию); untranslated — без перевода;"
+        " issues — с ошибками проверки или длинными строками"
+        " (в редакторе переключается: f)",
+    )
+    p_edit.add_argument(
+        "--target",
+        default="ZHS",
+        help="Целевая колонка (по умолчанию ZHS)",
+    )
+
+    p_serve = sub.add_parser(
+        "serve",
+        help="JSON-RPC сервер для редакторов (stdio или Unix-сокет)",
+    )
+    p_serve.add_argument(
+        "--socket",
+        type=Path,
+        help="Путь к Unix-сокету (по умолчанию stdin/stdout)",
+    )
+    p_serve.add_argument(
+        "--target",
+        type=_parse_targets,
+        default=DEFAULT_TARGETS,
+        metavar="COL[,COL...]",
+        help="Целевые колонки языка (по умолчанию ZHS)",
+    )
+
+    p_release = sub.add_parser(
+        "build-release",
+        help="Проверить перевод и собрать воспроизводимый zip",
+    )
+    p_release.add_argument(
+        "--output",
+        type=Path,
+        default=RELEASE_ZIP,
+        help="Путь к архиву (по умолчанию dist/star-of-providence-ru.zip)",
+    )
+    p_release.add_argument(
+        "--force",
+        action="store_true",
+        help="Собрать архив, даже если проверки не прошли",
+    )
+    p_release.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Выполнить все этапы заново",
+    )
+    p_release.add_argument(
+        "--target",
+        type=_parse_targets,
+        default=DEFAULT_TARGETS,
+        metavar="COL[,COL...]",
+        help="Целевые колонки для проверок (по умолчанию ZHS)",
+    )
+
+    p_merge_driver = sub.add_parser(
+        "merge-driver",
+        help="Драйвер слияния CSV для git (.gitattributes merge=)",
+    )
+    p_merge_driver.add_argument("base", type=Path, help="%%O — общий предок")
+    p_merge_driver.add_argument(
+        "ours", type=Path, help="%%A — наша версия, сюда пишется результат"
+    )
+    p_merge_driver.add_argument("theirs", type=Path, help="%%B — их версия")
+    p_merge_driver.add_argument(
+        "marker_size",
+        type=int,
+        nargs="?",
+        default=7,
+        help="%%L — длина маркеров конфликта",
+    )
+    p_merge_driver.add_argument(
+        "path", nargs="?", default="", help="%%P — путь файла в репозитории"
+    )
 
     args = parser.parse_args()
 
     match args.command:
         case "init":
-            cmd_init(args.game_path, force=args.force)
+            cmd_init(args.game_path, force=args.force, targets=args.target)
+        case "stats" if args.detailed or args.json:
+            cmd_stats_detailed(
+                args.top, targets=args.target, as_json=args.json
+            )
         case "stats":
-            cmd_stats()
+            cmd_stats(args.target)
+        case "validate" if args.list_rules:
+            cmd_list_rules()
         case "validate":
-            cmd_validate()
+            cmd_validate(
+                enable=args.enable,
+                disable=args.disable,
+                severity=dict(
+                    item.partition("=")[::2] for item in args.severity or ()
+                ),
+                timings=args.timings,
+                targets=args.target,
+            )
+        case "locate":
+            cmd_locate(
+                backup=args.backup,
+                steam_dirs=args.steam_dir,
+                timeout=args.timeout,
+                use_cache=not args.no_cache,
+            )
+        case "backup":
+            cmd_backup(
+                args.game_path,
+                codec=args.compress,
+                version=args.game_version,
+                force=args.force,
+            )
+        case "restore":
+            cmd_restore(
+                args.game_path,
+                version=args.game_version,
+                dry_run=args.dry_run,
+            )
+        case "verify":
+            cmd_verify(
+                args.game_path, jobs=args.jobs, trust_mtime=not args.full
+            )
+        case "export-sqlite":
+            cmd_export_sqlite(args.db)
+        case "import-sqlite":
+            cmd_import_sqlite(args.db, dry_run=args.dry_run, force=args.force)
+        case "import":
+            cmd_import_pairs(
+                args.pair_file,
+                mode=args.mode,
+                dry_run=args.dry_run,
+                target=args.target,
+            )
+        case "shard":
+            cmd_shard(args.workers, args.out, target=args.target)
+        case "merge-shards":
+            cmd_merge_shards(args.paths, dry_run=args.dry_run)
+        case "merge-driver":
+            cmd_merge_driver(
+                args.base,
+                args.ours,
+                args.theirs,
+                marker_size=args.marker_size,
+                path=args.path,
+            )
+        case "en-changes":
+            cmd_en_changes(
+                args.new_dir,
+                since=args.since,
+                top=args.top,
+                as_json=args.json,
+                target=args.target,
+            )
+        case "reveal-time":
+            cmd_reveal_time(args.top, target=args.target)
+        case "preview":
+            cmd_preview(
+                args.out,
+                patterns=args.files,
+                overflow_only=args.overflow_only,
+                jobs=args.jobs,
+                target=args.target,
+            )
+        case "edit":
+            cmd_edit(args.file, flt=args.filter, target=args.target)
+        case "serve":
+            cmd_serve(args.socket, targets=args.target)
+        case "build-release":
+            cmd_build_release(
+                args.output,
+                targets=args.target,
+                force=args.force,
+                use_cache=not args.no_cache,
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+"""Offline text-box previews for ``patch.py preview``.
+
+Every translated row of a file is drawn twice, EN and the translation side
+by side, the way the game lays it out: ``#`` starts a new line, ``##`` a new
+box, ``/cN`` switches the colour and other tags take no space. Each box gets
+its bounds drawn: the width of ``max_vis`` average EN glyphs (the same limit
+``fix_linebreaks.py`` wraps to). EN lines are wrapped to the box at the
+pixel boundary, mid-word, as the game wraps them; translated lines wider
+than the box are marked red.
+Rows are tiled into PNG contact sheets, one or more per file.
+
+Glyphs are rasterized once per process into a mask cache and pasted, so a
+sheet costs one paste per character instead of a font rasterization. Files
+are rendered in parallel worker processes. Kerning is not applied, as in
+the game's bitmap text.
+"""
+
+import functools
+import os
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # optional dependency
+    Image = ImageDraw = ImageFont = None
+
+from csv_io import is_data_row, scan_csv
+from fix_linebreaks import TAG_PATTERN, get_max_vis, scaled_max_vis
+
+FONT_PATH = Path(__file__).resolve().parent.parent / "fonts" / "NotoSans-ExtraBold.ttf"
+# Text size in the game's 2x scaled window; an estimate.
+FONT_SIZE = 16
+LINE_HEIGHT = 20
+LABEL_SIZE = 11
+PADDING = 6
+BOX_GAP = 4
+ROW_GAP = 10
+# Glyph whose advance stands for an average EN character.
+REFERENCE_GLYPH = "n"
+# Sheets are split so no PNG gets taller than this.
+MAX_SHEET_HEIGHT = 8000
+# Flat-colour sheets barely shrink at higher levels, which are much slower.
+PNG_COMPRESS_LEVEL = 1
+
+BACKGROUND = (24, 20, 32)
+BOX_OUTLINE = (110, 110, 140)
+OVERFLOW = (230, 40, 40)
+LABEL_COLOUR = (150, 150, 160)
+# /c0–/c9; approximations of the in-game palette.
+COLOURS = {
+    0: (255, 255, 255),
+    1: (255, 214, 64),
+    2: (255, 88, 88),
+    3: (96, 220, 96),
+    4: (96, 170, 255),
+    5: (200, 120, 255),
+    6: (80, 230, 230),
+    7: (160, 160, 160),
+    8: (255, 150, 60),
+    9: (255, 120, 200),
+}
+
+Run = tuple[str, int]  # (text, colour index)
+
+
+def require_pillow() -> None:
+    """Raise ``RuntimeError`` if Pillow is missing."""
+    if Image is None:
+        raise RuntimeError("для этой команды нужен Pillow: pip install pillow")
+
+
+def layout(text: str) -> list[list[list[Run]]]:
+    """Split a cell into boxes → lines → coloured runs.
+
+    The colour carries over line and box breaks until the next ``/cN``.
+    """
+    boxes: list[list[list[Run]]] = []
+    colour = 0
+    for box_text in text.split("##"):
+        lines = []
+        for line_text in box_text.split("#"):
+            runs: list[Run] = []
+            pos = 0
+            for m in TAG_PATTERN.finditer(line_text):
+                if m.start() > pos:
+                    runs.append((line_text[pos:m.start()], colour))
+                if m[0][1] == "c":
+                    colour = int(m[0][2])
+                pos = m.end()
+            if pos < len(line_text):
+                runs.append((line_text[pos:], colour))
+            lines.append(runs)
+        boxes.append(lines)
+    return boxes
+
+
+class GlyphCache:
+    """Rasterized glyph masks of one font size, built on first use."""
+
+    def __init__(self, font_path: Path, size: int):
+        self.font = ImageFont.truetype(str(font_path), size)
+        self._glyphs: dict[str, tuple["Image.Image | None", int, int, float]] = {}
+
+    def glyph(self, ch: str) -> tuple["Image.Image | None", int, int, float]:
+        """``(mask, dx, dy, advance)`` of ``ch``; ``mask`` is ``None`` for blanks."""
+        g = self._glyphs.get(ch)
+        if g is None:
+            left, top, right, bottom = self.font.getbbox(ch)
+            mask = None
+            if right > left and bottom > top:
+                mask = Image.new("L", (right - left, bottom - top))
+                ImageDraw.Draw(mask).text(
+                    (-left, -top), ch, font=self.font, fill=255
+                )
+            g = self._glyphs[ch] = (mask, left, top, self.font.getlength(ch))
+        return g
+
+    def width(self, text: str) -> float:
+        """Advance width of ``text`` without kerning."""
+        return sum(self.glyph(ch)[3] for ch in text)
+
+    def draw(
+        self,
+        image: "Image.Image",
+        x: float,
+        y: int,
+        runs: list[Run],
+        fill: tuple[int, int, int] | None = None,
+    ) -> None:
+        """Paste ``runs`` onto ``image``, line top-left at ``(x, y)``.
+
+        ``fill`` overrides the ``/cN`` colours of the runs.
+        """
+        for text, colour in runs:
+            colour_fill = fill or COLOURS.get(colour, COLOURS[0])
+            for ch in text:
+                mask, dx, dy, advance = self.glyph(ch)
+                if mask is not None:
+                    image.paste(colour_fill, (round(x) + dx, y + dy), mask)
+                x += advance
+
+
+@functools.cache
+def glyph_cache(size: int = FONT_SIZE) -> GlyphCache:
+    """Per-process glyph cache for the bundled font."""
+    return GlyphCache(FONT_PATH, size)
+
+
+def box_width(max_vis: int) -> int:
+    """Pixel width of a box that holds ``max_vis`` average EN glyphs."""
+    return round(max_vis * glyph_cache().glyph(REFERENCE_GLYPH)[3])
+
+
+def wrap_line(runs: list[Run], width: int, cache: GlyphCache) -> list[list[Run]]:
+    """Split a line of runs before the first glyph that passes ``width``.
+
+    Like the game, this breaks mid-word at the pixel boundary; a line
+    always keeps at least one glyph.
+    """
+    lines: list[list[Run]] = [[]]
+    x = 0.0
+    for text, colour in runs:
+        start = 0
+        for i, ch in enumerate(text):
+            advance = cache.glyph(ch)[3]
+            if x and x + advance > width:
+                if i > start:
+                    lines[-1].append((text[start:i], colour))
+                lines.append([])
+                x, start = 0.0, i
+            x += advance
+        if start < len(text):
+            lines[-1].append((text[start:], colour))
+    return lines
+
+
+def render_cell(
+    text: str, width: int | None, *, wrap: bool = False
+) -> tuple["Image.Image", int]:
+    """Draw ``text`` in boxes of ``width`` pixels.
+
+    With ``width=None`` (files ``fix_linebreaks.py`` skips) the boxes fit
+    the text and nothing counts as overflowing. EN cells are rendered with
+    ``wrap=True``: the game wraps them itself (see :func:`wrap_line`), so
+    they never overflow.
+
+    Returns:
+        ``(image, overflowing line count)``.
+    """
+    cache = glyph_cache()
+    boxes = layout(text)
+    if wrap and width is not None:
+        boxes = [
+            [wrapped for runs in lines for wrapped in wrap_line(runs, width, cache)]
+            for lines in boxes
+        ]
+    widths = [
+        [cache.width("".join(t for t, _ in runs)) for runs in lines]
+        for lines in boxes
+    ]
+    full = max([width or 0, *(round(w) for ws in widths for w in ws)])
+    if width is None:
+        width = full
+    height = sum(
+        len(lines) * LINE_HEIGHT + 2 * PADDING + BOX_GAP for lines in boxes
+    ) - BOX_GAP
+    image = Image.new("RGB", (full + 2 * PADDING, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    overflow = 0
+    y = 0
+    for lines, line_widths in zip(boxes, widths):
+        box_h = len(lines) * LINE_HEIGHT + 2 * PADDING
+        draw.rectangle(
+            (0, y, width + 2 * PADDING - 1, y + box_h - 1), outline=BOX_OUTLINE
+        )
+        for i, (runs, w) in enumerate(zip(lines, line_widths)):
+            line_y = y + PADDING + i * LINE_HEIGHT
+            if w > width:
+                overflow += 1
+                draw.line(
+                    (PADDING + width, line_y, PADDING + width,
+                     line_y + LINE_HEIGHT - 1),
+                    fill=OVERFLOW,
+                    width=2,
+                )
+            cache.draw(image, PADDING, line_y, runs)
+        y += box_h + BOX_GAP
+    return image, overflow
+
+
+@dataclass(frozen=True)
+class FilePreview:
+    """Result of rendering one file."""
+
+    name: str
+    rows: int
+    overflow_rows: int
+    sheets: tuple[Path, ...]
+
+
+def _translated_rows(path: Path, target: str) -> Iterator[tuple[int, str, str, str]]:
+    for row in scan_csv(path, ("ID", "EN", target)):
+        row_id, en, dst = row.cells
+        if is_data_row(row.cells) and dst.strip() and dst.strip() != en.strip():
+            yield row.line, row_id.strip(), en, dst
+
+
+def _tile(tiles: list["Image.Image"], out_stem: Path) -> list[Path]:
+    """Stack tiles vertically into sheets no taller than MAX_SHEET_HEIGHT."""
+    sheets: list[list["Image.Image"]] = [[]]
+    height = 0
+    for tile in tiles:
+        if sheets[-1] and height + tile.height > MAX_SHEET_HEIGHT:
+            sheets.append([])
+            height = 0
+        sheets[-1].append(tile)
+        height += tile.height + ROW_GAP
+
+    paths = []
+    for n, group in enumerate(sheets, 1):
+        if not group:
+            continue
+        sheet = Image.new(
+            "RGB",
+            (
+                max(t.width for t in group) + 2 * ROW_GAP,
+                sum(t.height for t in group) + ROW_GAP * (len(group) + 1),
+            ),
+            BACKGROUND,
+        )
+        y = ROW_GAP
+        for tile in group:
+            sheet.paste(tile, (ROW_GAP, y))
+            y += tile.height + ROW_GAP
+        path = out_stem.with_name(f"{out_stem.name}_{n:02d}.png")
+        sheet.save(path, compress_level=PNG_COMPRESS_LEVEL)
+        paths.append(path)
+    return paths
+
+
+def render_file(
+    path: Path,
+    out_dir: Path,
+    target: str = "ZHS",
+    *,
+    overflow_only: bool = False,
+) -> FilePreview:
+    """Render the contact sheets of one CSV into ``out_dir``."""
+    require_pillow()
+    max_vis = get_max_vis(path.name)
+    width = box_width(scaled_max_vis(max_vis, target)) if max_vis else None
+    label_cache = glyph_cache(LABEL_SIZE)
+
+    tiles = []
+    rows = overflow_rows = 0
+    for line, row_id, en, dst in _translated_rows(path, target):
+        rows += 1
+        en_img, _ = render_cell(en, width, wrap=True)
+        dst_img, overflow = render_cell(dst, width)
+        if overflow:
+            overflow_rows += 1
+        elif overflow_only:
+            continue
+        label_h = LABEL_SIZE + 4
+        tile = Image.new(
+            "RGB",
+            (
+                en_img.width + dst_img.width + ROW_GAP,
+                label_h + max(en_img.height, dst_img.height),
+            ),
+            BACKGROUND,
+        )
+        label = f"{path.name}:{line}  ID {row_id}"
+        if overflow:
+            label += f"  — не влезает строк: {overflow}"
+        label_cache.draw(
+            tile, 0, 0, [(label, 0)], OVERFLOW if overflow else LABEL_COLOUR
+        )
+        tile.paste(en_img, (0, label_h))
+        tile.paste(dst_img, (en_img.width + ROW_GAP, label_h))
+        tiles.append(tile)
+
+    sheets = _tile(tiles, out_dir / path.stem) if tiles else []
+    return FilePreview(path.name, rows, overflow_rows, tuple(sheets))
+
+
+def render_all(
+    csv_files: list[Path],
+    out_dir: Path,
+    target: str = "ZHS",
+    *,
+    overflow_only: bool = False,
+    jobs: int | None = None,
+) -> list[FilePreview]:
+    """Render every file in a pool of worker processes.
+
+    Raises:
+        RuntimeError: If Pillow or the font is missing.
+    """
+    require_pillow()
+    if not FONT_PATH.is_file():
+        raise RuntimeError(f"шрифт не найден: {FONT_PATH}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for path in csv_files:
+        for old in out_dir.glob(f"{path.stem}_[0-9][0-9].png"):
+            old.unlink()
+
+    workers = min(jobs or os.cpu_count() or 1, len(csv_files)) or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(
+                render_file, path, out_dir, target, overflow_only=overflow_only
+            )
+            for path in csv_files
+        ]
+        return [f.result() for f in futures]
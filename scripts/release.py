@@ -0,0 +1,260 @@
+"""Reproducible release archive for ``patch.py build-release``.
+
+The build runs four stages in parallel: ``validate``, ``linebreaks`` and
+``double-hashes`` (the check-only modes of the fix scripts) and ``package``
+(the zip). Each stage is keyed by the SHA-256 of its inputs; a stage whose
+key matches the last successful run is skipped. The zip is written to a
+temp file and only moved into place when every check passed.
+
+The archive is deterministic: entries are sorted, every entry gets the
+same timestamp and permissions, and all files are deflated at level 9, so
+two builds of the same tree with the same zlib are byte-identical.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from backup_store import file_digest
+
+# Earliest timestamp a zip entry can hold.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+ZIP_COMPRESSLEVEL = 9
+ZIP_FILE_MODE = 0o644
+
+FONT = Path("fonts", "NotoSans-ExtraBold.ttf")
+RELEASE_FILES = (
+    Path("README.md"),
+    Path("install_patch.bat"),
+    Path("restore_backup.bat"),
+    FONT,
+)
+# Bump to invalidate cached stages when the build itself changes.
+BUILD_FORMAT = 1
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A build step with the files its result depends on.
+
+    ``run`` returns ``(ok, output)``.
+    """
+
+    name: str
+    inputs: tuple[Path, ...]
+    run: Callable[[], tuple[bool, str]]
+
+
+@dataclass(frozen=True)
+class StageResult:
+    """Outcome of one stage."""
+
+    name: str
+    ok: bool
+    cached: bool
+    output: str
+    seconds: float
+
+
+def release_inputs(root: Path) -> list[Path]:
+    """Files that go into the archive, relative to ``root``."""
+    csvs = sorted(
+        p.relative_to(root) for p in (root / "localization").glob("*.csv")
+    )
+    return [*csvs, *RELEASE_FILES]
+
+
+def inputs_key(root: Path, files: list[Path], *extra: str) -> str:
+    """SHA-256 over ``(path, content hash)`` pairs plus ``extra`` strings."""
+    h = hashlib.sha256(f"{BUILD_FORMAT}".encode())
+    for rel in sorted(files):
+        h.update(rel.as_posix().encode("utf-8") + b"\0")
+        h.update(file_digest(root / rel).encode() + b"\0")
+    for item in extra:
+        h.update(item.encode("utf-8") + b"\0")
+    return h.hexdigest()
+
+
+def write_zip(root: Path, files: list[Path], dest: Path) -> None:
+    """Write a deterministic zip of ``files`` (relative to ``root``)."""
+    with zipfile.ZipFile(dest, "w") as zf:
+        for rel in sorted(files, key=lambda p: p.as_posix()):
+            info = zipfile.ZipInfo(rel.as_posix(), date_time=ZIP_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.create_system = 3
+            info.external_attr = (0o100000 | ZIP_FILE_MODE) << 16
+            zf.writestr(
+                info,
+                (root / rel).read_bytes(),
+                compresslevel=ZIP_COMPRESSLEVEL,
+            )
+
+
+def _script_stage(
+    name: str, root: Path, args: list[str], inputs: list[Path]
+) -> Stage:
+    """A stage that runs a repo script and passes if it exits with 0."""
+
+    def run() -> tuple[bool, str]:
+        proc = subprocess.run(
+            [sys.executable, *args],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        return proc.returncode == 0, proc.stdout + proc.stderr
+
+    return Stage(name, tuple(inputs), run)
+
+
+def plan(root: Path, staging: Path, *, targets: str = "ZHS") -> list[Stage]:
+    """Build the stage list for a release of ``root``.
+
+    Args:
+        root: Repository root.
+        staging: Temp path the package stage writes the zip to.
+        targets: ``--target`` value passed to the checks.
+    """
+    scripts = sorted(
+        p.relative_to(root)
+        for p in (root / "scripts").iterdir()
+        if p.suffix in (".py", ".pat", ".json")
+    )
+    csvs = [p for p in release_inputs(root) if p.suffix == ".csv"]
+    check_inputs = [*csvs, *scripts]
+
+    def package() -> tuple[bool, str]:
+        files = release_inputs(root)
+        missing = [str(p) for p in files if not (root / p).is_file()]
+        if missing:
+            return False, "не найдены: " + ", ".join(missing)
+        write_zip(root, files, staging)
+        return True, f"{len(files)} файлов"
+
+    return [
+        _script_stage(
+            "validate",
+            root,
+            ["scripts/patch.py", "validate", "--target", targets],
+            check_inputs,
+        ),
+        _script_stage(
+            "linebreaks",
+            root,
+            ["scripts/fix_linebreaks.py", "--check", "--target", targets],
+            check_inputs,
+        ),
+        _script_stage(
+            "double-hashes",
+            root,
+            ["scripts/fix_double_hashes.py", "--check", "--target", targets],
+            check_inputs,
+        ),
+        Stage("package", tuple(release_inputs(root)), package),
+    ]
+
+
+def _load_cache(path: Path) -> dict[str, str]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: Path, cache: dict[str, str]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp_")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def build(
+    root: Path,
+    output: Path,
+    cache_file: Path,
+    *,
+    targets: str = "ZHS",
+    force: bool = False,
+    use_cache: bool = True,
+    jobs: int | None = None,
+) -> tuple[bool, list[StageResult]]:
+    """Run all stages and write the release zip to ``output``.
+
+    Args:
+        root: Repository root.
+        output: Destination zip.
+        cache_file: JSON file with the input key of each stage's last
+            successful run.
+        targets: Target columns for the checks.
+        force: Write the zip even if a check fails.
+        use_cache: Skip stages whose inputs are unchanged.
+        jobs: Parallel stages (default: all at once).
+
+    Returns:
+        ``(released, results)``; ``released`` is ``False`` if a check
+        failed and the zip was not updated.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=output.parent, prefix=".tmp_", suffix=".zip")
+    os.close(fd)
+    staging = Path(tmp)
+    cache = _load_cache(cache_file) if use_cache else {}
+
+    stages = plan(root, staging, targets=targets)
+    keys = {
+        s.name: inputs_key(root, list(s.inputs), s.name, targets)
+        for s in stages
+    }
+
+    def run(stage: Stage) -> StageResult:
+        # The package stage is only cached if its output is still in place.
+        if cache.get(stage.name) == keys[stage.name] and (
+            stage.name != "package"
+            or cache.get("package.sha256") == _digest_or_none(output)
+        ):
+            return StageResult(stage.name, True, True, "", 0.0)
+        t0 = time.perf_counter()
+        ok, out = stage.run()
+        return StageResult(stage.name, ok, False, out, time.perf_counter() - t0)
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs or len(stages)) as pool:
+            results = list(pool.map(run, stages))
+
+        checks_ok = all(r.ok for r in results if r.name != "package")
+        package = next(r for r in results if r.name == "package")
+        released = package.ok and (checks_ok or force)
+        if released and not package.cached:
+            os.chmod(staging, ZIP_FILE_MODE)
+            os.replace(staging, output)
+
+        new_cache = dict(cache)
+        for r in results:
+            if r.ok:
+                new_cache[r.name] = keys[r.name]
+            else:
+                new_cache.pop(r.name, None)
+        if released:
+            new_cache["package.sha256"] = file_digest(output)
+        else:
+            new_cache.pop("package", None)
+        _save_cache(cache_file, new_cache)
+    finally:
+        staging.unlink(missing_ok=True)
+
+    return released, results
+
+
+def _digest_or_none(path: Path) -> str | None:
+    return file_digest(path) if path.is_file() else None
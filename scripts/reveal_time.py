@@ -0,0 +1,152 @@
+"""Reveal-time model for dialogue: how long a line keeps the player waiting.
+
+The game prints text one character at a time, stops for ``/pN`` pauses and
+starts a new box on ``##``. A line's display time is modelled as::
+
+    visible_chars * CHAR_FRAMES + Σ pauses(N) * N * PAUSE_FRAMES
+        + line_breaks * LINE_FRAMES + page_breaks * PAGE_FRAMES
+
+in frames at ``FPS``. The constants are estimates; the ranking only relies
+on EN and the translation being measured the same way.
+
+Strings are turned into a feature matrix with ``numpy.strings`` (one
+vectorized call per feature over the whole corpus), times are a single
+matrix-vector product, and per-conversation totals use ``np.bincount``.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+from corpus_stats import require_numpy, text_metrics
+from csv_io import is_data_row, scan_csv
+
+DIALOGUE_GLOBS = ("gossip_*.csv", "greeting_strings.csv", "hack_text.csv")
+
+FPS = 60
+CHAR_FRAMES = 2.0
+PAUSE_FRAMES = 10.0
+PAUSE_LEVELS = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+LINE_FRAMES = 0.0
+PAGE_FRAMES = 30.0
+
+
+def _weights() -> "np.ndarray":
+    """Frames per unit of each feature column of :func:`features`."""
+    return np.array(
+        [CHAR_FRAMES, LINE_FRAMES, PAGE_FRAMES]
+        + [n * PAUSE_FRAMES for n in PAUSE_LEVELS]
+    )
+
+
+def features(texts: "np.ndarray") -> "np.ndarray":
+    """Feature matrix: visible chars, '#' breaks, '##' pages, pauses by level.
+
+    Args:
+        texts: 1-D array of ``str``.
+
+    Returns:
+        ``(len(texts), 3 + len(PAUSE_LEVELS))`` float array.
+    """
+    m = text_metrics(texts)
+    columns = [m["visible"], m["hashes"] - 2 * m["pages"], m["pages"]]
+    columns += [np.strings.count(texts, f"/p{n}") for n in PAUSE_LEVELS]
+    return np.stack(columns, axis=1).astype(float)
+
+
+def reveal_seconds(texts: "np.ndarray") -> "np.ndarray":
+    """Modelled display time of every text, in seconds."""
+    if len(texts) == 0:
+        return np.zeros(0)
+    return features(texts) @ _weights() / FPS
+
+
+@dataclass
+class DialogueTimes:
+    """Per-row times of the dialogue corpus.
+
+    Attributes:
+        files: File name of each row.
+        ids: Row ID.
+        lines: 1-based line in the file.
+        en: EN text.
+        target: Translation text.
+        en_seconds: Modelled EN time.
+        target_seconds: Modelled translation time.
+        conversation: Index into ``conversations`` for each row.
+        conversations: ``(file, ID)`` of each conversation.
+    """
+
+    files: list[str]
+    ids: list[str]
+    lines: "np.ndarray"
+    en: "np.ndarray"
+    target: "np.ndarray"
+    en_seconds: "np.ndarray"
+    target_seconds: "np.ndarray"
+    conversation: "np.ndarray"
+    conversations: list[tuple[str, str]]
+
+    @property
+    def delta(self) -> "np.ndarray":
+        """Extra seconds the translation adds per row."""
+        return self.target_seconds - self.en_seconds
+
+    def conversation_totals(self) -> tuple["np.ndarray", "np.ndarray"]:
+        """``(en_seconds, target_seconds)`` summed per conversation."""
+        n = len(self.conversations)
+        return (
+            np.bincount(self.conversation, self.en_seconds, minlength=n),
+            np.bincount(self.conversation, self.target_seconds, minlength=n),
+        )
+
+
+def dialogue_files(loc_dir: Path) -> list[Path]:
+    """Dialogue CSVs in ``loc_dir``, sorted."""
+    return sorted({p for g in DIALOGUE_GLOBS for p in loc_dir.glob(g)})
+
+
+def load(csv_files: list[Path], target: str = "ZHS") -> DialogueTimes:
+    """Read translated rows of ``csv_files`` and model their times.
+
+    Rows whose translation is empty or equal to EN are left out.
+
+    Raises:
+        RuntimeError: If numpy (>= 2.0) is not installed.
+    """
+    require_numpy()
+
+    files, ids, lines, en, dst, conv = [], [], [], [], [], []
+    conv_index: dict[tuple[str, str], int] = {}
+    for path in csv_files:
+        for row in scan_csv(path, ("ID", "EN", target)):
+            row_id, en_text, dst_text = row.cells
+            if not is_data_row(row.cells) or not dst_text.strip():
+                continue
+            if dst_text.strip() == en_text.strip():
+                continue
+            key = (path.name, row_id.strip())
+            files.append(path.name)
+            ids.append(key[1])
+            lines.append(row.line)
+            en.append(en_text)
+            dst.append(dst_text)
+            conv.append(conv_index.setdefault(key, len(conv_index)))
+
+    en_arr = np.array(en, dtype=str)
+    dst_arr = np.array(dst, dtype=str)
+    return DialogueTimes(
+        files=files,
+        ids=ids,
+        lines=np.array(lines, dtype=int),
+        en=en_arr,
+        target=dst_arr,
+        en_seconds=reveal_seconds(en_arr),
+        target_seconds=reveal_seconds(dst_arr),
+        conversation=np.array(conv, dtype=int),
+        conversations=list(conv_index),
+    )
@@ -0,0 +1,466 @@
+"""Long-running JSON-RPC server for editor integrations (``patch.py serve``).
+
+Messages are JSON-RPC 2.0 objects, one per line, over stdin/stdout or a
+Unix socket. The corpus, a token index and lint results stay in memory;
+before each request the files' ``(mtime, size)`` are compared with the
+last load and only changed files are re-read.
+
+Methods (``params`` are objects):
+
+``validate-row``  ``{file, en, text, comments?, target?}`` → issues
+``validate``      ``{file?, target?}`` → cached issues of the corpus
+``stats``         ``{target?}`` → per-file and total progress
+``search``        ``{query, column?, limit?}`` → rows containing all words
+``suggest``       ``{en, target?, limit?}`` → translations of similar EN rows
+``wrap-preview``  ``{text, file?, max_vis?, hyphenate?}`` → wrapped text
+``shutdown``      stops the server
+"""
+
+import json
+import logging
+import re
+import socketserver
+import sys
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TextIO
+
+import fix_linebreaks
+from csv_io import (
+    CsvScanError,
+    is_data_row,
+    is_translated,
+    read_header,
+    scan_csv,
+)
+from lint_rules import LintEngine, file_category
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+_REQUIRED = object()
+
+
+def words(text: str) -> set[str]:
+    """Lowercase words of ``text`` with formatting tags removed."""
+    return set(WORD_RE.findall(fix_linebreaks.strip_tags(text).lower()))
+
+
+class RpcError(Exception):
+    """Error reported to the client as a JSON-RPC error object."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _param(params: dict, name: str, kind: type, default=_REQUIRED):
+    """``params[name]`` checked to be a ``kind``; ``default`` if absent or null.
+
+    Raises:
+        RpcError: ``INVALID_PARAMS`` if the parameter is missing without a
+            default, has another type, or is a negative ``int``.
+    """
+    value = params.get(name)
+    if value is None:
+        if default is _REQUIRED:
+            raise RpcError(INVALID_PARAMS, f"нет параметра '{name}'")
+        return default
+    # bool is an int subclass, but true is not a valid limit.
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise RpcError(
+            INVALID_PARAMS, f"{name}: ожидался {kind.__name__}, а не {value!r:.40}"
+        )
+    if kind is int and value < 0:
+        raise RpcError(INVALID_PARAMS, f"{name}: отрицательное значение")
+    return value
+
+
+@dataclass
+class FileState:
+    """Parsed rows and lint results of one CSV at a given ``(mtime, size)``."""
+
+    stamp: tuple[int, int]
+    rows: list[dict[str, str]] = field(default_factory=list)
+    lines: list[int] = field(default_factory=list)
+    issues: list[dict] = field(default_factory=list)
+    words: set[str] = field(default_factory=set)
+
+
+class Corpus:
+    """In-memory corpus with a word index, refreshed per changed file."""
+
+    def __init__(self, loc_dir: Path, targets: tuple[str, ...]):
+        self.loc_dir = loc_dir
+        self.targets = targets
+        self.engine = LintEngine.from_registry()
+        self.files: dict[str, FileState] = {}
+        # word → file → row indices; per column.
+        self.index: dict[str, dict[str, dict[str, set[int]]]] = {
+            c: defaultdict(dict) for c in ("EN", *targets)
+        }
+        self.lock = threading.Lock()
+
+    # ── loading ──
+
+    def refresh(self) -> list[str]:
+        """Re-read files whose mtime or size changed; return their names."""
+        seen = set()
+        changed = []
+        for path in sorted(self.loc_dir.glob("*.csv")):
+            st = path.stat()
+            stamp = (st.st_mtime_ns, st.st_size)
+            seen.add(path.name)
+            state = self.files.get(path.name)
+            if state is None or state.stamp != stamp:
+                self._unindex(path.name)
+                self.files[path.name] = self._load(path, stamp)
+                self._index(path.name)
+                changed.append(path.name)
+        for name in set(self.files) - seen:
+            self._unindex(name)
+            del self.files[name]
+            changed.append(name)
+        return changed
+
+    def _load(self, path: Path, stamp: tuple[int, int]) -> FileState:
+        state = FileState(stamp)
+        header = read_header(path)
+        present = [t for t in self.targets if t in header]
+        if "EN" not in header or not present:
+            return state
+        columns = ["ID", "EN", *present]
+        if "Comments" in header:
+            columns.insert(1, "Comments")
+        rules = self.engine.rules_for(file_category(path.name))
+
+        errors: list[CsvScanError] = []
+        for row in scan_csv(path, columns, errors=errors):
+            if not is_data_row(row.cells):
+                continue
+            cells = dict(zip(columns, row.cells))
+            cells.setdefault("Comments", "")
+            state.rows.append(cells)
+            state.lines.append(row.line)
+            en = cells["EN"].strip()
+            for target in present:
+                if not en or cells[target].strip() == en:
+                    continue
+                for issue in self.engine.check_row(
+                    rules, cells, cells["Comments"], dst=target
+                ):
+                    state.issues.append({
+                        "file": path.name,
+                        "line": row.line,
+                        "target": target,
+                        **issue._asdict(),
+                    })
+        for err in errors:
+            state.issues.append({
+                "file": path.name,
+                "line": err.line,
+                "target": present[0],
+                "rule": "csv",
+                "severity": "error",
+                "message": str(err),
+            })
+        return state
+
+    def _index(self, name: str) -> None:
+        state = self.files[name]
+        for i, cells in enumerate(state.rows):
+            for column, index in self.index.items():
+                for word in words(cells.get(column, "")):
+                    index[word].setdefault(name, set()).add(i)
+                    state.words.add(word)
+
+    def _unindex(self, name: str) -> None:
+        if name not in self.files:
+            return
+        for index in self.index.values():
+            for word in self.files[name].words:
+                files = index.get(word)
+                if files is not None and files.pop(name, None) is not None:
+                    if not files:
+                        del index[word]
+
+    def _row(self, name: str, i: int, target: str) -> dict:
+        cells = self.files[name].rows[i]
+        return {
+            "file": name,
+            "line": self.files[name].lines[i],
+            "id": cells["ID"].strip(),
+            "en": cells["EN"],
+            "text": cells.get(target, ""),
+        }
+
+    def _target(self, params: dict) -> str:
+        target = _param(params, "target", str, self.targets[0])
+        if target not in self.targets:
+            raise RpcError(INVALID_PARAMS, f"колонка не загружена: {target}")
+        return target
+
+    # ── methods ──
+
+    def validate_row(self, params: dict) -> list[dict]:
+        name = _param(params, "file", str)
+        en = _param(params, "en", str)
+        text = _param(params, "text", str)
+        comments = _param(params, "comments", str, "")
+        target = self._target(params)
+        rules = self.engine.rules_for(file_category(name))
+        cells = {"EN": en, target: text}
+        return [
+            issue._asdict()
+            for issue in self.engine.check_row(rules, cells, comments, dst=target)
+        ]
+
+    def validate(self, params: dict) -> list[dict]:
+        name = _param(params, "file", str, None)
+        target = _param(params, "target", str, None)
+        states = (
+            [self.files[name]] if name in self.files
+            else [] if name else self.files.values()
+        )
+        return [
+            issue
+            for state in states
+            for issue in state.issues
+            if target is None or issue["target"] == target
+        ]
+
+    def stats(self, params: dict) -> dict:
+        target = self._target(params)
+        files = {}
+        for name, state in sorted(self.files.items()):
+            rows = [r for r in state.rows if r["EN"].strip() and target in r]
+            done = sum(is_translated(r["EN"], r[target]) for r in rows)
+            if rows:
+                files[name] = {"total": len(rows), "done": done}
+        total = sum(f["total"] for f in files.values())
+        done = sum(f["done"] for f in files.values())
+        return {"files": files, "total": total, "done": done}
+
+    def search(self, params: dict) -> list[dict]:
+        query = words(_param(params, "query", str, ""))
+        column = _param(params, "column", str, "EN")
+        if column not in self.index:
+            raise RpcError(INVALID_PARAMS, f"колонка не загружена: {column}")
+        if not query:
+            return []
+        index = self.index[column]
+        limit = _param(params, "limit", int, 50)
+        # Intersect posting lists, rarest word first.
+        postings = sorted(
+            (index.get(w, {}) for w in query),
+            key=lambda p: sum(map(len, p.values())),
+        )
+        hits = []
+        for name in sorted(postings[0]):
+            rows = set(postings[0][name])
+            for p in postings[1:]:
+                rows &= p.get(name, set())
+                if not rows:
+                    break
+            for i in sorted(rows):
+                hits.append(self._row(name, i, self.targets[0]))
+                if len(hits) >= limit:
+                    return hits
+        return hits
+
+    def suggest(self, params: dict) -> list[dict]:
+        """Translated rows whose EN shares the most words with ``en``."""
+        en = _param(params, "en", str, "")
+        target = self._target(params)
+        limit = _param(params, "limit", int, 5)
+        query = words(en)
+        if not query:
+            return []
+        overlap: dict[tuple[str, int], int] = defaultdict(int)
+        for w in query:
+            for name, rows in self.index["EN"].get(w, {}).items():
+                for i in rows:
+                    overlap[name, i] += 1
+
+        scored = []
+        for (name, i), common in overlap.items():
+            cells = self.files[name].rows[i]
+            text = cells.get(target, "")
+            if not text.strip() or text.strip() == cells["EN"].strip():
+                continue
+            other = len(words(cells["EN"]))
+            score = 1.0 if cells["EN"].strip() == en.strip() else (
+                common / (len(query) + other - common)
+            )
+            scored.append((score, name, i))
+        scored.sort(key=lambda s: (-s[0], s[1], s[2]))
+        return [
+            {**self._row(name, i, target), "score": round(score, 3)}
+            for score, name, i in scored[:limit]
+        ]
+
+    def wrap_preview(self, params: dict) -> dict:
+        text = _param(params, "text", str, "")
+        target = _param(params, "target", str, self.targets[0])
+        max_vis = _param(params, "max_vis", int, None)
+        if max_vis is None:
+            max_vis = fix_linebreaks.get_max_vis(_param(params, "file", str, ""))
+            if max_vis is None:
+                return {"text": text, "lines": text.split("#"), "overflow": []}
+        max_vis = fix_linebreaks.scaled_max_vis(max_vis, target)
+        hyph = None
+        if _param(params, "hyphenate", bool, False):
+            hyph = fix_linebreaks.hyphenator_for(target)
+        wrapped = fix_linebreaks.fix_zhs_text(text, max_vis, hyph)
+        lines = wrapped.split("#")
+        return {
+            "text": wrapped,
+            "max_vis": max_vis,
+            "lines": lines,
+            "overflow": [
+                i for i, line in enumerate(lines)
+                if fix_linebreaks.vis_len(line) > max_vis
+            ],
+        }
+
+
+class Server:
+    """Dispatches JSON-RPC messages to a :class:`Corpus`."""
+
+    def __init__(self, corpus: Corpus):
+        self.corpus = corpus
+        self.stopped = threading.Event()
+        self.methods = {
+            "validate-row": corpus.validate_row,
+            "validate": corpus.validate,
+            "stats": corpus.stats,
+            "search": corpus.search,
+            "suggest": corpus.suggest,
+            "wrap-preview": corpus.wrap_preview,
+        }
+
+    def handle_line(self, line: str) -> str | None:
+        """Answer one message; ``None`` for notifications.
+
+        Errors in a handler or while refreshing the corpus are answered
+        (``INTERNAL_ERROR`` with the traceback logged) and never stop the
+        server. Notifications get no reply, not even an error.
+        """
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return self._error(None, PARSE_ERROR, "неверный JSON")
+        if not isinstance(msg, dict) or not isinstance(msg.get("method"), str):
+            return self._error(None, INVALID_REQUEST, "нет method")
+        msg_id = msg.get("id")
+        method = msg["method"]
+        params = msg.get("params") or {}
+
+        try:
+            result = self._call(method, params)
+        except RpcError as e:
+            reply = self._error(msg_id, e.code, str(e))
+        except Exception as e:
+            logger.exception("ошибка в методе %s", method)
+            reply = self._error(msg_id, INTERNAL_ERROR, f"внутренняя ошибка: {e}")
+        else:
+            reply = self._result(msg_id, result)
+        return None if msg_id is None else reply
+
+    def _call(self, method: str, params: object) -> object:
+        if method == "shutdown":
+            self.stopped.set()
+            return None
+        handler = self.methods.get(method)
+        if handler is None:
+            raise RpcError(METHOD_NOT_FOUND, f"нет метода {method}")
+        if not isinstance(params, dict):
+            raise RpcError(INVALID_PARAMS, "params — объект")
+        with self.corpus.lock:
+            self.corpus.refresh()
+            return handler(params)
+
+    @staticmethod
+    def _result(msg_id, result) -> str:
+        return json.dumps(
+            {"jsonrpc": "2.0", "id": msg_id, "result": result},
+            ensure_ascii=False,
+        )
+
+    @staticmethod
+    def _error(msg_id, code: int, message: str) -> str:
+        return json.dumps(
+            {"jsonrpc": "2.0", "id": msg_id,
+             "error": {"code": code, "message": message}},
+            ensure_ascii=False,
+        )
+
+    def serve_stream(self, reader: TextIO, writer: TextIO) -> None:
+        """Answer messages line by line until EOF or ``shutdown``."""
+        for line in reader:
+            if not line.strip():
+                continue
+            reply = self.handle_line(line)
+            if reply is not None:
+                writer.write(reply + "\n")
+                writer.flush()
+            if self.stopped.is_set():
+                break
+
+    def serve_socket(self, path: Path) -> None:
+        """Accept clients on a Unix socket, one thread per connection."""
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                reader = (line.decode("utf-8") for line in self.rfile)
+                writer = _SocketWriter(self.wfile)
+                server.serve_stream(reader, writer)
+                if server.stopped.is_set():
+                    threading.Thread(target=sock.shutdown).start()
+
+        path.unlink(missing_ok=True)
+        with socketserver.ThreadingUnixStreamServer(str(path), Handler) as sock:
+            sock.daemon_threads = True
+            try:
+                sock.serve_forever()
+            finally:
+                path.unlink(missing_ok=True)
+
+
+class _SocketWriter:
+    """Text-mode ``write``/``flush`` over a socket's binary stream."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> None:
+        self.wfile.write(text.encode("utf-8"))
+
+    def flush(self) -> None:
+        self.wfile.flush()
+
+
+def start(loc_dir: Path, targets: tuple[str, ...]) -> tuple[Server, float]:
+    """Load the corpus; return the server and the load time in seconds."""
+    t0 = time.perf_counter()
+    corpus = Corpus(loc_dir, targets)
+    corpus.refresh()
+    return Server(corpus), time.perf_counter() - t0
+
+
+def serve_stdio(server: Server) -> None:
+    """Serve over stdin/stdout (UTF-8)."""
+    sys.stdin.reconfigure(encoding="utf-8")
+    sys.stdout.reconfigure(encoding="utf-8")
+    server.serve_stream(sys.stdin, sys.stdout)
@@ -0,0 +1,254 @@
+"""Split untranslated rows into balanced batches and merge them back.
+
+Untranslated rows (target == EN) are grouped into units: a whole
+conversation (all rows with one ID) in ``gossip_*.csv``, a single row
+elsewhere. Units are bin-packed into N shards by EN character count with
+the longest-processing-time heuristic. Each shard is a JSON file whose rows
+carry their identity ``(file, id, occurrence)``, an EN hash for staleness
+checks and read-only conversation context; translators fill in
+``translation``.
+"""
+
+import hashlib
+import heapq
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import NamedTuple
+
+from csv_io import data_row_keys, read_csv, scan_csv, splice_file
+
+CONVERSATION_PREFIX = "gossip_"
+SHARD_GLOB = "shard_*.json"
+
+
+def en_hash(text: str) -> str:
+    """Short stable hash of an EN cell, used to detect source changes."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+# ── shard ───────────────────────────────────────────────────────────────
+
+
+def collect_units(
+    csv_files: list[Path], target: str = "ZHS"
+) -> list[list[dict]]:
+    """Return untranslated rows grouped into translation units.
+
+    Args:
+        csv_files: Localization files to scan.
+        target: Target column.
+
+    Returns:
+        List of units; each unit is a list of row dicts.
+    """
+    units: list[list[dict]] = []
+    for path in csv_files:
+        rows = read_csv(path)
+        if not rows or "EN" not in rows[0] or target not in rows[0]:
+            continue
+        en_idx = rows[0].index("EN")
+        zhs_idx = rows[0].index(target)
+        conversation = path.name.startswith(CONVERSATION_PREFIX)
+
+        by_id: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for i, (row_id, occurrence) in data_row_keys(rows):
+            if len(rows[i]) > max(en_idx, zhs_idx):
+                by_id[row_id].append((i, occurrence))
+
+        for row_id, members in by_id.items():
+            todo = [
+                (i, occ)
+                for i, occ in members
+                if rows[i][en_idx].strip()
+                and rows[i][zhs_idx].strip() == rows[i][en_idx].strip()
+            ]
+            if not todo:
+                continue
+
+            def item(i: int, occ: int) -> dict:
+                entry = {
+                    "file": path.name,
+                    "id": row_id,
+                    "occurrence": occ,
+                    "en": rows[i][en_idx],
+                    "en_hash": en_hash(rows[i][en_idx]),
+                    "translation": "",
+                }
+                if conversation:
+                    entry["context"] = [
+                        {"en": rows[j][en_idx], target: rows[j][zhs_idx]}
+                        for j, _ in members
+                    ]
+                return entry
+
+            if conversation:
+                units.append([item(i, occ) for i, occ in todo])
+            else:
+                units.extend([item(i, occ)] for i, occ in todo)
+    return units
+
+
+def pack(units: list[list[dict]], workers: int) -> list[list[dict]]:
+    """Bin-pack units into ``workers`` shards balanced by EN length.
+
+    Longest units go first, each into the currently lightest shard (LPT),
+    which keeps the heaviest shard within 4/3 of the optimum.
+    """
+    heap = [(0, n) for n in range(workers)]
+    shards: list[list[dict]] = [[] for _ in range(workers)]
+    weighted = sorted(
+        units, key=lambda u: sum(len(r["en"]) for r in u), reverse=True
+    )
+    for unit in weighted:
+        load, n = heapq.heappop(heap)
+        shards[n].extend(unit)
+        heapq.heappush(heap, (load + sum(len(r["en"]) for r in unit), n))
+    return shards
+
+
+def write_shards(
+    shards: list[list[dict]], out_dir: Path, target: str
+) -> list[Path]:
+    """Write ``shard_NN.json`` files, replacing shards from a previous run."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for old in out_dir.glob(SHARD_GLOB):
+        old.unlink()
+
+    paths = []
+    for n, rows in enumerate(shards, start=1):
+        path = out_dir / f"shard_{n:02d}.json"
+        data = {
+            "shard": n,
+            "target": target,
+            "chars": sum(len(r["en"]) for r in rows),
+            "rows": rows,
+        }
+        path.write_text(
+            json.dumps(data, ensure_ascii=False, indent=1) + "\n",
+            encoding="utf-8",
+        )
+        paths.append(path)
+    return paths
+
+
+# ── merge ───────────────────────────────────────────────────────────────
+
+
+class MergeReport(NamedTuple):
+    """Outcome of :func:`merge_shards`."""
+
+    applied: dict[str, int]
+    unchanged: int
+    stale: list[str]
+    conflicts: list[str]
+
+
+def load_translations(
+    shard_paths: list[Path],
+) -> tuple[str, dict[tuple[str, str, int], dict], list[str]]:
+    """Build the hash-join index ``(file, id, occurrence) → row``.
+
+    Rows with an empty ``translation`` are ignored. Two shards giving
+    different translations for the same row are reported as conflicts and
+    dropped.
+
+    Returns:
+        ``(target, index, conflicts)``.
+
+    Raises:
+        ValueError: If the shards were made for different target columns.
+    """
+    index: dict[tuple[str, str, int], dict] = {}
+    conflicts: list[str] = []
+    dropped: set[tuple[str, str, int]] = set()
+    targets: dict[str, str] = {}
+
+    for path in shard_paths:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        targets[path.name] = data.get("target", "ZHS")
+        if len(set(targets.values())) > 1:
+            raise ValueError(
+                "шарды для разных колонок: "
+                + ", ".join(f"{n} → {t}" for n, t in targets.items())
+            )
+        for row in data["rows"]:
+            if not row.get("translation", "").strip():
+                continue
+            key = (row["file"], row["id"], row["occurrence"])
+            row = {**row, "shard": path.name}
+            if key in dropped:
+                continue
+            prev = index.get(key)
+            if prev is not None and prev["translation"] != row["translation"]:
+                conflicts.append(
+                    f"{key[0]} id={key[1]}#{key[2]}: "
+                    f"{prev['shard']} ≠ {row['shard']}"
+                )
+                del index[key]
+                dropped.add(key)
+                continue
+            index[key] = row
+    target = next(iter(targets.values()), "ZHS")
+    return target, index, conflicts
+
+
+def merge_shards(
+    loc_dir: Path, shard_paths: list[Path], *, dry_run: bool = False
+) -> MergeReport:
+    """Apply translated shard rows to the CSVs, one read/write per file.
+
+    A row is stale if it no longer exists or its EN changed since sharding,
+    and conflicting if the target cell was translated differently in the
+    meantime. Only the target cells are spliced into a file (see
+    :func:`csv_io.splice_file`); every other byte stays as it was.
+
+    Raises:
+        ValueError: If the shards were made for different target columns.
+    """
+    target, index, conflicts = load_translations(shard_paths)
+    by_file: dict[str, dict[tuple[str, int], dict]] = defaultdict(dict)
+    for (name, row_id, occurrence), row in index.items():
+        by_file[name][(row_id, occurrence)] = row
+
+    applied: dict[str, int] = {}
+    unchanged = 0
+    stale: list[str] = []
+
+    for name, wanted in sorted(by_file.items()):
+        path = loc_dir / name
+        rows = read_csv(path) if path.is_file() else []
+        if not rows or "EN" not in rows[0] or target not in rows[0]:
+            stale.extend(f"{name} id={k[0]}#{k[1]}: файл" for k in wanted)
+            continue
+        en_idx = rows[0].index("EN")
+        zhs_idx = rows[0].index(target)
+        # scan_csv yields the same non-blank records as csv.reader, in order.
+        offsets = iter(row.offset for row in scan_csv(path, rows[0][:1]))
+        offset_of = {i: next(offsets) for i in range(1, len(rows)) if rows[i]}
+
+        edits: dict[int, dict[int, str]] = {}
+        for i, key in data_row_keys(rows):
+            row = wanted.pop(key, None)
+            if row is None:
+                continue
+            cells = rows[i]
+            label = f"{name} id={key[0]}#{key[1]}"
+            if len(cells) <= max(en_idx, zhs_idx):
+                stale.append(f"{label}: неполная строка")
+            elif en_hash(cells[en_idx]) != row["en_hash"]:
+                stale.append(f"{label}: EN изменился")
+            elif cells[zhs_idx] == row["translation"]:
+                unchanged += 1
+            elif cells[zhs_idx].strip() != cells[en_idx].strip():
+                conflicts.append(f"{label}: уже переведено иначе")
+            else:
+                edits[offset_of[i]] = {zhs_idx: row["translation"]}
+
+        stale.extend(f"{name} id={k[0]}#{k[1]}: строка не найдена" for k in wanted)
+        if edits:
+            applied[name] = len(edits)
+            if not dry_run:
+                splice_file(path, edits)
+
+    return MergeReport(applied, unchanged, stale, conflicts)
@@ -0,0 +1,208 @@
+"""SQLite mirror of the localization corpus for ad-hoc queries.
+
+One row per cell of every data row, keyed by ``(file, id, occurrence,
+col)``, with an FTS5 index over the text. Export is incremental: files
+whose SHA-256 matches the stored hash are skipped. Example::
+
+    SELECT c.file, c.id, c.text
+    FROM cells c JOIN files f ON f.name = c.file
+    WHERE f.category = 'tooltip' AND c.col = 'ZHS'
+      AND length(c.text) > 60 AND c.text LIKE '%/c5%';
+
+    SELECT file, id, col, text FROM cells
+    WHERE rowid IN (SELECT rowid FROM cells_fts WHERE cells_fts MATCH 'бомба');
+"""
+
+import hashlib
+import json
+import sqlite3
+from pathlib import Path
+
+from csv_io import data_row_keys, read_csv, scan_csv, splice_file
+from lint_rules import file_category
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    name     TEXT PRIMARY KEY,
+    sha256   TEXT NOT NULL,
+    category TEXT NOT NULL,
+    header   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cells (
+    rowid      INTEGER PRIMARY KEY,
+    file       TEXT NOT NULL,
+    id         TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    col        TEXT NOT NULL,
+    line       INTEGER NOT NULL,
+    text       TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS cells_key
+    ON cells (file, id, occurrence, col);
+CREATE INDEX IF NOT EXISTS cells_col ON cells (col, file);
+CREATE VIRTUAL TABLE IF NOT EXISTS cells_fts USING fts5 (
+    text, content='cells', content_rowid='rowid', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS cells_ai AFTER INSERT ON cells BEGIN
+    INSERT INTO cells_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS cells_ad AFTER DELETE ON cells BEGIN
+    INSERT INTO cells_fts (cells_fts, rowid, text)
+        VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS cells_au AFTER UPDATE OF text ON cells BEGIN
+    INSERT INTO cells_fts (cells_fts, rowid, text)
+        VALUES ('delete', old.rowid, old.text);
+    INSERT INTO cells_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+# Columns that are identity or bookkeeping, not text.
+_SKIP_COLUMNS = frozenset({"ID"})
+
+
+def _sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open (and create if needed) the corpus database."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _line_numbers(rows: list[list[str]]) -> list[int]:
+    """Physical start line of every parsed row (quoted cells may span lines)."""
+    lines = []
+    line = 1
+    for row in rows:
+        lines.append(line)
+        line += 1 + sum(cell.count("\n") for cell in row)
+    return lines
+
+
+def export_corpus(
+    conn: sqlite3.Connection, csv_files: list[Path]
+) -> tuple[int, int, int]:
+    """Load changed files into the database in a single transaction.
+
+    Args:
+        conn: Connection from :func:`connect`.
+        csv_files: All localization CSVs; stored files not in this list
+            are removed.
+
+    Returns:
+        ``(updated_files, unchanged_files, removed_files)``.
+    """
+    stored = dict(conn.execute("SELECT name, sha256 FROM files"))
+    updated = unchanged = 0
+
+    with conn:
+        for path in csv_files:
+            digest = _sha256(path)
+            if stored.pop(path.name, None) == digest:
+                unchanged += 1
+                continue
+
+            rows = read_csv(path)
+            if not rows:
+                continue
+            header = rows[0]
+            lines = _line_numbers(rows)
+
+            conn.execute("DELETE FROM cells WHERE file = ?", (path.name,))
+            conn.executemany(
+                "INSERT INTO cells (file, id, occurrence, col, line, text)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (path.name, key[0], key[1], col, lines[i], rows[i][c])
+                    for i, key in data_row_keys(rows)
+                    for c, col in enumerate(header)
+                    if col not in _SKIP_COLUMNS and c < len(rows[i])
+                ),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO files (name, sha256, category, header)"
+                " VALUES (?, ?, ?, ?)",
+                (
+                    path.name,
+                    digest,
+                    file_category(path.name),
+                    json.dumps(header, ensure_ascii=False),
+                ),
+            )
+            updated += 1
+
+        for name in stored:
+            conn.execute("DELETE FROM cells WHERE file = ?", (name,))
+            conn.execute("DELETE FROM files WHERE name = ?", (name,))
+
+    return updated, unchanged, len(stored)
+
+
+def import_corpus(
+    conn: sqlite3.Connection,
+    loc_dir: Path,
+    *,
+    dry_run: bool = False,
+    force: bool = False,
+) -> tuple[dict[str, int], list[str]]:
+    """Write cells edited in the database back into the CSV files.
+
+    Only the changed cells are spliced into each file (see
+    :func:`csv_io.splice_file`); the BOM, or its absence, and the quoting
+    of every other cell are kept. A file that changed on disk since the last export is skipped (its
+    database copy is stale) unless ``force`` is set.
+
+    Returns:
+        ``({file: changed_cells}, skipped_stale_files)``.
+    """
+    changed: dict[str, int] = {}
+    stale: list[str] = []
+
+    for name, digest in conn.execute(
+        "SELECT name, sha256 FROM files ORDER BY name"
+    ).fetchall():
+        path = loc_dir / name
+        if not path.is_file():
+            continue
+        if _sha256(path) != digest and not force:
+            stale.append(name)
+            continue
+
+        cells = {
+            (row_id, occurrence, col): text
+            for row_id, occurrence, col, text in conn.execute(
+                "SELECT id, occurrence, col, text FROM cells WHERE file = ?",
+                (name,),
+            )
+        }
+        rows = read_csv(path)
+        if not rows:
+            continue
+        header = rows[0]
+        # scan_csv yields the same non-blank records as csv.reader, in order.
+        offsets = iter(row.offset for row in scan_csv(path, header[:1]))
+        offset_of = {i: next(offsets) for i in range(1, len(rows)) if rows[i]}
+        edits: dict[int, dict[int, str]] = {}
+        for i, (row_id, occurrence) in data_row_keys(rows):
+            row = rows[i]
+            for c, col in enumerate(header):
+                new = cells.get((row_id, occurrence, col))
+                if new is not None and c < len(row) and row[c] != new:
+                    edits.setdefault(offset_of[i], {})[c] = new
+
+        count = sum(map(len, edits.values()))
+        if not count:
+            continue
+        changed[name] = count
+        if not dry_run:
+            splice_file(path, edits)
+            with conn:
+                conn.execute(
+                    "UPDATE files SET sha256 = ? WHERE name = ?",
+                    (_sha256(path), name),
+                )
+
+    return changed, stale
@@ -0,0 +1,325 @@
+"""Game install discovery for Star of Providence.
+
+Parses Steam's KeyValues (VDF) files to enumerate library folders and probes
+candidate game directories concurrently. Every probe runs in a daemon thread
+with its own timeout, so a disconnected network drive only costs one timeout
+instead of stalling the whole search.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+GAME_SUBDIR = Path("steamapps", "common", "Star of Providence")
+GAME_APP_ID = "603960"
+
+INSTALL_MARKER = Path("localization")
+BACKUP_MARKER = Path("_backup_ru")
+
+PROBE_WORKERS: int = 8
+PROBE_TIMEOUT: float = 2.0
+
+_LINUX_STEAM_DIRS = (
+    Path.home() / ".steam" / "steam",
+    Path.home() / ".local" / "share" / "Steam",
+    Path.home() / ".var" / "app" / "com.valvesoftware.Steam" / ".local"
+    / "share" / "Steam",
+)
+
+_VDF_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+VdfNode = dict[str, "str | VdfNode"]
+
+
+# ── VDF parser ──────────────────────────────────────────────────────────
+
+
+def _vdf_tokens(text: str) -> Iterator[tuple[str, bool, int]]:
+    """Yield ``(token, is_string, line)`` triples from KeyValues text.
+
+    Braces are returned as bare tokens; quoted and unquoted strings are
+    returned with ``is_string=True``. ``//`` comments and ``[$COND]``
+    platform conditionals are skipped.
+    """
+    i = 0
+    line = 1
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if ch == "\n":
+            line += 1
+            i += 1
+        elif ch.isspace():
+            i += 1
+        elif text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+        elif ch in "{}":
+            yield ch, False, line
+            i += 1
+        elif ch == "[":
+            end = text.find("]", i)
+            if end < 0:
+                raise ValueError(f"VDF: незакрытое условие в строке {line}")
+            i = end + 1
+        elif ch == '"':
+            start_line = line
+            buf: list[str] = []
+            i += 1
+            while True:
+                if i >= n:
+                    raise ValueError(
+                        f"VDF: незакрытая строка в строке {start_line}"
+                    )
+                ch = text[i]
+                if ch == '"':
+                    i += 1
+                    break
+                if ch == "\\" and i + 1 < n and text[i + 1] in _VDF_ESCAPES:
+                    buf.append(_VDF_ESCAPES[text[i + 1]])
+                    i += 2
+                    continue
+                if ch == "\n":
+                    line += 1
+                buf.append(ch)
+                i += 1
+            yield "".join(buf), True, start_line
+        else:
+            start = i
+            while i < n and not text[i].isspace() and text[i] not in '{}"':
+                i += 1
+            yield text[start:i], True, line
+
+
+def parse_vdf(text: str) -> VdfNode:
+    """Parse Valve KeyValues text into nested dicts.
+
+    Keys are lower-cased, because Steam itself treats them case-insensitively
+    (``LibraryFolders`` and ``libraryfolders`` both occur in the wild).
+    Duplicate keys keep the last value.
+
+    Args:
+        text: Contents of a ``.vdf`` / ``.acf`` file.
+
+    Returns:
+        Mapping of keys to strings or nested mappings.
+
+    Raises:
+        ValueError: On unbalanced braces or unterminated strings.
+    """
+    root: VdfNode = {}
+    stack: list[VdfNode] = [root]
+    key: str | None = None
+
+    for token, is_string, line in _vdf_tokens(text):
+        if token == "{" and not is_string:
+            if key is None:
+                raise ValueError(f"VDF: блок без ключа в строке {line}")
+            child: VdfNode = {}
+            stack[-1][key] = child
+            stack.append(child)
+            key = None
+        elif token == "}" and not is_string:
+            if key is not None or len(stack) == 1:
+                raise ValueError(f"VDF: лишняя '}}' в строке {line}")
+            stack.pop()
+        elif key is None:
+            key = token.lower()
+        else:
+            stack[-1][key] = token
+            key = None
+
+    if len(stack) != 1 or key is not None:
+        raise ValueError("VDF: неожиданный конец файла")
+    return root
+
+
+def library_folders(steam_dir: Path) -> list[Path]:
+    """Return library roots listed in ``steamapps/libraryfolders.vdf``.
+
+    Supports both the current layout (``"0" { "path" "..." }``) and the
+    legacy one (``"1" "D:\\SteamLibrary"``). A missing or unparsable file
+    yields an empty list.
+    """
+    vdf = steam_dir / "steamapps" / "libraryfolders.vdf"
+    try:
+        data = parse_vdf(vdf.read_text(encoding="utf-8", errors="replace"))
+    except (OSError, ValueError):
+        return []
+
+    folders = data.get("libraryfolders")
+    if not isinstance(folders, dict):
+        return []
+
+    roots: list[Path] = []
+    for key, value in folders.items():
+        if not key.isdigit():
+            continue
+        if isinstance(value, dict):
+            path = value.get("path")
+            if isinstance(path, str):
+                roots.append(Path(path))
+        else:
+            roots.append(Path(value))
+    return roots
+
+
+# ── Candidates ──────────────────────────────────────────────────────────
+
+
+def steam_dirs() -> list[Path]:
+    """Return likely Steam client directories for the current platform."""
+    if os.name != "nt":
+        return list(_LINUX_STEAM_DIRS)
+
+    import winreg
+
+    try:
+        with winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam"
+        ) as key:
+            value, _ = winreg.QueryValueEx(key, "SteamPath")
+    except OSError:
+        return []
+    return [Path(value)]
+
+
+def candidate_roots(steam_dirs: Iterable[Path]) -> list[Path]:
+    """Build the ordered, de-duplicated list of game directories to probe.
+
+    Order mirrors ``install_patch.bat``: Steam's own library first, then the
+    folders from ``libraryfolders.vdf``, then ``X:\\SteamLibrary`` on every
+    drive letter (Windows only).
+    """
+    seen: set[str] = set()
+    result: list[Path] = []
+
+    def add(library: Path) -> None:
+        game = library / GAME_SUBDIR
+        key = os.path.normcase(str(game))
+        if key not in seen:
+            seen.add(key)
+            result.append(game)
+
+    for steam_dir in steam_dirs:
+        add(steam_dir)
+        for library in library_folders(steam_dir):
+            add(library)
+
+    if os.name == "nt":
+        for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+            add(Path(f"{letter}:\\SteamLibrary"))
+
+    return result
+
+
+# ── Probing ─────────────────────────────────────────────────────────────
+
+
+def probe(
+    candidates: list[Path],
+    marker: Path,
+    *,
+    workers: int = PROBE_WORKERS,
+    timeout: float = PROBE_TIMEOUT,
+) -> Path | None:
+    """Return the first candidate (in list order) that contains ``marker``.
+
+    At most ``workers`` probes are in flight at once. A probe that does not
+    answer within ``timeout`` seconds is treated as a miss and its worker
+    slot is released; the stuck daemon thread is simply abandoned.
+
+    Args:
+        candidates: Game directories in priority order.
+        marker: Relative directory that must exist inside the game folder.
+        workers: Maximum number of concurrent probes.
+        timeout: Per-probe timeout in seconds.
+
+    Returns:
+        The highest-priority matching directory, or ``None``.
+    """
+    results: queue.SimpleQueue[tuple[int, bool]] = queue.SimpleQueue()
+    pending = deque(range(len(candidates)))
+    started: dict[int, float] = {}
+    found: dict[int, bool] = {}
+
+    def run(idx: int) -> None:
+        try:
+            ok = (candidates[idx] / marker).is_dir()
+        except OSError:
+            ok = False
+        results.put((idx, ok))
+
+    while True:
+        while pending and len(started) < workers:
+            idx = pending.popleft()
+            started[idx] = time.monotonic()
+            threading.Thread(target=run, args=(idx,), daemon=True).start()
+
+        for idx in range(len(candidates)):
+            if idx not in found:
+                break
+            if found[idx]:
+                return candidates[idx]
+        else:
+            return None
+
+        deadline = min(started.values()) + timeout
+        try:
+            idx, ok = results.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for idx, t0 in list(started.items()):
+                if now - t0 >= timeout:
+                    del started[idx]
+                    found[idx] = False
+            continue
+
+        if idx in started:
+            del started[idx]
+            found[idx] = ok
+
+
+def locate(
+    marker: Path,
+    *,
+    cache_file: Path | None = None,
+    extra_steam_dirs: Iterable[Path] = (),
+    workers: int = PROBE_WORKERS,
+    timeout: float = PROBE_TIMEOUT,
+) -> Path | None:
+    """Find the game directory, trying the cached path first.
+
+    Args:
+        marker: Relative directory that must exist inside the game folder.
+        cache_file: File holding the last known game path; updated on
+            success.
+        extra_steam_dirs: Steam directories to search before the platform
+            defaults (useful for fixture trees).
+        workers: Maximum number of concurrent probes.
+        timeout: Per-probe timeout in seconds.
+
+    Returns:
+        Path to the game directory, or ``None`` if not found.
+    """
+    if cache_file is not None and cache_file.is_file():
+        cached = Path(cache_file.read_text(encoding="utf-8").strip())
+        if probe([cached], marker, workers=1, timeout=timeout):
+            return cached
+
+    dirs = [*extra_steam_dirs, *steam_dirs()]
+    game = probe(
+        candidate_roots(dirs), marker, workers=workers, timeout=timeout
+    )
+
+    if game is not None and cache_file is not None:
+        try:
+            cache_file.write_text(f"{game}\n", encoding="utf-8")
+        except OSError:
+            pass
+    return game
+
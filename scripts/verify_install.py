@@ -0,0 +1,194 @@
+"""Compare an installed game with this repo for ``patch.py verify``.
+
+Every file the patch installs (``localization/*.csv`` and the font) is
+classified:
+
+* ``patched`` — identical to the repo;
+* ``stale`` — a patched file from another revision of the repo;
+* ``original`` — the game's own file, identical to the backup (or not
+  backed up at all);
+* ``game-updated`` — the game's own file, but not the one in the backup
+  (Steam updated the game; the backup is outdated);
+* ``missing`` — not installed at all.
+
+A file with the repo's size and modification time counts as patched without
+being read (``install_patch.bat`` copies preserve mtime). Everything else is
+hashed in a thread pool; hashes of the repo files are computed once.
+Patched and original files are told apart by content
+(:func:`backup_store.looks_patched`).
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+
+from backup_store import (
+    FONT_FILE,
+    LEGACY_BACKUP_SUBDIR,
+    LEGACY_SUFFIX,
+    STORE_SUBDIR,
+    file_digest,
+    game_version,
+    looks_patched,
+    read_manifest,
+    versions,
+)
+
+REPO_FONT = Path("fonts", "NotoSans-ExtraBold.ttf")
+
+
+class Status(Enum):
+    """State of one installed file."""
+
+    PATCHED = "patched"
+    STALE = "stale"
+    ORIGINAL = "original"
+    GAME_UPDATED = "game-updated"
+    MISSING = "missing"
+
+
+@dataclass(frozen=True)
+class FileCheck:
+    """Verdict for one file; ``read`` is False if size and mtime decided."""
+
+    rel: str
+    status: Status
+    read: bool
+
+
+@dataclass(frozen=True)
+class BackupEntry:
+    """What the backup says the original file was."""
+
+    size: int
+    sha256: str | None = None  # None: hash ``path`` on demand
+    path: Path | None = None
+
+
+def installed_files(repo_root: Path) -> list[tuple[str, Path]]:
+    """``(game relpath, repo file)`` of everything the patch installs."""
+    pairs = [
+        (f"localization/{p.name}", p)
+        for p in sorted((repo_root / "localization").glob("*.csv"))
+    ]
+    pairs.append((FONT_FILE.as_posix(), repo_root / REPO_FONT))
+    return pairs
+
+
+def backup_entries(
+    game_path: Path, rels: list[str]
+) -> tuple[str | None, dict[str, BackupEntry]]:
+    """Original files of ``rels`` from the backup store.
+
+    Uses the manifest of the installed build, else the newest manifest;
+    legacy ``_backup_ru/`` copies fill files the manifest lacks.
+
+    Returns:
+        ``(manifest version or None, entries)``.
+    """
+    store = game_path / STORE_SUBDIR
+    version = game_version(game_path)
+    files = read_manifest(store, version)
+    if files is None:
+        known = versions(store)
+        version = known[-1] if known else None
+        files = read_manifest(store, version) if version else None
+
+    entries = {
+        rel: BackupEntry(e["size"], e["sha256"]) for rel, e in (files or {}).items()
+    }
+    legacy = game_path / LEGACY_BACKUP_SUBDIR
+    for rel in rels:
+        if rel in entries:
+            continue
+        live = game_path / rel
+        for candidate in (legacy / rel, live.with_name(live.name + LEGACY_SUFFIX)):
+            if candidate.is_file():
+                entries[rel] = BackupEntry(candidate.stat().st_size, path=candidate)
+                break
+    return version, entries
+
+
+class _Hashes:
+    """Digest of each file, computed at most once.
+
+    Shared by the worker threads without a lock: a race only costs a
+    duplicate hash.
+    """
+
+    def __init__(self) -> None:
+        self._cache: dict[Path, str] = {}
+
+    def __call__(self, path: Path) -> str:
+        digest = self._cache.get(path)
+        if digest is None:
+            digest = self._cache[path] = file_digest(path)
+        return digest
+
+
+def classify(
+    rel: str,
+    ours: Path,
+    installed: Path,
+    backup: BackupEntry | None,
+    digest: _Hashes,
+    *,
+    trust_mtime: bool = True,
+) -> FileCheck:
+    """Classify one installed file (see the module docstring)."""
+    try:
+        st = installed.stat()
+    except FileNotFoundError:
+        return FileCheck(rel, Status.MISSING, False)
+    ours_st = ours.stat()
+
+    if st.st_size == ours_st.st_size:
+        if trust_mtime and st.st_mtime_ns == ours_st.st_mtime_ns:
+            return FileCheck(rel, Status.PATCHED, False)
+        if digest(installed) == digest(ours):
+            return FileCheck(rel, Status.PATCHED, True)
+
+    if backup is not None and st.st_size == backup.size:
+        backup_digest = backup.sha256 or digest(backup.path)
+        if digest(installed) == backup_digest:
+            return FileCheck(rel, Status.ORIGINAL, True)
+
+    if looks_patched(rel, installed):
+        return FileCheck(rel, Status.STALE, True)
+    if backup is None:
+        return FileCheck(rel, Status.ORIGINAL, True)
+    return FileCheck(rel, Status.GAME_UPDATED, True)
+
+
+def verify(
+    repo_root: Path,
+    game_path: Path,
+    *,
+    jobs: int | None = None,
+    trust_mtime: bool = True,
+) -> tuple[str | None, list[FileCheck]]:
+    """Classify every installed file in parallel.
+
+    Returns:
+        ``(backup manifest version or None, checks in relpath order)``.
+    """
+    files = installed_files(repo_root)
+    version, backups = backup_entries(game_path, [rel for rel, _ in files])
+    digest = _Hashes()
+
+    def check(item: tuple[str, Path]) -> FileCheck:
+        rel, ours = item
+        return classify(
+            rel,
+            ours,
+            game_path / rel,
+            backups.get(rel),
+            digest,
+            trust_mtime=trust_mtime,
+        )
+
+    workers = jobs or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return version, list(pool.map(check, files))
@@ -0,0 +1,6 @@
+"""Make the flat modules in ``scripts/`` importable, as ``patch.py`` does."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
@@ -0,0 +1,82 @@
+"""Tests for backup_store: picking and restoring the original game files."""
+
+import os
+import stat
+from pathlib import Path
+
+from backup_store import (
+    FONT_FILE,
+    LEGACY_BACKUP_SUBDIR,
+    original_sources,
+    restore,
+    snapshot,
+)
+
+ORIGINAL_CSV = "ID,EN,ZHS\r\n1,hello,你好\r\n".encode("utf-8")
+PATCHED_CSV = "ID,EN,ZHS\r\n1,hello,привет\r\n".encode("utf-8")
+ORIGINAL_FONT = b"\x00\x01\x00\x00Chusung"
+PATCHED_FONT = b"\x00\x01\x00\x00Noto Sans ExtraBold"
+
+
+def _write(path: Path, data: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def test_unpatched_live_file_wins_over_stale_legacy_copy(tmp_path):
+    updated = ORIGINAL_CSV + "2,new,新\r\n".encode("utf-8")
+    live = _write(tmp_path / "localization" / "a.csv", updated)
+    legacy = tmp_path / LEGACY_BACKUP_SUBDIR / "localization" / "a.csv"
+    _write(legacy, ORIGINAL_CSV)
+    assert dict(original_sources(tmp_path)) == {"localization/a.csv": live}
+
+
+def test_patched_live_file_uses_legacy_copy(tmp_path):
+    _write(tmp_path / "localization" / "a.csv", PATCHED_CSV)
+    copy = _write(
+        tmp_path / LEGACY_BACKUP_SUBDIR / "localization" / "a.csv", ORIGINAL_CSV
+    )
+    assert dict(original_sources(tmp_path)) == {"localization/a.csv": copy}
+
+
+def test_patched_font_is_never_stored_as_original(tmp_path):
+    _write(tmp_path / "localization" / "a.csv", ORIGINAL_CSV)
+    _write(tmp_path / FONT_FILE, PATCHED_FONT)
+    skipped: list[str] = []
+    sources = dict(original_sources(tmp_path, skipped))
+    assert FONT_FILE.as_posix() not in sources
+    assert skipped == [FONT_FILE.as_posix()]
+
+    copy = _write(tmp_path / LEGACY_BACKUP_SUBDIR / FONT_FILE, ORIGINAL_FONT)
+    assert dict(original_sources(tmp_path))[FONT_FILE.as_posix()] == copy
+
+
+def test_patched_legacy_copy_is_skipped(tmp_path):
+    _write(tmp_path / "localization" / "a.csv", PATCHED_CSV)
+    legacy = tmp_path / LEGACY_BACKUP_SUBDIR / "localization" / "a.csv"
+    _write(legacy, PATCHED_CSV)
+    sibling = _write(tmp_path / "localization" / "a.csv.backup_ru", ORIGINAL_CSV)
+    assert dict(original_sources(tmp_path)) == {"localization/a.csv": sibling}
+
+
+def test_restore_keeps_file_mode(tmp_path):
+    live = _write(tmp_path / "game" / "localization" / "a.csv", ORIGINAL_CSV)
+    added = tmp_path / "game" / "localization" / "b.csv"
+    _write(added, ORIGINAL_CSV)
+    store = tmp_path / "store"
+    sources = [("localization/a.csv", live), ("localization/b.csv", added)]
+    files, _ = snapshot(store, "1", iter(sources))
+    live.write_bytes(PATCHED_CSV)
+    live.chmod(0o644)
+    added.unlink()
+
+    umask = os.umask(0o022)
+    try:
+        restored, _ = restore(store, tmp_path / "game", files)
+    finally:
+        os.umask(umask)
+    assert sorted(restored) == ["localization/a.csv", "localization/b.csv"]
+    assert live.read_bytes() == ORIGINAL_CSV
+    assert stat.S_IMODE(live.stat().st_mode) == 0o644
+    assert stat.S_IMODE(added.stat().st_mode) == 0o644
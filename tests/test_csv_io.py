@@ -0,0 +1,74 @@
+"""Tests for csv_io: scan_csv against csv.reader, offsets and bad records."""
+
+import codecs
+import csv
+import io
+
+import pytest
+
+from csv_io import CsvScanError, scan_csv
+
+CSV = (
+    'ID,Comments,EN,ZHS\r\n'
+    '1,,hello,"при,вет"\r\n'
+    '\r\n'
+    '2,note,"two\nlines","a ""quoted"" word"\r\n'
+    '3,,short\r\n'
+    '4,,b"c,d\r\n'
+)
+
+
+def _write(tmp_path, text: str, bom: bool = True):
+    path = tmp_path / "a.csv"
+    path.write_bytes((codecs.BOM_UTF8 if bom else b"") + text.encode("utf-8"))
+    return path
+
+
+@pytest.mark.parametrize("bom", [True, False])
+def test_cells_match_csv_reader(tmp_path, bom):
+    path = _write(tmp_path, CSV, bom)
+    rows = list(scan_csv(path, ("ID", "EN", "ZHS")))
+    expected = [
+        (r[0], r[2], r[3])
+        for r in csv.reader(io.StringIO(CSV, newline=""))
+        if len(r) > 3
+    ][1:]
+    assert [r.cells for r in rows] == expected
+    assert [r.line for r in rows] == [2, 4, 7]
+
+
+def test_offsets_point_at_records(tmp_path):
+    path = _write(tmp_path, CSV)
+    data = path.read_bytes()[len(codecs.BOM_UTF8):]
+    for row in scan_csv(path, ("ID",)):
+        assert data[row.offset:].startswith(row.cells[0].encode() + b",")
+
+
+def test_missing_column_yields_nothing(tmp_path):
+    assert list(scan_csv(_write(tmp_path, CSV), ("ID", "JA"))) == []
+
+
+def test_unterminated_quote_in_header(tmp_path):
+    path = _write(tmp_path, 'ID,"EN\r\n1,x\r\n')
+    with pytest.raises(CsvScanError):
+        list(scan_csv(path, ("ID",)))
+    errors: list[CsvScanError] = []
+    assert list(scan_csv(path, ("ID",), errors=errors)) == []
+    assert errors[0].line == 1
+
+
+def test_unterminated_quote_in_record(tmp_path):
+    path = _write(tmp_path, 'ID,EN\r\n1,ok\r\n2,"open\r\n3,x\r\n')
+    errors: list[CsvScanError] = []
+    rows = list(scan_csv(path, ("ID", "EN"), errors=errors))
+    assert [r.cells for r in rows] == [("1", "ok")]
+    assert (errors[0].line, errors[0].offset) == (3, len("ID,EN\r\n1,ok\r\n"))
+
+
+def test_invalid_utf8_in_projected_cell(tmp_path):
+    path = tmp_path / "a.csv"
+    path.write_bytes(b"ID,EN,JA\r\n1,\xff,x\r\n2,ok,\xff\r\n")
+    errors: list[CsvScanError] = []
+    rows = list(scan_csv(path, ("ID", "EN"), errors=errors))
+    assert [r.cells for r in rows] == [("2", "ok")]
+    assert [e.line for e in errors] == [2]
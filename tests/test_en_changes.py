@@ -0,0 +1,39 @@
+"""Tests for en_changes: which changed rows reach the review queue."""
+
+from en_changes import compare
+
+OLD = "ID,EN,ZHS\r\n1,Open the door,{}\r\n".format
+NEW = "ID,EN,ZHS\r\n1,Open the gate,{}\r\n".format
+
+
+def _files(text: str) -> dict[str, bytes]:
+    return {"ui_text.csv": text.encode("utf-8")}
+
+
+def _queue(translation: str) -> list[str]:
+    report = compare(
+        _files(OLD("")), _files(NEW("")), _files(NEW(translation))
+    )
+    assert len(report.changes) == 1
+    return [c.translation for c in report.queue()]
+
+
+def test_translated_row_is_queued():
+    assert _queue("Откройте ворота") == ["Откройте ворота"]
+
+
+def test_empty_target_is_not_queued():
+    assert _queue("") == []
+
+
+def test_old_en_in_target_is_not_queued():
+    assert _queue("Open the door") == []
+
+
+def test_new_en_in_target_is_not_queued():
+    assert _queue("Open the gate") == []
+
+
+def test_new_files_as_translations_queue_nothing():
+    new = _files(NEW("Open the gate"))
+    assert compare(_files(OLD("Open the door")), new, new).queue() == []
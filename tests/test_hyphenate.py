@@ -0,0 +1,70 @@
+"""Tests for hyphenate and the hyphenating path of fix_linebreaks."""
+
+import pytest
+
+from fix_linebreaks import (
+    break_segment,
+    fix_zhs_text,
+    hyphenator_for,
+    process_file,
+)
+from hyphenate import compile_patterns, hyphenator
+
+LONG = "Очень экспериментальное оружие"
+WRAPPED = "Очень эксперименталь-#ное оружие"
+
+
+@pytest.fixture
+def hyph():
+    return hyphenator_for("ZHS")
+
+
+def test_pattern_positions():
+    h = hyphenator("hyphen_ru.pat")
+    assert h.hyphenate("молоко") == "мо-ло-ко"
+    assert h.hyphenate("разъезд") == "разъ-езд"
+    assert h.hyphenate("экспериментальное") == "эк-спе-ри-мен-таль-ное"
+    assert h.positions("кто") == ()
+
+
+def test_fragment_limits():
+    h = hyphenator("hyphen_ru.pat", 2, 3)
+    assert h.hyphenate("молоко") == "мо-локо"
+
+
+def test_unknown_pattern_symbol():
+    with pytest.raises(ValueError, match="строка 2"):
+        compile_patterns(["V1CV", "a1b"])
+
+
+def test_break_segment_splits_long_word(hyph):
+    assert break_segment(LONG, 22, hyph) == WRAPPED
+    assert break_segment(LONG, 22) == "Очень#экспериментальное#оружие"
+
+
+def test_rewrap_is_idempotent(hyph):
+    assert fix_zhs_text(LONG, 22, hyph) == WRAPPED
+    assert fix_zhs_text(WRAPPED, 22, hyph) == WRAPPED
+
+
+def test_compound_broken_at_its_hyphen_keeps_it(hyph):
+    assert fix_zhs_text("Кажется, кто-#то идёт", 22, hyph) == "Кажется, кто-то идёт"
+    assert (
+        fix_zhs_text("северо-#западный ветер крепчает", 22, hyph)
+        == "северо-западный ветер#крепчает"
+    )
+
+
+def test_without_hyphenator_soft_breaks_keep_the_hyphen():
+    assert fix_zhs_text(WRAPPED, 22) == "Очень#эксперименталь-ное#оружие"
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [("gossip_tank.csv", WRAPPED), ("hack_text.csv", "Очень#экспериментальное#оружие")],
+)
+def test_only_hyphenate_files_are_hyphenated(tmp_path, name, expected):
+    path = tmp_path / name
+    path.write_text(f"ID,EN,ZHS\n1,gun,{LONG}\n", encoding="utf-8-sig")
+    changes = process_file(path, 22, ("ZHS",), hyphenate=True)
+    assert [c[3] for c in changes] == [expected]
@@ -0,0 +1,28 @@
+"""Tests for preview: EN cells wrap inside their box."""
+
+import pytest
+
+pytest.importorskip("PIL")
+
+import preview  # noqa: E402
+
+if not preview.FONT_PATH.is_file():
+    pytest.skip("шрифт не найден", allow_module_level=True)
+
+
+def test_wrap_line_breaks_mid_word_and_keeps_colours():
+    cache = preview.glyph_cache()
+    width = round(cache.width("abcd"))
+    lines = preview.wrap_line([("ab", 0), ("cdefg", 1)], width, cache)
+    assert lines == [[("ab", 0), ("cd", 1)], [("efg", 1)]]
+
+
+def test_en_box_width_does_not_depend_on_text():
+    width = preview.box_width(22)
+    short, _ = preview.render_cell("hi", width, wrap=True)
+    long, overflow = preview.render_cell(
+        "a line that is much longer than the box", width, wrap=True
+    )
+    assert short.width == long.width == width + 2 * preview.PADDING
+    assert long.height > short.height
+    assert overflow == 0
@@ -0,0 +1,17 @@
+"""Tests for serve: the corpus daemon's answers."""
+
+from serve import Corpus
+
+
+def test_stats_count_empty_targets_as_untranslated(tmp_path):
+    (tmp_path / "ui_text.csv").write_text(
+        "ID,Comments,EN,ZHS\n1,,Yes,Да\n2,,No,\n3,,Back,Back\n",
+        encoding="utf-8-sig",
+    )
+    corpus = Corpus(tmp_path, ("ZHS",))
+    corpus.refresh()
+    assert corpus.stats({}) == {
+        "files": {"ui_text.csv": {"total": 3, "done": 1}},
+        "total": 3,
+        "done": 1,
+    }
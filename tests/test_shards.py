@@ -0,0 +1,54 @@
+"""Tests for shards: merging translated shards back into the CSVs."""
+
+import json
+
+import pytest
+
+import shards
+
+CSV = (
+    "ID,Comments,EN,ZHS\r\n"
+    '1,,"Hello, world","Hello, world"\r\n'
+    "2,,Bye,Пока\r\n"
+)
+
+
+def _shard(path, target, rows):
+    path.write_text(
+        json.dumps({"shard": 1, "target": target, "rows": rows}),
+        encoding="utf-8",
+    )
+    return path
+
+
+def _row(row_id, en, translation):
+    return {
+        "file": "ui_text.csv",
+        "id": row_id,
+        "occurrence": 0,
+        "en_hash": shards.en_hash(en),
+        "translation": translation,
+    }
+
+
+def test_merge_splices_only_the_target_cell(tmp_path):
+    loc = tmp_path / "loc"
+    loc.mkdir()
+    csv_path = loc / "ui_text.csv"
+    csv_path.write_bytes(CSV.encode("utf-8"))  # no BOM
+    shard = _shard(
+        tmp_path / "shard_01.json", "ZHS", [_row("1", "Hello, world", "Привет")]
+    )
+
+    report = shards.merge_shards(loc, [shard])
+    assert report.applied == {"ui_text.csv": 1}
+    assert csv_path.read_bytes() == CSV.replace(
+        ',"Hello, world"\r\n', ",Привет\r\n"
+    ).encode("utf-8")
+
+
+def test_shards_for_different_targets_are_rejected(tmp_path):
+    a = _shard(tmp_path / "shard_01.json", "ZHS", [])
+    b = _shard(tmp_path / "shard_02.json", "JA", [])
+    with pytest.raises(ValueError, match="shard_02.json → JA"):
+        shards.merge_shards(tmp_path, [a, b])
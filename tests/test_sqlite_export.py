@@ -0,0 +1,30 @@
+"""Tests for sqlite_export: importing edits back into the CSV files."""
+
+import sqlite_export
+
+CSV = (
+    "ID,Comments,EN,ZHS\r\n"
+    '1,,"Hello, world",Привет\r\n'
+    "2,,Bye,Пока\r\n"
+)
+
+
+def test_import_splices_only_changed_cells(tmp_path):
+    loc = tmp_path / "loc"
+    loc.mkdir()
+    path = loc / "ui_text.csv"
+    path.write_bytes(CSV.encode("utf-8"))  # no BOM
+    conn = sqlite_export.connect(tmp_path / "db.sqlite")
+    sqlite_export.export_corpus(conn, [path])
+    with conn:
+        conn.execute(
+            "UPDATE cells SET text = 'До встречи, друг' WHERE id = '2'"
+            " AND col = 'ZHS'"
+        )
+
+    changed, stale = sqlite_export.import_corpus(conn, loc)
+    assert (changed, stale) == ({"ui_text.csv": 1}, [])
+    assert path.read_bytes() == CSV.replace(
+        "Пока", '"До встречи, друг"'
+    ).encode("utf-8")
+    assert sqlite_export.import_corpus(conn, loc) == ({}, [])
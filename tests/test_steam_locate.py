@@ -0,0 +1,167 @@
+"""Tests for steam_locate: VDF parsing, candidate order and probing."""
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import steam_locate
+from steam_locate import GAME_SUBDIR, candidate_roots, parse_vdf, probe
+
+LIBRARY_FOLDERS = r'''
+"libraryfolders"
+{
+	"0"
+	{
+		"path"		"{steam}"
+		"label"		""
+		"apps"
+		{
+			"228980"		"1"
+		}
+	}
+	"1"
+	{
+		"path"		"{library}"
+		"apps"
+		{
+			"603960"		"4212"
+		}
+	}
+}
+'''
+
+APP_MANIFEST = '''
+"AppState"
+{
+	"appid"		"603960"
+	"name"		"Star of Providence"
+	"buildid"		"11683072"
+	"installdir"		"Star of Providence"
+}
+'''
+
+
+@pytest.fixture
+def steam_tree(tmp_path: Path) -> tuple[Path, Path]:
+    """A Steam client dir and a second library holding the game."""
+    steam = tmp_path / "Steam"
+    library = tmp_path / "SteamLibrary"
+    (steam / "steamapps").mkdir(parents=True)
+    (steam / "steamapps" / "libraryfolders.vdf").write_text(
+        LIBRARY_FOLDERS.replace("{steam}", str(steam).replace("\\", "\\\\"))
+        .replace("{library}", str(library).replace("\\", "\\\\")),
+        encoding="utf-8",
+    )
+    game = library / GAME_SUBDIR
+    (game / "localization").mkdir(parents=True)
+    (library / "steamapps" / "appmanifest_603960.acf").write_text(
+        APP_MANIFEST, encoding="utf-8"
+    )
+    return steam, library
+
+
+def test_parse_vdf_nested_blocks_and_case():
+    data = parse_vdf(APP_MANIFEST + LIBRARY_FOLDERS)
+    assert data["appstate"]["buildid"] == "11683072"
+    assert data["libraryfolders"]["1"]["apps"] == {"603960": "4212"}
+
+
+def test_parse_vdf_escapes_comments_and_conditionals():
+    text = r'''
+    // comment
+    "root"
+    {
+        "path"  "D:\\Games\\Steam"   // trailing comment
+        "quote" "say \"hi\"\n"
+        "bare"  value [$WIN32]
+        "multi" "two
+lines"
+    }
+    '''
+    root = parse_vdf(text)["root"]
+    assert root["path"] == "D:\\Games\\Steam"
+    assert root["quote"] == 'say "hi"\n'
+    assert root["bare"] == "value"
+    assert root["multi"] == "two\nlines"
+
+
+@pytest.mark.parametrize(
+    "text", ['"a" {', '"a" "b" }', '"a" "unterminated', '{ "a" "b" }']
+)
+def test_parse_vdf_rejects_malformed(text):
+    with pytest.raises(ValueError):
+        parse_vdf(text)
+
+
+def test_candidate_roots_order_and_dedup(steam_tree):
+    steam, library = steam_tree
+    roots = candidate_roots([steam, steam])
+    assert roots[:2] == [steam / GAME_SUBDIR, library / GAME_SUBDIR]
+    assert len(roots) == len(set(roots))
+
+
+def test_candidate_roots_legacy_layout(tmp_path):
+    steam = tmp_path / "Steam"
+    (steam / "steamapps").mkdir(parents=True)
+    legacy = tmp_path / "Old"
+    (steam / "steamapps" / "libraryfolders.vdf").write_text(
+        '"LibraryFolders" { "TimeNextStatsReport" "1" "1" "%s" }'
+        % str(legacy).replace("\\", "\\\\"),
+        encoding="utf-8",
+    )
+    assert candidate_roots([steam])[:2] == [
+        steam / GAME_SUBDIR, legacy / GAME_SUBDIR
+    ]
+
+
+def test_candidate_roots_without_vdf(tmp_path):
+    assert candidate_roots([tmp_path])[0] == tmp_path / GAME_SUBDIR
+
+
+def test_probe_keeps_priority_order(steam_tree):
+    steam, library = steam_tree
+    (steam / GAME_SUBDIR / "localization").mkdir(parents=True)
+    found = probe(candidate_roots([steam]), Path("localization"))
+    assert found == steam / GAME_SUBDIR
+
+
+def test_probe_times_out_stuck_candidate(steam_tree, monkeypatch):
+    steam, library = steam_tree
+    stuck = steam.parent / "stuck"
+    release = threading.Event()
+    is_dir = Path.is_dir
+
+    def slow_is_dir(self):
+        if stuck in self.parents:
+            release.wait(10)
+        return is_dir(self)
+
+    monkeypatch.setattr(type(stuck), "is_dir", slow_is_dir)
+    try:
+        t0 = time.monotonic()
+        found = probe(
+            [stuck, library / GAME_SUBDIR], Path("localization"), timeout=0.2
+        )
+        elapsed = time.monotonic() - t0
+    finally:
+        release.set()
+    assert found == library / GAME_SUBDIR
+    assert elapsed < 2
+
+
+def test_probe_all_missing(tmp_path):
+    assert probe([tmp_path / "a", tmp_path / "b"], Path("localization")) is None
+
+
+def test_locate_caches_result(steam_tree, monkeypatch, tmp_path):
+    steam, library = steam_tree
+    monkeypatch.setattr(steam_locate, "steam_dirs", lambda: [])
+    cache = tmp_path / ".game_path"
+    game = steam_locate.locate(
+        Path("localization"), cache_file=cache, extra_steam_dirs=[steam]
+    )
+    assert game == library / GAME_SUBDIR
+    assert cache.read_text(encoding="utf-8").strip() == str(game)
+    assert steam_locate.locate(Path("localization"), cache_file=cache) == game